@@ -1,31 +1,50 @@
 # app.py
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, send_from_directory
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 
 from config import config
-from models.db import db, bcrypt
+from models.db import db, bcrypt, password_hasher
+from models.routing import configure_replicas
 from routes.auth import auth_bp
 from routes.missing_persons import missing_persons_bp
 from routes.search import search_bp
+from routes.alerts import alerts_bp
+from controllers.statistics_controller import StatisticsController
+from controllers.alerts_controller import AlertsController
+from cli import register_commands
+from utils.photo_uploads import PhotoUploadQueue
+from utils.instrumentation import Instrumentation
+from utils.http_cache import init_response_cache
+from utils.events import init_events
+from utils.alert_outbox import create_outbox
+from utils.auth import init_auth
+from utils.json_provider import OrjsonProvider
 
 def create_app(config_name='development'):
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
 
     app.config.from_object(config[config_name])
-    app.config["JWT_SECRET_KEY"] = "your-secret-key"
-    app.config["JWT_TOKEN_LOCATION"] = ["headers"]
 
     # Init extensions
     CORS(app, resources={r"/*": {"origins": "*"}})
     
     db.init_app(app)
+    configure_replicas(app)
     bcrypt.init_app(app)
+    password_hasher.init_app(app)
     Migrate(app, db)
     
     jwt = JWTManager(app)
+    init_auth(app)
+    PhotoUploadQueue(app)
+    Instrumentation(app)
+    init_response_cache(app)
+    init_events(app)
+    app.extensions["alert_outbox"] = create_outbox(app)
 
     @jwt.user_identity_loader
     def user_identity_lookup(user_id):
@@ -35,6 +54,22 @@ def create_app(config_name='development'):
     app.register_blueprint(auth_bp)
     app.register_blueprint(missing_persons_bp)
     app.register_blueprint(search_bp)
+    app.register_blueprint(alerts_bp)
+
+    register_commands(app)
+
+    # Periodically repair the statistics counters (off unless configured)
+    if app.config.get("STATS_RECONCILE_INTERVAL"):
+        StatisticsController.start_reconcile_job(app, app.config["STATS_RECONCILE_INTERVAL"])
+
+    # Deliver queued saved-search alerts (off unless configured)
+    if app.config.get("ALERT_DELIVERY_INTERVAL"):
+        AlertsController.start_delivery_job(app, app.config["ALERT_DELIVERY_INTERVAL"])
+
+    if app.config.get("PHOTO_STORAGE") == "local":
+        @app.route("/media/<path:filename>")
+        def media(filename):
+            return send_from_directory(app.config["PHOTO_LOCAL_DIR"], filename)
 
     @app.route("/")
     def home():
@@ -0,0 +1,267 @@
+# benchmarks/datagen.py
+#
+# Seeded generator of synthetic users and missing person reports, for
+# measuring the API at production scale (10^4 - 10^7 reports). The same
+# seed and counts always produce the same rows; dates are relative to the
+# time of generation, so "recent" queries always have something to find.
+#
+# Rows are written with Core executemany inserts, a batch per transaction,
+# which bypasses the ORM flush hooks; the statistics counters and map tiles
+# are rebuilt once at the end instead (`flask stats reconcile`).
+
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from sqlalchemy import select, text
+
+from models.db import db, password_hasher
+from models.change_log import DELETE, UPSERT, log_bulk_changes
+from models.missing_person import MissingPerson
+from models.user import User
+from controllers.statistics_controller import StatisticsController
+from utils import geohash
+from utils.gazetteer import COUNTIES, TOWNS, geocode
+
+# Generated rows are recognisable by these, so they can be removed again
+CASE_PREFIX = "SYN-"
+EMAIL_DOMAIN = "bench.findme.test"
+
+# Every generated user can log in with this password
+PASSWORD = "benchmark-password"
+
+DEFAULT_BATCH_SIZE = 5000
+
+# Reports are spread over this many days before `now`, recent ones more often
+HISTORY_DAYS = 3 * 365
+
+# Share of reports filed by the few partner organisation accounts
+PARTNER_SHARE = 0.2
+PARTNER_USERS = 0.01
+
+FIRST_NAMES = (
+    "John", "Mary", "David", "Alice", "Peter", "Grace", "James", "Sarah", "Michael", "Jane",
+    "Brian", "Faith", "Kevin", "Mercy", "Dennis", "Joy", "Collins", "Esther", "Victor", "Ann",
+    "Wanjiku", "Achieng", "Atieno", "Akinyi", "Njeri", "Nyambura", "Wambui", "Chebet", "Jepkoech",
+    "Kiprono", "Kipchoge", "Otieno", "Odhiambo", "Ochieng", "Kamau", "Mwangi", "Kariuki",
+    "Mutua", "Musyoka", "Wafula", "Barasa", "Juma", "Hassan", "Amina", "Fatuma", "Halima",
+    "Abdi", "Mohamed", "Lokai", "Ekai", "Naserian", "Sankale", "Moraa", "Kerubo", "Nyaboke",
+)
+LAST_NAMES = (
+    "Kamau", "Wanjiru", "Omondi", "Njeri", "Mwangi", "Otieno", "Kiprotich", "Chepkemoi",
+    "Ochieng", "Achieng", "Mutua", "Mwende", "Wambua", "Kilonzo", "Wafula", "Wekesa",
+    "Simiyu", "Barasa", "Nyongesa", "Kiptoo", "Rotich", "Korir", "Langat", "Cheruiyot",
+    "Onyango", "Owino", "Okoth", "Oduor", "Maina", "Karanja", "Githinji", "Ndungu",
+    "Kimani", "Gitau", "Ali", "Hassan", "Abdullahi", "Mohamed", "Lokiru", "Ekiru",
+    "Ole Sankale", "Nyamweya", "Moraa", "Ombati", "Makori", "Nyakundi", "Doe", "Smith",
+)
+HAIR_COLORS = ("Black", "Black", "Black", "Dark brown", "Brown", "Gray", "White")
+EYE_COLORS = ("Brown", "Brown", "Dark brown", "Black", "Hazel")
+CLOTHING = (
+    "Blue jeans and white t-shirt", "Red dress", "Black jacket and blue pants",
+    "School uniform, green sweater", "Green hoodie", "Grey suit", "Yellow kanga",
+    "Maasai shuka", "Brown trousers and checked shirt", "Pink school uniform",
+    "Black leather jacket", "Orange reflector vest", "White kanzu",
+)
+FEATURES = (
+    "Scar on left cheek", "Tattoo on right arm", "Wears glasses", "Has a birthmark on forehead",
+    "Missing front tooth", "Limps slightly", "Pierced ears", "Dreadlocks", "Bald",
+    "Speaks Swahili and Luo", "Has a stammer", None, None, None,
+)
+# where within a town people are last seen, appended to the town name
+SPOTS = ("", "", " bus stage", " market", " stadium", " hospital", " primary school")
+# locations the gazetteer does not know
+UNKNOWN_LOCATIONS = ("Along the highway", "Near the river", "At the farm", "On the way home")
+# missing / found / closed
+STATUS_WEIGHTS = ((("missing",) * 7) + (("found",) * 2) + ("closed",))
+
+
+def _places():
+    """(location text templates, weights): towns over counties, Nairobi most"""
+    names, weights = [], []
+    for name, county, _, _, _ in TOWNS:
+        names.append((name, county))
+        weights.append(6 if county == "Nairobi" else 3)
+    for name, _, _ in COUNTIES:
+        names.append((name, name))
+        weights.append(1)
+    return names, weights
+
+
+PLACE_NAMES, PLACE_WEIGHTS = _places()
+
+
+@lru_cache(maxsize=None)
+def _geocoded(location):
+    """(latitude, longitude, county, geohash) the ORM hooks would store"""
+    place = geocode(location)
+    if place is None:
+        return None, None, None, None
+    return place.latitude, place.longitude, place.county, geohash.encode(place.latitude, place.longitude)
+
+
+def _age(rng):
+    """Skewed towards children, teenagers and the elderly, as real reports are"""
+    bucket = rng.random()
+    if bucket < 0.3:
+        return rng.randint(2, 12)
+    if bucket < 0.55:
+        return rng.randint(13, 19)
+    if bucket < 0.85:
+        return rng.randint(20, 59)
+    return rng.randint(60, 95)
+
+
+def _location(rng):
+    if rng.random() < 0.03:
+        return rng.choice(UNKNOWN_LOCATIONS)
+    name, county = rng.choices(PLACE_NAMES, PLACE_WEIGHTS)[0]
+    suffix = rng.choice((", Kenya", f", {county}", "")) if name != county else ", Kenya"
+    return f"{name}{rng.choice(SPOTS)}{suffix}"
+
+
+def generate_users(count, seed=0, password_hash=""):
+    """`count` user rows as dicts"""
+    rng = random.Random(f"users:{seed}")
+    now = datetime.utcnow()
+    for n in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "name": f"{first} {last}",
+            "email": f"user{n}@{EMAIL_DOMAIN}",
+            "password_hash": password_hash,
+            "created_at": now - timedelta(days=rng.randint(0, HISTORY_DAYS)),
+        }
+
+
+def generate_reports(count, user_ids, seed=0, now=None):
+    """
+    `count` report rows as dicts, filed by `user_ids`. A small share of the
+    users (partner organisations) file PARTNER_SHARE of the reports.
+    """
+    rng = random.Random(f"reports:{seed}")
+    now = now or datetime.utcnow()
+    partners = user_ids[:max(1, int(len(user_ids) * PARTNER_USERS))]
+    for n in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        location = _location(rng)
+        latitude, longitude, county, cell = _geocoded(location)
+        # exponential: half the reports are from the last ~4 months
+        days_ago = min(int(rng.expovariate(1 / 180)), HISTORY_DAYS)
+        seen = now - timedelta(days=days_ago, minutes=rng.randint(0, 24 * 60))
+        created = seen + timedelta(hours=rng.randint(1, 72))
+        gender = rng.choice(("Male", "Female"))
+        status = rng.choice(STATUS_WEIGHTS)
+        yield {
+            "user_id": rng.choice(partners if rng.random() < PARTNER_SHARE else user_ids),
+            "full_name": f"{first} {last}" if rng.random() < 0.8 else f"{first} {rng.choice(LAST_NAMES)} {last}",
+            "age": _age(rng),
+            "gender": gender,
+            "height": f"{rng.randint(90, 195)}cm" if rng.random() < 0.7 else None,
+            "weight": f"{rng.randint(15, 100)}kg" if rng.random() < 0.5 else None,
+            "hair_color": rng.choice(HAIR_COLORS),
+            "eye_color": rng.choice(EYE_COLORS),
+            "distinguishing_features": rng.choice(FEATURES),
+            "last_seen_date": seen,
+            "last_seen_location": location,
+            "latitude": latitude,
+            "longitude": longitude,
+            "county": county,
+            "geohash": cell,
+            "last_seen_wearing": rng.choice(CLOTHING),
+            "contact_name": f"{rng.choice(FIRST_NAMES)} {last}",
+            "contact_phone": f"+2547{rng.randint(10000000, 99999999)}",
+            "contact_email": f"contact{n}@example.com" if rng.random() < 0.6 else None,
+            "status": status,
+            "case_number": f"{CASE_PREFIX}{seed}-{n:08d}",
+            "additional_info": None,
+            "photo_url": None,
+            "created_at": created,
+            "updated_at": created if status == "missing" else created + timedelta(days=rng.randint(1, 60)),
+        }
+
+
+def _insert(table, rows, batch_size):
+    """Insert an iterable of row dicts, one executemany and commit per batch"""
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            db.session.execute(table.insert(), batch)
+            db.session.commit()
+            written += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        written += len(batch)
+    return written
+
+
+def _generated_report_ids():
+    return select(MissingPerson.id).where(MissingPerson.case_number.startswith(CASE_PREFIX))
+
+
+def clear_dataset():
+    """Delete every generated report and user. Returns the number of reports deleted."""
+    log_bulk_changes(DELETE, _generated_report_ids())
+    deleted = MissingPerson.query.filter(MissingPerson.case_number.startswith(CASE_PREFIX)).delete(
+        synchronize_session=False
+    )
+    User.query.filter(User.email.endswith(f"@{EMAIL_DOMAIN}")).delete(synchronize_session=False)
+    db.session.commit()
+    StatisticsController.reconcile()
+    return deleted
+
+
+def generate_dataset(reports, users, seed=0, batch_size=DEFAULT_BATCH_SIZE, reset=False, progress=None):
+    """
+    Insert `users` synthetic users and `reports` synthetic reports.
+    Args:
+        reports (int): number of reports
+        users (int): number of users filing them (at least 1)
+        seed (int): random seed; the same seed gives the same data
+        batch_size (int): rows per executemany / transaction
+        reset (bool): delete previously generated data first
+        progress (callable): called with (table name, rows written so far)
+    Returns:
+        dict: {'users', 'reports'} rows written
+    Raises:
+        ValueError: if generated data exists and reset is False
+    """
+    if users < 1:
+        raise ValueError("at least one user is needed to file the reports")
+    if reset:
+        clear_dataset()
+    elif db.session.query(
+        User.query.filter(User.email.endswith(f"@{EMAIL_DOMAIN}")).exists()
+    ).scalar():
+        raise ValueError("generated data already exists; pass reset to replace it")
+
+    def reporting(name, rows):
+        for count, row in enumerate(rows, start=1):
+            if progress and count % batch_size == 0:
+                progress(name, count)
+            yield row
+
+    # bcrypt once: every generated user shares the password
+    password_hash = password_hasher.hash(PASSWORD)
+    written_users = _insert(
+        User.__table__, reporting("users", generate_users(users, seed, password_hash)), batch_size
+    )
+    user_ids = [
+        user_id for (user_id,) in db.session.query(User.id)
+        .filter(User.email.endswith(f"@{EMAIL_DOMAIN}")).order_by(User.id)
+    ]
+    written_reports = _insert(
+        MissingPerson.__table__, reporting("reports", generate_reports(reports, user_ids, seed)), batch_size
+    )
+
+    # the Core inserts bypassed the flush hooks that maintain these
+    log_bulk_changes(UPSERT, _generated_report_ids())
+    StatisticsController.reconcile()
+    # fresh planner statistics, or the first benchmark runs see an empty table
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    return {"users": written_users, "reports": written_reports}
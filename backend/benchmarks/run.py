@@ -0,0 +1,280 @@
+# benchmarks/run.py
+#
+# Latency and throughput of the main API endpoints, driven through the
+# Flask app in process, so the numbers measure our code and the database
+# rather than a WSGI server or the network. Point DATABASE_URL at the
+# database to measure (the `benchmark` config falls back to a local sqlite
+# file) and fill it with `--generate` or `flask data generate` first.
+#
+#   python -m benchmarks.run --generate 100000 --users 5000
+#   python -m benchmarks.run --iterations 500 --output after.json --baseline before.json
+#
+# With --baseline the run fails (exit status 1) when any scenario's p95
+# latency got more than --tolerance slower.
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from models.db import db
+from models.missing_person import MissingPerson
+from models.user import User
+from utils.auth import issue_token
+from utils.gazetteer import TOWNS
+from benchmarks.datagen import EMAIL_DOMAIN, FIRST_NAMES, LAST_NAMES, PASSWORD, generate_dataset
+
+Scenario = namedtuple("Scenario", "name request")
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _get(path, params=None, auth=False):
+    return "GET", f"{path}?{urlencode(params)}" if params else path, auth, None
+
+
+def _search_name(rng, context):
+    return _get("/api/search", {"name": rng.choice(FIRST_NAMES)})
+
+
+def _search_fuzzy(rng, context):
+    # a misspelt surname, as typed into the search box
+    name = rng.choice(LAST_NAMES)
+    position = rng.randrange(1, len(name))
+    return _get("/api/search", {"name": name[:position] + name[position + 1:], "match": "fuzzy"})
+
+
+def _search_text(rng, context):
+    return _get("/api/search", {"q": rng.choice(("school uniform", "scar", "glasses", "red dress"))})
+
+
+def _search_filters(rng, context):
+    low = rng.randint(2, 60)
+    return _get("/api/search", {
+        "status": "missing", "gender": rng.choice(("male", "female")),
+        "age_min": low, "age_max": low + 10,
+    })
+
+
+def _search_cursor(rng, context):
+    since = (context["now"] - timedelta(days=rng.randint(7, 365))).date().isoformat()
+    return _get("/api/search", {"cursor": "", "status": "missing", "date_from": since})
+
+
+def _search_near(rng, context):
+    return _get("/api/search", {"near": rng.choice(TOWNS)[0], "radius_km": 20, "sort": "distance"})
+
+
+def _list(rng, context):
+    return _get("/api/missing-persons", {"limit": 50})
+
+
+def _mine(rng, context):
+    return _get("/api/missing-persons/mine", {"limit": 50}, auth=True)
+
+
+def _recent(rng, context):
+    return _get("/api/missing-persons/recent", {"cursor": "", "per_page": 50})
+
+
+def _stats(rng, context):
+    return _get("/api/missing-persons/stats")
+
+
+def _login(rng, context):
+    return "POST", "/api/auth/login", False, {"email": context["email"], "password": PASSWORD}
+
+
+SCENARIOS = (
+    Scenario("search_name", _search_name),
+    Scenario("search_fuzzy", _search_fuzzy),
+    Scenario("search_text", _search_text),
+    Scenario("search_filters", _search_filters),
+    Scenario("search_cursor", _search_cursor),
+    Scenario("search_near", _search_near),
+    Scenario("list", _list),
+    Scenario("mine", _mine),
+    Scenario("recent", _recent),
+    Scenario("stats", _stats),
+    Scenario("login", _login),
+)
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * p // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def summarize(timings, errors, elapsed):
+    """Latency percentiles (ms) and throughput of one scenario"""
+    ordered = sorted(timings)
+    result = {
+        "requests": len(ordered),
+        "errors": errors,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else None,
+    }
+    for p in PERCENTILES:
+        value = percentile(ordered, p)
+        result[f"p{p}_ms"] = round(value * 1000, 3) if value is not None else None
+    result["max_ms"] = round(ordered[-1] * 1000, 3) if ordered else None
+    result["throughput_rps"] = round(len(ordered) / elapsed, 1) if elapsed else None
+    return result
+
+
+def benchmark_context(app):
+    """Token and login of a generated partner account, shared by the scenarios"""
+    with app.app_context():
+        user = (
+            User.query.filter(User.email.endswith(f"@{EMAIL_DOMAIN}"))
+            .order_by(User.id).first()
+        )
+        if user is None:
+            raise RuntimeError("no generated data; run with --generate or `flask data generate` first")
+        reports = db.session.query(MissingPerson.id).count()
+        return {
+            "email": user.email,
+            "token": issue_token(user),
+            "reports": reports,
+            "now": datetime.utcnow(),
+        }
+
+
+def run_scenario(app, scenario, context, iterations, warmup=0, concurrency=1, seed=0):
+    """
+    Send `iterations` requests of one scenario, spread over `concurrency`
+    threads with a test client each, after `warmup` untimed requests.
+    Returns:
+        dict: see summarize()
+    """
+    headers = {"Authorization": f"Bearer {context['token']}"}
+
+    def send(client, rng):
+        method, url, auth, body = scenario.request(rng, context)
+        started = time.perf_counter()
+        response = client.open(url, method=method, json=body, headers=headers if auth else None)
+        return time.perf_counter() - started, response.status_code >= 400
+
+    def worker(count, worker_seed):
+        rng = random.Random(worker_seed)
+        client = app.test_client()
+        results = [send(client, rng) for _ in range(count)]
+        return [t for t, _ in results], sum(failed for _, failed in results)
+
+    warm_client, warm_rng = app.test_client(), random.Random(f"warmup:{seed}")
+    for _ in range(warmup):
+        send(warm_client, warm_rng)
+
+    shares = [iterations // concurrency + (i < iterations % concurrency) for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(worker, shares, [f"{scenario.name}:{seed}:{i}" for i in range(concurrency)]))
+    elapsed = time.perf_counter() - started
+
+    timings = [t for worker_timings, _ in outcomes for t in worker_timings]
+    return summarize(timings, sum(errors for _, errors in outcomes), elapsed)
+
+
+def run_benchmarks(app, iterations=200, warmup=10, concurrency=1, only=None, seed=0, log=None):
+    """
+    Run every scenario (or those named in `only`).
+    Returns:
+        dict: {'meta': {...}, 'results': {scenario name: summary}}
+    """
+    context = benchmark_context(app)
+    results = {}
+    for scenario in SCENARIOS:
+        if only and scenario.name not in only:
+            continue
+        results[scenario.name] = run_scenario(app, scenario, context, iterations, warmup, concurrency, seed)
+        if log:
+            log(scenario.name, results[scenario.name])
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    return {
+        "meta": {
+            "database": dialect,
+            "reports": context["reports"],
+            "iterations": iterations,
+            "concurrency": concurrency,
+            "started_at": context["now"].isoformat(),
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Scenarios whose p95 latency is more than `tolerance` (0.2 = 20%) above the baseline"""
+    regressions = []
+    for name, current in results["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before.get("p95_ms") or current["p95_ms"] is None:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append((name, before["p95_ms"], current["p95_ms"]))
+    return regressions
+
+
+def _print_result(name, result):
+    print(
+        f"{name:<16} {result['requests']:>6} req  {result['errors']:>4} err  "
+        f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  "
+        f"{result['throughput_rps']:>8.1f} req/s"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the FindMe API in process.")
+    parser.add_argument("--config", default="benchmark", help="config name passed to create_app")
+    parser.add_argument("--generate", type=int, metavar="REPORTS",
+                        help="replace the generated data with this many reports first")
+    parser.add_argument("--users", type=int, default=1000, help="users for --generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=200, help="timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads per scenario")
+    parser.add_argument("--scenario", action="append", dest="only",
+                        choices=[s.name for s in SCENARIOS], help="run only this scenario (repeatable)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p95 slowdown against the baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    app = create_app(args.config)
+
+    if args.generate:
+        with app.app_context():
+            db.create_all()
+            written = generate_dataset(
+                args.generate, args.users, seed=args.seed, reset=True,
+                progress=lambda table, count: print(f"  {table}: {count}", file=sys.stderr),
+            )
+        print(f"generated {written['reports']} reports and {written['users']} users", file=sys.stderr)
+
+    results = run_benchmarks(
+        app, args.iterations, args.warmup, args.concurrency, args.only, args.seed, log=_print_result
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: p95 {before:.2f} ms -> {after:.2f} ms", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
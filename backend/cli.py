@@ -0,0 +1,193 @@
+# cli.py
+# flask CLI commands, registered on the app in create_app
+
+import json
+
+import click
+from flask.cli import AppGroup
+
+from flask import current_app
+
+from controllers.alerts_controller import AlertsController
+from controllers.changes_controller import ChangesController
+from controllers.duplicates_controller import DuplicatesController
+from controllers.export_controller import EXPORT_FORMATS, ExportController
+from controllers.import_controller import FORMATS, IMPORT_BATCH_SIZE, ImportController, read_records
+from controllers.statistics_controller import StatisticsController
+from benchmarks.datagen import DEFAULT_BATCH_SIZE, clear_dataset, generate_dataset
+from models.geo import geocode_reports
+from models.user import User
+from utils.duplicate_matching import DUPLICATE_THRESHOLD
+from utils.photo_uploads import get_photo_uploads
+
+stats_cli = AppGroup('stats', help='Maintain the report statistics counters.')
+
+
+@stats_cli.command('reconcile')
+def reconcile_statistics():
+    """Correct the statistics counters and map tiles from the missing_persons table"""
+    corrected = StatisticsController.reconcile()
+    if corrected is None:
+        click.echo("another reconcile is running, skipped")
+    else:
+        click.echo(f"corrected {corrected} statistics counters")
+
+
+changes_cli = AppGroup('changes', help='Maintain the change feed log.')
+
+
+@changes_cli.command('compact')
+def compact_changes():
+    """Drop change log entries superseded by a later change to the same report"""
+    click.echo(f"removed {ChangesController.compact()} superseded changes")
+
+
+alerts_cli = AppGroup('alerts', help='Deliver saved-search alerts.')
+
+
+@alerts_cli.command('deliver')
+@click.option('--batch-size', default=100, show_default=True, help='Notifications sent per transaction.')
+def deliver_alerts(batch_size):
+    """Send every alert that is due through the configured outbox"""
+    outbox = current_app.extensions['alert_outbox']
+    totals = {'sent': 0, 'retrying': 0, 'failed': 0}
+    while True:
+        counts = AlertsController.deliver_pending(outbox, batch_size=batch_size)
+        for key, value in counts.items():
+            totals[key] += value
+        if sum(counts.values()) < batch_size:
+            break
+    click.echo(f"sent {totals['sent']} alerts, {totals['retrying']} to retry, {totals['failed']} failed")
+
+
+photos_cli = AppGroup('photos', help='Manage the background photo uploads.')
+
+
+@photos_cli.command('resume')
+def resume_photo_uploads():
+    """Upload photos left in the spool by a stopped or crashed server"""
+    uploads = get_photo_uploads(current_app)
+    resumed = uploads.resume()
+    uploads.wait()
+    click.echo(f"resumed {resumed} photo uploads")
+
+
+duplicates_cli = AppGroup('duplicates', help='Find reports filed more than once.')
+
+
+@duplicates_cli.command('scan')
+@click.option('--threshold', default=DUPLICATE_THRESHOLD, show_default=True,
+              help='Minimum match score (0-1) to link two reports.')
+@click.option('--status', default=None, help='Only scan reports with this status.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the clusters as JSON.')
+def scan_duplicates(threshold, status, as_json):
+    """Scan every report for clusters of likely duplicates"""
+    clusters = DuplicatesController.scan(threshold, status)
+    if as_json:
+        click.echo(json.dumps(clusters, indent=2))
+        return
+    for cluster in clusters:
+        best = cluster['pairs'][0]['score']
+        click.echo(f"reports {', '.join(map(str, cluster['report_ids']))} (best score {best})")
+    click.echo(f"found {len(clusters)} duplicate clusters")
+
+
+locations_cli = AppGroup('locations', help='Geocode report locations.')
+
+
+@locations_cli.command('geocode')
+@click.option('--all', 'everything', is_flag=True,
+              help='Re-geocode every report, not only those without coordinates.')
+def geocode_locations(everything):
+    """Fill in coordinates, county and geohash from the offline gazetteer"""
+    located = geocode_reports(only_missing=not everything)
+    click.echo(f"geocoded {located} reports")
+
+
+cases_cli = AppGroup('cases', help='Bulk load missing person reports.')
+
+
+@cases_cli.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--user', 'email', required=True, help='Email of the user the reports are filed under.')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default=None,
+              help='Input format; taken from the file extension when omitted.')
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True,
+              help='Rows validated and inserted per transaction.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the summary as JSON.')
+def import_cases(source, email, fmt, batch_size, as_json):
+    """Import reports from an NDJSON or CSV file ('-' reads stdin)"""
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        raise click.BadParameter(f"no user with email {email}", param_hint='--user')
+    if fmt is None:
+        fmt = 'csv' if source.name.lower().endswith('.csv') else 'ndjson'
+
+    summary = ImportController.import_records(read_records(source, fmt), user.id, batch_size)
+    if as_json:
+        click.echo(json.dumps(summary, indent=2))
+        return
+    for error in summary['errors']:
+        click.echo(f"line {error['line']}: {json.dumps(error['errors'])}", err=True)
+    if summary['errors_truncated']:
+        click.echo(f"... {summary['failed'] - len(summary['errors'])} more errors", err=True)
+    click.echo(f"imported {summary['imported']} reports, {summary['failed']} failed")
+
+
+@cases_cli.command('export')
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='csv', show_default=True)
+@click.option('--output', '-o', type=click.File('wb'), default='-', help='File to write (default stdout).')
+@click.option('--status', default=None, help='Only reports with this status.')
+@click.option('--county', default=None, help='Only reports geocoded to this county.')
+@click.option('--location', default=None, help='Only reports whose location text contains this.')
+@click.option('--date-from', default=None, help='Last seen on or after this ISO date.')
+@click.option('--date-to', default=None, help='Last seen on or before this ISO date.')
+@click.option('--fields', default=None, help='Comma separated fields to export (default all).')
+def export_cases(fmt, output, **filters):
+    """Export reports matching the filters as CSV, NDJSON or Parquet"""
+    params = {name: value for name, value in filters.items() if value}
+    try:
+        chunks = ExportController.export(params, fmt)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    for chunk in chunks:
+        output.write(chunk)
+
+
+data_cli = AppGroup('data', help='Synthetic data for load testing and benchmarks.')
+
+
+@data_cli.command('generate')
+@click.option('--reports', default=10000, show_default=True, help='Number of reports to generate.')
+@click.option('--users', default=1000, show_default=True, help='Number of users filing them.')
+@click.option('--seed', default=0, show_default=True, help='Random seed; the same seed gives the same data.')
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Rows inserted per transaction.')
+@click.option('--reset', is_flag=True, help='Replace previously generated data.')
+def generate_data(reports, users, seed, batch_size, reset):
+    """Bulk insert seeded synthetic users and reports"""
+    try:
+        written = generate_dataset(
+            reports, users, seed=seed, batch_size=batch_size, reset=reset,
+            progress=lambda table, count: click.echo(f"  {table}: {count}", err=True),
+        )
+    except ValueError as e:
+        raise click.UsageError(str(e))
+    click.echo(f"generated {written['reports']} reports and {written['users']} users")
+
+
+@data_cli.command('clear')
+def clear_data():
+    """Delete every generated user and report"""
+    click.echo(f"deleted {clear_dataset()} generated reports")
+
+
+def register_commands(app):
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(changes_cli)
+    app.cli.add_command(alerts_cli)
+    app.cli.add_command(photos_cli)
+    app.cli.add_command(duplicates_cli)
+    app.cli.add_command(locations_cli)
+    app.cli.add_command(cases_cli)
+    app.cli.add_command(data_cli)
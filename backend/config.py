@@ -1,12 +1,133 @@
 import os
+import tempfile
+from datetime import timedelta
+
+
+def engine_options(uri, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=1800):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the database behind `uri`. Connections are
+    checked before use (a failover or idle timeout otherwise surfaces as an
+    error on the next request) and replaced after `pool_recycle` seconds.
+    SQLite keeps the Flask-SQLAlchemy defaults.
+    """
+    if not uri or uri.startswith('sqlite'):
+        return {}
+    options = {
+        'pool_pre_ping': True,
+        'pool_recycle': pool_recycle,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+    }
+    return options
+
+
+def _env_list(name):
+    return [value.strip() for value in os.getenv(name, '').split(',') if value.strip()]
+
 
 class Config:
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     # use postgresql for team development
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # read replicas (comma separated DATABASE_REPLICA_URLS): GET requests to
+    # the read-only endpoints in models/routing.py are served from them
+    SQLALCHEMY_REPLICA_URLS = _env_list('DATABASE_REPLICA_URLS')
+    # after a write, the same user reads from the primary for this long, so
+    # they see their own changes despite replication lag. Who wrote when is
+    # kept per worker process unless a Redis URL is given to share it.
+    SQLALCHEMY_REPLICA_STICKY_SECONDS = 10
+    SQLALCHEMY_REPLICA_STICKY_REDIS_URL = os.getenv('REPLICA_STICKY_REDIS_URL')
+    # PostgreSQL statement timeout for transactions run while handling a
+    # request. CLI commands and background jobs (reconcile, scans, exports
+    # from the command line, migrations) are not limited.
+    REQUEST_STATEMENT_TIMEOUT_MS = 30000
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     CORS_HEADERS = 'Content-Type'
+    # one token format for every blueprint (flask_jwt_extended)
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
+    JWT_TOKEN_LOCATION = ['headers']
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    # verified token claims / user records cached per worker
+    AUTH_TOKEN_CACHE_SIZE = 4096
+    AUTH_USER_CACHE_SIZE = 1024
+    AUTH_USER_CACHE_TTL = 60  # seconds
+    # seconds between statistics reconcile runs in this process, None
+    # disables the job. Every worker (and CLI process) would run its own, so
+    # with several processes run `flask stats reconcile` from one cron job.
+    STATS_RECONCILE_INTERVAL = None
+    # bcrypt work factor (2^rounds iterations) and the hashing pool limits;
+    # requests beyond workers + max queue get a 503 straight away
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0)) or None  # None = one per CPU
+    PASSWORD_HASH_MAX_QUEUE = 32
+    PASSWORD_HASH_TIMEOUT = 10  # seconds
+    # report photos: 'cloudinary' or 'local' (files under PHOTO_LOCAL_DIR)
+    PHOTO_STORAGE = os.getenv('PHOTO_STORAGE', 'cloudinary')
+    PHOTO_LOCAL_DIR = os.path.join(BASE_DIR, 'media')
+    PHOTO_LOCAL_BASE_URL = '/media/'
+    # photos wait here until a background worker has uploaded them
+    PHOTO_SPOOL_DIR = os.getenv('PHOTO_SPOOL_DIR', os.path.join(BASE_DIR, 'spool', 'photos'))
+    PHOTO_UPLOAD_WORKERS = 4
+    PHOTO_UPLOAD_RETRIES = 3
+    PHOTO_UPLOAD_RETRY_DELAY = 2  # seconds, doubled after every failed attempt
+    # thumbnails and web-sized copies: WEBP or JPEG
+    PHOTO_VARIANT_FORMAT = 'WEBP'
+    PHOTO_VARIANT_QUALITY = 80
+    # fuzzy name search without pg_trgm (sqlite): seconds between syncs of
+    # the in-memory name index, and between full rebuilds of it
+    NAME_INDEX_SYNC_INTERVAL = 5
+    NAME_INDEX_REBUILD_INTERVAL = 3600
+    # sighting matcher: same for the in-memory feature index of open cases
+    MATCH_INDEX_SYNC_INTERVAL = 5
+    MATCH_INDEX_REBUILD_INTERVAL = 3600
+    # bulk imports: rows validated and inserted per transaction
+    IMPORT_BATCH_SIZE = 1000
+    # request timing, SQL counts, N+1 warnings, sampled profiles and
+    # /metrics; off unless asked for
+    INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', '').lower() in ('1', 'true', 'yes')
+    INSTRUMENTATION_SLOW_REQUEST_MS = int(os.getenv('INSTRUMENTATION_SLOW_REQUEST_MS', 500))
+    # share of requests run under cProfile; profiles of the slow ones are kept
+    INSTRUMENTATION_PROFILE_SAMPLE_RATE = float(os.getenv('INSTRUMENTATION_PROFILE_SAMPLE_RATE', 0))
+    INSTRUMENTATION_PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+    # one statement run this many times in a request is logged as a likely N+1
+    INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 10
+
+    # change feed: leave out changes younger than this, so a transaction
+    # that commits after a later one is not skipped by polling clients.
+    # This only covers transactions that commit within the window after
+    # writing their change log entry (changed_at is the app server's clock
+    # at flush time). A slower one, or a server whose clock runs behind,
+    # can still be skipped; raise it if writes hold transactions open longer.
+    CHANGE_FEED_SETTLE_SECONDS = int(os.getenv('CHANGE_FEED_SETTLE_SECONDS', 2))
+    # push stream of report changes (/api/missing-persons/stream): 'memory'
+    # reaches this worker's clients only, 'redis' shares events across workers
+    EVENT_BROKER = os.getenv('EVENT_BROKER', 'memory')
+    EVENT_BROKER_URL = os.getenv('EVENT_BROKER_URL', 'redis://localhost:6379/0')
+    EVENT_QUEUE_SIZE = 100         # undelivered events per client before it must resync
+    EVENT_MAX_SUBSCRIBERS = 1000   # open streams per worker
+    EVENT_HEARTBEAT_SECONDS = 15
+    # saved-search alerts: matched when a report is created, queued in
+    # alert_notifications and sent through ALERT_OUTBOX ('log', 'webhook'
+    # to ALERT_WEBHOOK_URL, 'memory') by `flask alerts deliver` or, every
+    # ALERT_DELIVERY_INTERVAL seconds, by a background thread
+    ALERTS_ENABLED = True
+    ALERT_OUTBOX = os.getenv('ALERT_OUTBOX', 'log')
+    ALERT_WEBHOOK_URL = os.getenv('ALERT_WEBHOOK_URL')
+    ALERT_DELIVERY_INTERVAL = None
+    # seconds between full rebuilds of each worker's in-memory index of
+    # saved searches (in between, only newly stamped ones are read)
+    ALERT_INDEX_REBUILD_INTERVAL = 300
+    # ETag / Last-Modified / 304s on the public read endpoints, with the
+    # rendered responses kept in RESPONSE_CACHE: 'memory' (per worker),
+    # 'redis' (shared, at RESPONSE_CACHE_REDIS_URL) or '' for validators only
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'memory')
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    RESPONSE_CACHE_SIZE = 512   # responses, memory backend
+    RESPONSE_CACHE_TTL = 300    # seconds
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -15,12 +136,52 @@ class DevelopmentConfig(Config):
     CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
     CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
 
+class TestingConfig(Config):
+    DEBUG = False
+    TESTING = True
+    # in-memory sqlite keeps the test suite independent of a local postgres
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLALCHEMY_REPLICA_URLS = []
+    HTTP_CACHE_ENABLED = False
+    CHANGE_FEED_SETTLE_SECONDS = 0
+    ALERT_OUTBOX = 'memory'
+    BCRYPT_LOG_ROUNDS = 4  # minimum, keeps the suite fast
+    PHOTO_STORAGE = 'local'
+    PHOTO_LOCAL_DIR = os.path.join(tempfile.gettempdir(), 'findme-test', 'media')
+    PHOTO_SPOOL_DIR = os.path.join(tempfile.gettempdir(), 'findme-test', 'spool')
+    PHOTO_UPLOAD_RETRY_DELAY = 0
+    NAME_INDEX_SYNC_INTERVAL = 0
+    MATCH_INDEX_SYNC_INTERVAL = 0
+
+class BenchmarkConfig(Config):
+    # production-like settings against DATABASE_URL (python -m benchmarks.run)
+    DEBUG = False
+    TESTING = False
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'DATABASE_URL', 'sqlite:///' + os.path.join(Config.BASE_DIR, 'benchmark.db')
+    )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    PHOTO_STORAGE = 'local'
+
 class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
+    ALERT_DELIVERY_INTERVAL = 10
+    # per worker process: size pool_size + max_overflow below max_connections / workers
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(
+        Config.SQLALCHEMY_DATABASE_URI,
+        pool_size=int(os.getenv('DB_POOL_SIZE', 10)),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    )
+    REQUEST_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 5000))
 
 config = {
     'development': DevelopmentConfig,
+    'testing': TestingConfig,
     'production': ProductionConfig,
+    'benchmark': BenchmarkConfig,
     'default': DevelopmentConfig
 }
\ No newline at end of file
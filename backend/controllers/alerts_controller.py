@@ -0,0 +1,180 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models.db import db
+from models.alert import AlertNotification, AlertSubscription, FAILED, PENDING, SENT
+from models.missing_person import MissingPerson
+from models.user import User
+from utils.alert_matching import compile_filters
+
+# Saved searches one user may keep
+MAX_SUBSCRIPTIONS_PER_USER = 20
+# Notifications sent per delivery round
+DELIVERY_BATCH_SIZE = 100
+# Attempts before a notification is given up on
+MAX_DELIVERY_ATTEMPTS = 5
+# Seconds before the first retry, doubled on each further failure
+RETRY_DELAY = 30
+# Seconds a claimed batch is left to its worker before others may take it;
+# longer than sending a full batch to a slow outbox takes
+DELIVERY_LEASE = 1800
+
+
+class AlertsController:
+    @staticmethod
+    def create_subscription(user_id, data):
+        """
+        Save a search to be alerted about.
+        Args:
+            user_id (int): owner
+            data (dict): {'name': str, 'filters': {search parameters}}
+        Returns:
+            dict: the saved subscription
+        Raises:
+            ValueError: for a missing name, bad filters or too many subscriptions
+        """
+        name = (data.get('name') or '').strip()
+        if not name:
+            raise ValueError("name is required")
+        filters = data.get('filters')
+        compile_filters(filters)
+
+        active = AlertSubscription.query.filter_by(user_id=user_id, active=True).count()
+        if active >= MAX_SUBSCRIPTIONS_PER_USER:
+            raise ValueError(f"at most {MAX_SUBSCRIPTIONS_PER_USER} alerts per user")
+
+        subscription = AlertSubscription(user_id=user_id, name=name[:100], filters=filters)
+        db.session.add(subscription)
+        db.session.commit()
+        return subscription.to_dict()
+
+    @staticmethod
+    def list_subscriptions(user_id):
+        subscriptions = AlertSubscription.query.filter_by(user_id=user_id, active=True) \
+            .order_by(AlertSubscription.id).all()
+        return [s.to_dict() for s in subscriptions]
+
+    @staticmethod
+    def delete_subscription(user_id, subscription_id):
+        """Deactivate one of the user's subscriptions. Returns False if there is none."""
+        subscription = AlertSubscription.query.filter_by(
+            id=subscription_id, user_id=user_id, active=True
+        ).first()
+        if subscription is None:
+            return False
+        subscription.active = False
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def list_notifications(user_id, limit=50):
+        """The user's most recent alerts, newest first"""
+        notifications = AlertNotification.query.filter_by(user_id=user_id) \
+            .order_by(AlertNotification.id.desc()).limit(max(1, min(limit, 100))).all()
+        return [n.to_dict() for n in notifications]
+
+    @staticmethod
+    def deliver_pending(outbox, batch_size=DELIVERY_BATCH_SIZE, max_attempts=MAX_DELIVERY_ATTEMPTS,
+                        retry_delay=RETRY_DELAY, lease=DELIVERY_LEASE):
+        """
+        Send one batch of due notifications through `outbox`. The batch is
+        claimed in a short transaction (with SKIP LOCKED on PostgreSQL) that
+        leases it for `lease` seconds, so other workers pass over it; the
+        messages are sent with no transaction open, and the results are
+        recorded in a second one. Notifications of a worker that dies in
+        between become due again when the lease runs out.
+        Returns:
+            dict: {'sent', 'retrying', 'failed'} counts for the batch
+        """
+        now = datetime.utcnow()
+        query = AlertNotification.query.filter(
+            AlertNotification.status == PENDING,
+            AlertNotification.next_attempt_at <= now,
+        ).order_by(AlertNotification.id).limit(batch_size)
+        if db.session.get_bind().dialect.name == 'postgresql':
+            query = query.with_for_update(skip_locked=True)
+        batch = query.all()
+        counts = {'sent': 0, 'retrying': 0, 'failed': 0}
+        if not batch:
+            db.session.commit()
+            return counts
+
+        # everything the messages need, in three queries
+        subscriptions = {s.id: s for s in AlertSubscription.query.filter(
+            AlertSubscription.id.in_({n.subscription_id for n in batch}))}
+        users = {u.id: u for u in User.query.filter(User.id.in_({n.user_id for n in batch}))}
+        reports = {p.id: p for p in MissingPerson.query.filter(
+            MissingPerson.id.in_({n.person_id for n in batch}))}
+
+        messages = {}
+        for notification in batch:
+            subscription = subscriptions.get(notification.subscription_id)
+            user = users.get(notification.user_id)
+            report = reports.get(notification.person_id)
+            if subscription is None or not subscription.active or user is None or report is None:
+                # unsubscribed, or the report was deleted, before delivery
+                notification.status = FAILED
+                notification.last_error = "subscription or report no longer exists"
+                counts['failed'] += 1
+                continue
+            messages[notification.id] = {
+                'notification_id': notification.id,
+                'user': {'id': user.id, 'name': user.name, 'email': user.email},
+                'subscription': {'id': subscription.id, 'name': subscription.name},
+                'report': report.to_dict(),
+            }
+            notification.next_attempt_at = now + timedelta(seconds=lease)
+        db.session.commit()
+
+        errors = {}
+        for notification_id, message in messages.items():
+            try:
+                outbox.send(message)
+            except Exception as e:
+                errors[notification_id] = str(e)[:500]
+        if not messages:
+            return counts
+
+        now = datetime.utcnow()
+        for notification in AlertNotification.query.filter(AlertNotification.id.in_(messages)):
+            notification.attempts += 1
+            error = errors.get(notification.id)
+            if error is None:
+                notification.status = SENT
+                notification.sent_at = now
+                counts['sent'] += 1
+            elif notification.attempts >= max_attempts:
+                notification.last_error = error
+                notification.status = FAILED
+                counts['failed'] += 1
+            else:
+                notification.last_error = error
+                notification.next_attempt_at = now + timedelta(
+                    seconds=retry_delay * 2 ** (notification.attempts - 1)
+                )
+                counts['retrying'] += 1
+        db.session.commit()
+        return counts
+
+    @staticmethod
+    def start_delivery_job(app, interval):
+        """Deliver due notifications every `interval` seconds on a daemon thread"""
+        def run():
+            while True:
+                time.sleep(interval)
+                with app.app_context():
+                    try:
+                        outbox = app.extensions['alert_outbox']
+                        # keep going while full batches come back
+                        while sum(AlertsController.deliver_pending(outbox).values()) >= DELIVERY_BATCH_SIZE:
+                            pass
+                    except Exception:
+                        db.session.rollback()
+                        app.logger.exception("alert delivery failed")
+                    finally:
+                        db.session.remove()
+
+        thread = threading.Thread(target=run, name="alert-delivery", daemon=True)
+        thread.start()
+        return thread
@@ -20,14 +20,7 @@ def validate_user_data(name, email, password):
 
 def generate_token(user_id, email):
     """generate jwt token for authenticated users"""
-    import jwt
-    import datetime
+    from flask_jwt_extended import create_access_token
     
-    SECRET_KEY = "findme-secret-key-2024"
-    
-    # create token with user information and expiration
-    return jwt.encode({
-        'user_id': user_id,
-        'email': email,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-    }, SECRET_KEY, algorithm='HS256')
+    # same token format as utils.auth.issue_token, expiry from JWT_ACCESS_TOKEN_EXPIRES
+    return create_access_token(identity=user_id, additional_claims={'email': email})
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+
+from models.db import db
+from models.change_log import ChangeLog, DELETE, UPSERT
+from models.missing_person import MissingPerson, parse_fields, project, serialize_rows
+from utils.pagination import InvalidCursor
+
+# Changes returned per request unless the client asks for fewer
+DEFAULT_CHANGES_LIMIT = 500
+MAX_CHANGES_LIMIT = 1000
+
+
+class ChangesController:
+    @staticmethod
+    def resolve_since(since):
+        """
+        Turn a `since` parameter into the sequence number to start after.
+        Accepts a number returned as next_since earlier, an ISO timestamp,
+        or nothing (everything from the start of the log).
+        Raises:
+            InvalidCursor: if it is neither
+        """
+        if not since:
+            return 0
+        if since.isdigit():
+            return int(since)
+        try:
+            moment = datetime.fromisoformat(since.replace('Z', '+00:00'))
+        except ValueError:
+            raise InvalidCursor("since must be a change sequence number or an ISO timestamp")
+        if moment.tzinfo is not None:
+            # stored times are naive UTC
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        last_before = db.session.query(func.max(ChangeLog.id)).filter(ChangeLog.changed_at < moment).scalar()
+        return last_before or 0
+
+    @staticmethod
+    def get_changes(since=None, limit=DEFAULT_CHANGES_LIMIT, fields=None, user_id=None, settle_seconds=0):
+        """
+        Reports created, updated or deleted after `since`, oldest change first.
+        A report changed several times appears once, with its current data.
+        Args:
+            since (str): next_since from the previous call, an ISO timestamp,
+                or None to start from the beginning (a full sync)
+            limit (int): change log entries read, capped at MAX_CHANGES_LIMIT
+            fields (str): comma separated fields of upserted reports, None for all
+            user_id (int): only changes to reports filed by this user
+            settle_seconds (int): stop at the first change younger than this,
+                so a transaction that took a sequence number earlier but
+                commits later (within the window) is not skipped
+        Returns:
+            dict: changes ({'seq', 'op', 'id', 'data'}), next_since and has_more
+        Raises:
+            InvalidCursor: if `since` is not understood
+            ValueError: if an unknown field is requested
+        """
+        fields = parse_fields(fields)
+        after = ChangesController.resolve_since(since)
+        limit = max(1, min(limit, MAX_CHANGES_LIMIT))
+
+        query = db.session.query(ChangeLog.id, ChangeLog.person_id, ChangeLog.operation).filter(ChangeLog.id > after)
+        if user_id is not None:
+            query = query.filter(ChangeLog.user_id == user_id)
+        if settle_seconds:
+            # Stop before the first entry younger than the window. Sequence
+            # numbers and timestamps need not be in the same order, so
+            # skipping young entries while returning later numbers would move
+            # next_since past them for good.
+            cutoff = datetime.utcnow() - timedelta(seconds=settle_seconds)
+            unsettled = db.session.query(func.min(ChangeLog.id)).filter(
+                ChangeLog.id > after, ChangeLog.changed_at > cutoff
+            ).scalar()
+            if unsettled is not None:
+                query = query.filter(ChangeLog.id < unsettled)
+        entries = query.order_by(ChangeLog.id).limit(limit + 1).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        # only the last change to each report in this page matters
+        latest = {}
+        for seq, person_id, operation in entries:
+            latest[person_id] = (seq, operation)
+
+        upserted = [person_id for person_id, (_, operation) in latest.items() if operation == UPSERT]
+        current = {}
+        if upserted:
+            rows = project(MissingPerson.query.filter(MissingPerson.id.in_(upserted)), fields).all()
+            current = {data['id']: data for data in serialize_rows(rows, fields)}
+
+        changes = []
+        for person_id, (seq, operation) in sorted(latest.items(), key=lambda item: item[1][0]):
+            data = current.get(person_id)
+            if operation == UPSERT and data is not None:
+                changes.append({'seq': seq, 'op': UPSERT, 'id': person_id, 'data': data})
+            else:
+                # deleted, possibly after this page's upsert
+                changes.append({'seq': seq, 'op': DELETE, 'id': person_id})
+
+        return {
+            'changes': changes,
+            'next_since': entries[-1][0] if entries else after,
+            'has_more': has_more,
+        }
+
+    @staticmethod
+    def compact():
+        """
+        Delete every log entry superseded by a later one for the same report.
+        Clients still see each report's latest change (tombstones included),
+        so any since value stays valid while the log shrinks to one entry per
+        report. Returns the number of entries deleted.
+        """
+        newer = aliased(ChangeLog)
+        superseded = db.session.query(newer.id).filter(
+            newer.person_id == ChangeLog.person_id, newer.id > ChangeLog.id
+        ).exists()
+        deleted = ChangeLog.query.filter(superseded).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
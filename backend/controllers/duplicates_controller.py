@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from sqlalchemy import or_, select
+
+from models.db import db
+from models.missing_person import MissingPerson
+from models.name_search import apply_fuzzy_name_search
+from utils.duplicate_matching import (
+    AGE_TOLERANCE,
+    DATE_WINDOW_DAYS,
+    DUPLICATE_THRESHOLD,
+    find_clusters,
+    match_score,
+)
+
+# Columns the matcher needs, and what is returned for each candidate
+MATCH_COLUMNS = (
+    MissingPerson.id,
+    MissingPerson.case_number,
+    MissingPerson.full_name,
+    MissingPerson.age,
+    MissingPerson.gender,
+    MissingPerson.last_seen_location,
+    MissingPerson.last_seen_date,
+    MissingPerson.status,
+)
+
+# Most candidates returned for a single report
+MAX_CANDIDATES = 10
+
+# Rows fetched per round trip during a batch scan
+SCAN_BATCH_SIZE = 1000
+
+
+class DuplicatesController:
+    @staticmethod
+    def find_candidates(person, threshold=DUPLICATE_THRESHOLD, limit=MAX_CANDIDATES):
+        """
+        Existing reports that may describe the same person as `person`.
+        Only reports with a similar name (served by the fuzzy name index)
+        and a compatible gender, age and last seen date are scored.
+        Args:
+            person (MissingPerson): report to check, may be unsaved
+            threshold (float): minimum match score
+            limit (int): most candidates to return
+        Returns:
+            list: [{id, case_number, full_name, status, score}] best first
+        """
+        query = MissingPerson.query
+        if person.id is not None:
+            query = query.filter(MissingPerson.id != person.id)
+        if person.gender:
+            query = query.filter(or_(MissingPerson.gender.is_(None), MissingPerson.gender == person.gender))
+        if person.age is not None:
+            query = query.filter(or_(
+                MissingPerson.age.is_(None),
+                MissingPerson.age.between(person.age - AGE_TOLERANCE, person.age + AGE_TOLERANCE),
+            ))
+        if person.last_seen_date:
+            window = timedelta(days=DATE_WINDOW_DAYS)
+            query = query.filter(MissingPerson.last_seen_date.between(
+                person.last_seen_date - window, person.last_seen_date + window
+            ))
+        # last, so the name matches are narrowed by the filters above
+        query, _ = apply_fuzzy_name_search(query, person.full_name)
+
+        candidates = []
+        for row in query.with_entities(*MATCH_COLUMNS):
+            score = match_score(person, row)
+            if score >= threshold:
+                candidates.append({
+                    "id": row.id,
+                    "case_number": row.case_number,
+                    "full_name": row.full_name,
+                    "status": row.status,
+                    "score": round(score, 3),
+                })
+        candidates.sort(key=lambda c: (-c["score"], c["id"]))
+        return candidates[:limit]
+
+    @staticmethod
+    def scan(threshold=DUPLICATE_THRESHOLD, status=None):
+        """
+        Find clusters of likely duplicate reports across the whole table.
+        Args:
+            threshold (float): minimum match score to link two reports
+            status (str): only scan reports with this status
+        Returns:
+            list: clusters, see utils.duplicate_matching.find_clusters
+        """
+        stmt = select(*MATCH_COLUMNS).execution_options(yield_per=SCAN_BATCH_SIZE)
+        if status:
+            stmt = stmt.where(MissingPerson.status == status)
+        return find_clusters(db.session.execute(stmt), threshold)
@@ -0,0 +1,146 @@
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+
+import orjson
+
+from models.missing_person import MissingPerson, parse_fields, project, row_serializer
+from controllers.search_controller import SearchController
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet')
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Rows fetched per round trip (a server-side cursor on PostgreSQL), and so
+# the most rows held in memory at once
+EXPORT_BATCH_SIZE = 1000
+
+# Rows per Parquet row group; larger groups compress and scan better
+PARQUET_ROW_GROUP_SIZE = 10000
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _arrow_schema(fields):
+    import pyarrow as pa
+
+    types = {int: pa.int64(), float: pa.float64(), datetime: pa.timestamp('us'), str: pa.string()}
+    return pa.schema([
+        (name, types[getattr(MissingPerson, name).type.python_type]) for name in fields
+    ])
+
+
+class ExportController:
+    @staticmethod
+    def export(params, fmt, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Every report matching the search filters in `params`, encoded as
+        `fmt`, as a generator of byte chunks in id order. Rows are read
+        `batch_size` at a time as plain tuples (no ORM objects), so the memory
+        used does not grow with the number of rows exported.
+        Args:
+            params (dict): search filters, as for SearchController.search_missing_persons,
+                plus `fields`; paging and sort parameters are ignored
+            fmt (str): csv, ndjson or parquet
+            batch_size (int): rows fetched per round trip
+        Returns:
+            generator of bytes
+        Raises:
+            ValueError: for an unknown format, field or filter value, before
+                anything is generated
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+        if fmt == 'parquet':
+            # optional dependency, only needed for this format
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ValueError("parquet export needs pyarrow installed")
+
+        fields = parse_fields(params.get('fields'))
+        query, _, _ = SearchController.build_query(params)
+        rows = project(query, fields).order_by(MissingPerson.id).yield_per(batch_size)
+
+        if fmt == 'csv':
+            return ExportController._csv(rows, fields, batch_size)
+        if fmt == 'ndjson':
+            return ExportController._ndjson(rows, fields, batch_size)
+        return ExportController._parquet(rows, fields)
+
+    @staticmethod
+    def _csv(rows, fields, batch_size):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for batch in _batches(rows, batch_size):
+            writer.writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row]
+                for row in batch
+            )
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        # header only, for an empty export
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    @staticmethod
+    def _ndjson(rows, fields, batch_size):
+        serialize = row_serializer(fields)
+        for batch in _batches(rows, batch_size):
+            yield b''.join(
+                orjson.dumps(serialize(row), option=orjson.OPT_APPEND_NEWLINE) for row in batch
+            )
+
+    @staticmethod
+    def _parquet(rows, fields):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _arrow_schema(fields)
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        for batch in _batches(rows, PARQUET_ROW_GROUP_SIZE):
+            columns = [pa.array(column, type=schema.field(i).type) for i, column in enumerate(zip(*batch))]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
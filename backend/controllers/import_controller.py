@@ -0,0 +1,170 @@
+import csv
+import json
+
+from marshmallow import EXCLUDE, ValidationError
+from sqlalchemy.exc import IntegrityError
+
+from models.db import db
+from models.missing_person import MissingPerson
+from schemas.missing_person_schema import MissingPersonSchema
+
+FORMATS = ('ndjson', 'csv')
+
+# Rows validated and inserted per transaction
+IMPORT_BATCH_SIZE = 1000
+
+# Row errors kept for the summary; the count of failed rows is always exact
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_ndjson(lines):
+    """
+    (line number, record, error) for each non-blank line of an NDJSON
+    stream; record is None when the line is not a JSON object.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, {'_line': [f"invalid JSON: {e}"]}
+            continue
+        if not isinstance(record, dict):
+            yield number, None, {'_line': ["expected a JSON object"]}
+            continue
+        yield number, record, None
+
+
+def read_csv(lines):
+    """
+    (line number, record, error) for each row of a CSV stream with a header
+    row. Empty cells are left out, so optional columns can be blank.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        if None in row:
+            yield reader.line_num, None, {'_line': ["more cells than header columns"]}
+            continue
+        record = {key: value for key, value in row.items() if value not in (None, '')}
+        if record:
+            yield reader.line_num, record, None
+
+
+def read_records(lines, fmt):
+    """
+    Raises:
+        ValueError: for an unknown format
+    """
+    if fmt == 'ndjson':
+        return read_ndjson(lines)
+    if fmt == 'csv':
+        return read_csv(lines)
+    raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+
+
+class ImportSummary:
+    """Running totals of one import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line, case_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'case_number': case_number, 'errors': errors})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+class ImportController:
+    @staticmethod
+    def import_records(records, user_id, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Validate and insert reports from an iterable of (line number, record,
+        error) tuples, as produced by read_records(). Rows are handled
+        `batch_size` at a time, each batch in one transaction, so memory is
+        bounded by the batch size rather than the size of the input. Invalid
+        rows are reported and skipped; they never fail the rest of the import.
+        Args:
+            records: iterable of (line, dict or None, error dict or None)
+            user_id (int): user the imported reports are filed under
+            batch_size (int): rows per transaction
+        Returns:
+            dict: {'imported', 'failed', 'errors': [{line, case_number, errors}],
+                'errors_truncated'}
+        """
+        summary = ImportSummary()
+        schema = MissingPersonSchema(many=True, unknown=EXCLUDE)
+
+        batch = []
+        for line, record, error in records:
+            if error:
+                summary.fail(line, None, error)
+                continue
+            batch.append((line, record))
+            if len(batch) >= batch_size:
+                ImportController._import_batch(batch, schema, user_id, summary)
+                batch = []
+        if batch:
+            ImportController._import_batch(batch, schema, user_id, summary)
+
+        return summary.to_dict()
+
+    @staticmethod
+    def _import_batch(batch, schema, user_id, summary):
+        try:
+            loaded = schema.load([record for _, record in batch])
+            rows = list(zip([line for line, _ in batch], loaded))
+        except ValidationError as e:
+            # messages are keyed by position in the batch; reload the rest
+            for index in e.messages:
+                line, record = batch[index]
+                summary.fail(line, record.get('case_number'), e.messages[index])
+            valid = [item for index, item in enumerate(batch) if index not in e.messages]
+            rows = list(zip([line for line, _ in valid], schema.load([record for _, record in valid])))
+
+        # case_number is unique: check the batch against the table (which
+        # holds the earlier batches) in one query, and against itself
+        numbers = [data['case_number'] for _, data in rows]
+        existing = {
+            number for (number,) in db.session.query(MissingPerson.case_number)
+            .filter(MissingPerson.case_number.in_(numbers))
+        }
+        seen = set()
+        people = []
+        for line, data in rows:
+            number = data['case_number']
+            if number in existing or number in seen:
+                summary.fail(line, number, {'case_number': ["case number already exists"]})
+                continue
+            seen.add(number)
+            people.append((line, MissingPerson(user_id=user_id, **data)))
+
+        if not people:
+            return
+        try:
+            db.session.add_all([person for _, person in people])
+            db.session.commit()
+            summary.imported += len(people)
+        except IntegrityError:
+            # a concurrent writer took a case number; insert one at a time
+            # so only the conflicting rows fail
+            db.session.rollback()
+            for line, person in people:
+                try:
+                    db.session.add(person)
+                    db.session.commit()
+                    summary.imported += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    summary.fail(line, person.case_number,
+                                 {'case_number': ["case number already exists"]})
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from sqlalchemy import func, or_
+
+from models.db import db
+from models.case_tile import CaseTile, TILE_PRECISIONS
+from utils import geohash
+
+# Highest map zoom level at which each tile precision is used; deeper zooms
+# use the finest precision
+ZOOM_PRECISIONS = ((2, 1), (4, 2), (7, 3), (9, 4))
+
+MAX_ZOOM = 22
+
+
+def precision_for_zoom(zoom):
+    """Geohash precision whose cells cluster well at a web map zoom level"""
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}")
+    for max_zoom, precision in ZOOM_PRECISIONS:
+        if zoom <= max_zoom:
+            return precision
+    return TILE_PRECISIONS[-1]
+
+
+class MapController:
+    @staticmethod
+    def get_clusters(params):
+        """
+        Report counts clustered by geohash cell for one map view, read from
+        the case_tiles aggregate.
+        Args:
+            params (dict): zoom (required), bbox (min_lon,min_lat,max_lon,max_lat),
+                status, date_from, date_to
+        Returns:
+            dict: {'zoom', 'precision', 'total', 'clusters': [{cell, count,
+                latitude, longitude}]} with the centroid of each cluster
+        Raises:
+            ValueError: missing or malformed parameters
+        """
+        if params.get('zoom') in (None, ''):
+            raise ValueError("zoom is required")
+        zoom = int(params['zoom'])
+        precision = precision_for_zoom(zoom)
+
+        count = func.sum(CaseTile.count)
+        query = db.session.query(
+            CaseTile.cell,
+            count,
+            func.sum(CaseTile.latitude_sum),
+            func.sum(CaseTile.longitude_sum),
+        ).filter(CaseTile.precision == precision)
+
+        if params.get('bbox'):
+            parts = [float(v) for v in params['bbox'].split(',')]
+            if len(parts) != 4:
+                raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+            min_lon, min_lat, max_lon, max_lat = parts
+            if min_lat > max_lat or min_lon > max_lon:
+                raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+            ranges = []
+            for prefix in geohash.cover(min_lat, min_lon, max_lat, max_lon, max_precision=precision):
+                upper = prefix + "z" * (precision - len(prefix))
+                ranges.append(CaseTile.cell.between(prefix, upper))
+            query = query.filter(or_(*ranges))
+
+        if params.get('status'):
+            query = query.filter(CaseTile.status == params['status'])
+
+        if params.get('date_from'):
+            query = query.filter(CaseTile.day >= datetime.fromisoformat(params['date_from']).date())
+
+        if params.get('date_to'):
+            query = query.filter(CaseTile.day <= datetime.fromisoformat(params['date_to']).date())
+
+        clusters = [
+            {
+                'cell': cell,
+                'count': total,
+                'latitude': round(lat_sum / total, 5),
+                'longitude': round(lon_sum / total, 5),
+            }
+            for cell, total, lat_sum, lon_sum in query.group_by(CaseTile.cell).having(count > 0)
+        ]
+        clusters.sort(key=lambda c: c['cell'])
+
+        return {
+            'zoom': zoom,
+            'precision': precision,
+            'total': sum(c['count'] for c in clusters),
+            'clusters': clusters,
+        }
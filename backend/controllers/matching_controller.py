@@ -0,0 +1,122 @@
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select
+
+from models.db import db
+from models.missing_person import MissingPerson, parse_fields, project, serialize_rows
+from utils.sighting_matching import CaseFeatureIndex
+
+# Columns the feature index is built from
+FEATURE_COLUMNS = (
+    MissingPerson.id,
+    MissingPerson.status,
+    MissingPerson.age,
+    MissingPerson.gender,
+    MissingPerson.height,
+    MissingPerson.weight,
+    MissingPerson.hair_color,
+    MissingPerson.eye_color,
+    MissingPerson.distinguishing_features,
+    MissingPerson.last_seen_wearing,
+    MissingPerson.last_seen_location,
+    MissingPerson.latitude,
+    MissingPerson.longitude,
+    MissingPerson.last_seen_date,
+    MissingPerson.updated_at,
+)
+
+# Sighting attributes accepted by the matcher
+SIGHTING_FIELDS = (
+    "age", "age_min", "age_max", "gender", "height", "weight", "hair_color",
+    "eye_color", "description", "wearing", "location", "seen_date",
+)
+
+DEFAULT_MATCHES = 20
+MAX_MATCHES = 100
+
+# Rows fetched per round trip while building the index
+LOAD_BATCH_SIZE = 1000
+
+
+def _load(index, since=None):
+    stmt = select(*FEATURE_COLUMNS).execution_options(yield_per=LOAD_BATCH_SIZE)
+    if since is None:
+        stmt = stmt.where(MissingPerson.status == "missing")
+    else:
+        # every changed row, so cases that were found get deactivated
+        stmt = stmt.where(MissingPerson.updated_at >= since)
+    for row in db.session.execute(stmt):
+        index.upsert(row)
+        if row.updated_at is not None and (index.synced_until is None or row.updated_at > index.synced_until):
+            index.synced_until = row.updated_at
+
+
+def get_case_index():
+    """
+    The app's feature index of open cases. Rows changed since the last sync
+    are folded in at most every MATCH_INDEX_SYNC_INTERVAL seconds; the index
+    is rebuilt every MATCH_INDEX_REBUILD_INTERVAL seconds to drop deleted
+    reports and compact deactivated rows.
+    """
+    index = current_app.extensions.get("case_index")
+    now = time.monotonic()
+    if index is None or now - index.built_at >= current_app.config.get("MATCH_INDEX_REBUILD_INTERVAL", 3600):
+        index = CaseFeatureIndex()
+        _load(index)
+        index.built_at = index.checked_at = now
+        current_app.extensions["case_index"] = index
+        return index
+
+    if now - index.checked_at >= current_app.config.get("MATCH_INDEX_SYNC_INTERVAL", 5):
+        with index.lock:
+            _load(index, since=index.synced_until or datetime.min)
+            index.checked_at = now
+    return index
+
+
+class MatchingController:
+    @staticmethod
+    def match_sighting(data):
+        """
+        Rank open missing person cases against a description of someone who
+        was found or sighted.
+        Args:
+            data (dict): sighting attributes (see SIGHTING_FIELDS), plus
+                optional limit and fields
+        Returns:
+            dict: {'results': [case fields + score], 'searched': open cases}
+        Raises:
+            ValueError: nothing to match on, or malformed values
+        """
+        fields = parse_fields(data.get("fields"))
+        limit = min(int(data.get("limit", DEFAULT_MATCHES)), MAX_MATCHES)
+        if limit < 1:
+            raise ValueError("limit must be positive")
+
+        sighting = {key: data[key] for key in SIGHTING_FIELDS if data.get(key) not in (None, "")}
+        if not sighting:
+            raise ValueError(f"describe the person using any of: {', '.join(SIGHTING_FIELDS)}")
+        for key in ("age", "age_min", "age_max"):
+            if key in sighting:
+                if not isinstance(sighting[key], (int, str)):
+                    raise ValueError(f"{key} must be a number")
+                sighting[key] = int(sighting[key])
+        if "seen_date" in sighting:
+            if not isinstance(sighting["seen_date"], str):
+                raise ValueError("seen_date must be an ISO date string")
+            sighting["seen_date"] = datetime.fromisoformat(sighting["seen_date"])
+
+        index = get_case_index()
+        matches = index.match(sighting, limit)
+        scores = dict(matches)
+
+        # deleted since the last rebuild -> simply not returned
+        rows = project(MissingPerson.query, fields).filter(MissingPerson.id.in_(scores)).all()
+        results = serialize_rows(rows, fields)
+        for result in results:
+            result["score"] = round(scores[result["id"]], 3)
+        results.sort(key=lambda r: (-r["score"], r["id"]))
+
+        return {"results": results, "searched": len(index)}
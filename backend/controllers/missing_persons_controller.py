@@ -1,8 +1,25 @@
 #Controller for MissingPerson CRUD operations
-from models.missing_person import MissingPerson
-from app import db
+import orjson
+from models.missing_person import (
+    MissingPerson,
+    parse_fields,
+    project,
+    row_serializer,
+    serialize_rows,
+)
+from models.db import db
+from marshmallow import ValidationError
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from schemas.missing_person_schema import MissingPersonSchema
+from utils.pagination import keyset_paginate, MAX_PAGE_SIZE
+
+# Default page size for list endpoints
+DEFAULT_PAGE_SIZE = 50
+# Rows fetched per round trip when streaming a full dump
+STREAM_BATCH_SIZE = 500
+# Reports created or updated by one batch request
+MAX_BATCH_SIZE = 500
 
 
 def create_missing_person(data):
@@ -56,11 +73,195 @@ def create_missing_person(data):
         }
 
 
-def get_all_missing_persons():
-    #Retrieve all missing person reports.
-    #list of dictionaries, each representing a missing person report
-    persons = MissingPerson.query.all()
-    return [person.to_dict() for person in persons]
+def get_all_missing_persons(limit=DEFAULT_PAGE_SIZE, cursor=None, user_id=None, fields=None):
+    """
+    Retrieve one page of missing person reports, newest first.
+    Args:
+        limit (int): page size, capped at MAX_PAGE_SIZE
+        cursor (str): next_cursor from the previous page, None for the first
+        user_id (int): only return reports created by this user
+        fields (str): comma separated fields to return, None for all
+    Returns:
+        tuple: (list of report dicts, cursor for the next page or None)
+    Raises:
+        InvalidCursor: if the cursor was not issued by us
+        ValueError: if an unknown field is requested
+    """
+    fields = parse_fields(fields)
+    keyset = [MissingPerson.created_at, MissingPerson.id]
+    query = project(MissingPerson.query, fields, keyset)
+    if user_id is not None:
+        query = query.filter(MissingPerson.user_id == user_id)
+    rows, next_cursor = keyset_paginate(query, keyset, cursor, limit)
+    return serialize_rows(rows, fields), next_cursor
+
+
+def stream_missing_persons(batch_size=STREAM_BATCH_SIZE, fields=None):
+    """
+    Generator of every report as one JSON document per line (NDJSON).
+    Rows are fetched `batch_size` at a time with yield_per, so memory stays
+    bounded by the batch size rather than the size of the table.
+    """
+    fields = parse_fields(fields)
+    serialize = row_serializer(fields)
+    statement = (
+        select(*[getattr(MissingPerson, name) for name in fields])
+        .order_by(MissingPerson.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    # fields are validated above, before the response starts streaming
+    def generate():
+        for row in db.session.execute(statement):
+            yield orjson.dumps(serialize(row), option=orjson.OPT_APPEND_NEWLINE)
+    return generate()
+
+def get_missing_persons_by_ids(ids, fields=None):
+    """
+    Fetch several reports with one IN query.
+    Args:
+        ids (str): comma separated report ids, at most MAX_PAGE_SIZE
+        fields (str): comma separated fields to return, None for all
+    Returns:
+        tuple: (report dicts in the order asked for, ids that do not exist)
+    Raises:
+        ValueError: for malformed or too many ids, or an unknown field
+    """
+    try:
+        wanted = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise ValueError("ids must be comma separated integers")
+    if len(wanted) > MAX_PAGE_SIZE:
+        raise ValueError(f"at most {MAX_PAGE_SIZE} ids per request")
+    fields = parse_fields(fields)
+    rows = project(MissingPerson.query.filter(MissingPerson.id.in_(wanted)), fields).all()
+    found = {data["id"]: data for data in serialize_rows(rows, fields)}
+    return [found[i] for i in wanted if i in found], [i for i in wanted if i not in found]
+
+
+def create_missing_persons(items, user_id):
+    """
+    Create many reports in one transaction. Invalid items and duplicate
+    case numbers are reported per item; the valid items are still created.
+    Args:
+        items (list): report dicts, at most MAX_BATCH_SIZE
+        user_id (int): user the reports are filed under
+    Returns:
+        list: one result per item, in order: {"index", "success", "data"}
+            or {"index", "success", "error"}
+    Raises:
+        ValueError: if `items` is not a list or is too long
+        SQLAlchemyError: if the insert fails again after one retry
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("expected a non-empty list of reports")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValueError(f"at most {MAX_BATCH_SIZE} reports per batch")
+
+    results = [None] * len(items)
+    schema = MissingPersonSchema(many=True)
+    try:
+        loaded = list(enumerate(schema.load(items)))
+    except ValidationError as e:
+        # messages are keyed by position; load the valid items on their own
+        invalid = {index for index in e.messages if isinstance(index, int)}
+        if not invalid:
+            raise ValueError("expected a non-empty list of reports")
+        for index in invalid:
+            results[index] = {"index": index, "success": False, "error": e.messages[index]}
+        valid = [index for index in range(len(items)) if index not in invalid]
+        loaded = list(zip(valid, schema.load([items[index] for index in valid])))
+
+    def add_valid(taken):
+        people = []
+        seen = set()
+        for index, data in loaded:
+            number = data["case_number"]
+            if number in taken or number in seen:
+                results[index] = {"index": index, "success": False,
+                                  "error": {"case_number": ["case number already exists"]}}
+                continue
+            seen.add(number)
+            people.append((index, MissingPerson(user_id=user_id, **data)))
+        db.session.add_all([person for _, person in people])
+        return people
+
+    def existing_numbers():
+        numbers = [data["case_number"] for _, data in loaded]
+        return {
+            number for (number,) in db.session.query(MissingPerson.case_number)
+            .filter(MissingPerson.case_number.in_(numbers))
+        }
+
+    people = add_valid(existing_numbers())
+    try:
+        db.session.flush()
+    except IntegrityError:
+        # a concurrent writer took one of the case numbers: check again
+        # and retry the rest, still as one transaction. A second failure
+        # is raised to the caller, which rolls back.
+        db.session.rollback()
+        people = add_valid(existing_numbers())
+        db.session.flush()
+    ids = [person.id for _, person in people]
+    db.session.commit()
+    # one query refreshes every expired report, rather than one per to_dict()
+    MissingPerson.query.filter(MissingPerson.id.in_(ids)).all()
+
+    for index, person in people:
+        results[index] = {"index": index, "success": True, "data": person.to_dict()}
+    return results
+
+
+def update_statuses(updates, user_id):
+    """
+    Change the status of many of the user's reports in one transaction.
+    Args:
+        updates (list): [{"id": int, "status": "missing" | "found" | "closed"}],
+            at most MAX_BATCH_SIZE
+        user_id (int): only reports filed by this user may be changed
+    Returns:
+        list: one result per update, in order: {"index", "id", "success",
+            "data"} or {"index", "id", "success", "error", "status"}
+    Raises:
+        ValueError: if `updates` is not a list or is too long
+    """
+    if not isinstance(updates, list) or not updates:
+        raise ValueError("expected a non-empty list of updates")
+    if len(updates) > MAX_BATCH_SIZE:
+        raise ValueError(f"at most {MAX_BATCH_SIZE} updates per batch")
+
+    schema = MissingPersonSchema(only=("status",))
+    ids = [item.get("id") for item in updates if isinstance(item, dict) and isinstance(item.get("id"), int)]
+    people = {person.id: person for person in MissingPerson.query.filter(MissingPerson.id.in_(ids))}
+
+    results = []
+    changed = []
+    for index, item in enumerate(updates):
+        person_id = item.get("id") if isinstance(item, dict) else None
+        result = {"index": index, "id": person_id}
+        errors = schema.validate({"status": item.get("status")}) if isinstance(item, dict) else None
+        if not isinstance(person_id, int) or errors is None:
+            result.update(success=False, error="each update needs an integer id and a status", status=400)
+        elif errors or item.get("status") is None:
+            result.update(success=False, error=errors or {"status": ["Missing data for required field."]}, status=400)
+        elif person_id not in people:
+            result.update(success=False, error="Not found", status=404)
+        elif people[person_id].user_id != user_id:
+            result.update(success=False, error="Not your report", status=403)
+        else:
+            people[person_id].status = item["status"]
+            changed.append((result, people[person_id]))
+            result["success"] = True
+        results.append(result)
+
+    changed_ids = [person.id for _, person in changed]
+    db.session.commit()
+    MissingPerson.query.filter(MissingPerson.id.in_(changed_ids)).all()
+    for result, person in changed:
+        result["data"] = person.to_dict()
+    return results
+
 
 #function to fetch a missing person by ID
 def get_missing_person_by_id(person_id):
@@ -1,19 +1,83 @@
-from models.missing_person import MissingPerson
+from models.missing_person import MissingPerson, parse_fields, project, serialize_rows
+from models.search_index import apply_full_text_search
+from models.name_search import apply_fuzzy_name_search
+from models.geo import within_bbox, within_radius
+from utils.gazetteer import find_place, geocode
+from utils.pagination import keyset_paginate, count_rows, MAX_PAGE_SIZE
 from datetime import datetime, timedelta
 
+# Sort key for cursor pagination; id breaks ties between equal dates
+SEARCH_KEYSET = [MissingPerson.last_seen_date, MissingPerson.id]
+
+# Radius used with `near=` when none is given
+DEFAULT_RADIUS_KM = 20
+# Radius of /missing-persons/location/<town> around the town centre
+TOWN_RADIUS_KM = 10
+
+
+def _place(name):
+    """Place for a user-supplied name, or ValueError if it is not in the gazetteer"""
+    place = find_place(name) or geocode(name)
+    if place is None:
+        raise ValueError(f"unknown place: {name}")
+    return place
+
 class SearchController:
     @staticmethod
-    def search_missing_persons(params):
-        """Search and filter missing persons"""
+    def build_query(params):
+        """
+        MissingPerson query with every search filter in `params` applied;
+        shared by search and export.
+        Returns:
+            tuple: (query, relevance ORDER BY clause or None, nearest-first
+                ORDER BY clause or None)
+        Raises:
+            ValueError: for malformed or unknown filter values
+        """
         query = MissingPerson.query
+        relevance = None
+        
+        # Full-text search across name, location, features and clothing
+        if params.get('q'):
+            query, relevance = apply_full_text_search(query, params['q'])
         
         # Apply filters
-        if params.get('name'):
+        match = params.get('match', 'exact')
+        if match not in ('exact', 'fuzzy'):
+            raise ValueError("match must be one of: exact, fuzzy")
+        
+        if params.get('name') and match == 'exact':
             query = query.filter(MissingPerson.full_name.ilike(f"%{params['name']}%"))
         
         if params.get('location'):
             query = query.filter(MissingPerson.last_seen_location.ilike(f"%{params['location']}%"))
         
+        # Geographic filters, served by the geohash and county indexes
+        nearest = None
+        if params.get('county'):
+            query = query.filter(MissingPerson.county == _place(params['county']).county)
+        
+        if params.get('near') or params.get('lat') or params.get('lon'):
+            if params.get('near'):
+                place = _place(params['near'])
+                latitude, longitude = place.latitude, place.longitude
+            elif not (params.get('lat') and params.get('lon')):
+                raise ValueError("lat and lon must be given together")
+            else:
+                latitude, longitude = float(params['lat']), float(params['lon'])
+            radius = float(params.get('radius_km', DEFAULT_RADIUS_KM))
+            query, nearest = within_radius(query, latitude, longitude, radius)
+        
+        if params.get('bbox'):
+            # min_lon,min_lat,max_lon,max_lat like most map libraries
+            parts = [float(v) for v in params['bbox'].split(',')]
+            if len(parts) != 4:
+                raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+            min_lon, min_lat, max_lon, max_lat = parts
+            if min_lat > max_lat or min_lon > max_lon:
+                raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+            query = within_bbox(query, min_lat, min_lon, max_lat, max_lon)
+        
         if params.get('age_min'):
             query = query.filter(MissingPerson.age >= int(params['age_min']))
         
@@ -21,7 +85,8 @@ class SearchController:
             query = query.filter(MissingPerson.age <= int(params['age_max']))
         
         if params.get('gender'):
-            query = query.filter(MissingPerson.gender.ilike(params['gender']))
+            # stored values are capitalized ("Female"), equality can use the index
+            query = query.filter(MissingPerson.gender == params['gender'].capitalize())
         
         if params.get('status'):
             query = query.filter(MissingPerson.status == params['status'])
@@ -32,16 +97,60 @@ class SearchController:
         if params.get('date_to'):
             query = query.filter(MissingPerson.last_seen_date <= datetime.fromisoformat(params['date_to']))
         
+        if params.get('name') and match == 'fuzzy':
+            # tolerate misspellings and transliterations, closest names first;
+            # last, so it sees every other filter
+            query, similarity = apply_fuzzy_name_search(query, params['name'])
+            relevance = similarity if relevance is None else relevance
+        
+        return query, relevance, nearest
+    
+    @staticmethod
+    def search_missing_persons(params):
+        """Search and filter missing persons"""
+        fields = parse_fields(params.get('fields'))
+        query, relevance, nearest = SearchController.build_query(params)
+        
         # Pagination
         page = int(params.get('page', 1))
         per_page = int(params.get('per_page', 20))
         
-        paginated = query.order_by(MissingPerson.last_seen_date.desc()).paginate(
+        # Cursor mode (any `cursor` param, empty for the first page): constant
+        # cost per page, ordered by date, total only computed when asked for
+        if 'cursor' in params:
+            if params.get('sort') == 'distance':
+                raise ValueError("sort=distance is only available with page=, not cursor=")
+            count_mode = params.get('count', 'none')
+            if count_mode not in ('exact', 'estimate', 'none'):
+                raise ValueError("count must be one of: exact, estimate, none")
+            per_page = min(per_page, MAX_PAGE_SIZE)
+            total = count_rows(query, count_mode)
+            rows, next_cursor = keyset_paginate(
+                project(query, fields, SEARCH_KEYSET), SEARCH_KEYSET, params.get('cursor'), per_page
+            )
+            return {
+                'results': serialize_rows(rows, fields),
+                'next_cursor': next_cursor,
+                'per_page': per_page,
+                'total': total,
+                'total_is_estimate': count_mode == 'estimate' and total is not None
+            }
+        
+        # Best matches first when searching by text, unless asked to sort by date
+        ordering = [MissingPerson.last_seen_date.desc()]
+        if params.get('sort') == 'distance':
+            if nearest is None:
+                raise ValueError("sort=distance needs near= or lat=/lon=")
+            ordering.insert(0, nearest)
+        elif relevance is not None and params.get('sort') != 'date':
+            ordering.insert(0, relevance)
+        
+        paginated = project(query, fields).order_by(*ordering).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
         return {
-            'results': [p.to_dict() for p in paginated.items],
+            'results': serialize_rows(paginated.items, fields),
             'total': paginated.total,
             'page': page,
             'per_page': per_page,
@@ -49,27 +158,42 @@ class SearchController:
         }
     
     @staticmethod
-    def filter_by_location(county):
-        """Filter by specific location"""
-        results = MissingPerson.query.filter(
-            MissingPerson.last_seen_location.ilike(f"%{county}%")
-        ).all()
-        return [p.to_dict() for p in results]
+    def filter_by_location(city, fields=None):
+        """
+        Filter by location. A county returns every report geocoded to it, a
+        town the reports within TOWN_RADIUS_KM of it, nearest first; names
+        missing from the gazetteer fall back to a substring match.
+        """
+        fields = parse_fields(fields)
+        query = project(MissingPerson.query, fields)
+        place = find_place(city) or geocode(city)
+        if place is None:
+            query = query.filter(MissingPerson.last_seen_location.ilike(f"%{city}%"))
+        elif place.name == place.county:
+            query = query.filter(MissingPerson.county == place.county).order_by(
+                MissingPerson.last_seen_date.desc()
+            )
+        else:
+            query, nearest = within_radius(query, place.latitude, place.longitude, TOWN_RADIUS_KM)
+            query = query.order_by(nearest)
+        return serialize_rows(query.all(), fields)
     
     @staticmethod
-    def get_recent_reports(days=7):
+    def get_recent_reports(days=7, fields=None):
         """Get recent reports"""
+        fields = parse_fields(fields)
         cutoff = datetime.utcnow() - timedelta(days=days)
-        results = MissingPerson.query.filter(
+        results = project(MissingPerson.query, fields).filter(
             MissingPerson.created_at >= cutoff
         ).order_by(MissingPerson.created_at.desc()).all()
-        return [p.to_dict() for p in results]
+        return serialize_rows(results, fields)
     
     @staticmethod
-    def get_statistics():
-        """Get platform statistics"""
-        return {
-            'total_cases': MissingPerson.query.count(),
-            'missing': MissingPerson.query.filter_by(status='missing').count(),
-            'found': MissingPerson.query.filter_by(status='found').count(),
-        }
\ No newline at end of file
+    def get_recent_reports_page(days=7, cursor=None, per_page=20, fields=None):
+        """Get one cursor page of recent reports, newest first"""
+        fields = parse_fields(fields)
+        keyset = [MissingPerson.created_at, MissingPerson.id]
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        query = project(MissingPerson.query, fields, keyset).filter(MissingPerson.created_at >= cutoff)
+        rows, next_cursor = keyset_paginate(query, keyset, cursor, per_page)
+        return serialize_rows(rows, fields), next_cursor
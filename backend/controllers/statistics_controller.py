@@ -0,0 +1,114 @@
+import threading
+import time
+
+from sqlalchemy import func, literal, null, select, union_all
+
+from models.db import db
+from models.missing_person import MissingPerson
+from models.case_statistic import CaseStatistic, TRACKED_FIELDS, apply_deltas, report_keys
+from models.case_tile import rebuild_tiles
+
+# Number of locations returned in the location breakdown
+TOP_LOCATIONS = 10
+# PostgreSQL advisory lock held by a running reconcile
+RECONCILE_LOCK_KEY = 7301
+
+
+class StatisticsController:
+    @staticmethod
+    def get_statistics():
+        """
+        Get platform statistics from the running counters in case_statistics.
+        Reads a few small rows regardless of how many reports exist.
+        """
+        rows = CaseStatistic.query.filter(
+            CaseStatistic.dimension.in_(['total', 'status', 'gender']),
+            CaseStatistic.count > 0
+        ).all()
+        by_status = {r.value: r.count for r in rows if r.dimension == 'status'}
+        by_gender = {r.value: r.count for r in rows if r.dimension == 'gender'}
+        total = next((r.count for r in rows if r.dimension == 'total'), 0)
+
+        top_locations = CaseStatistic.query.filter(
+            CaseStatistic.dimension == 'location',
+            CaseStatistic.count > 0
+        ).order_by(CaseStatistic.count.desc(), CaseStatistic.value).limit(TOP_LOCATIONS).all()
+
+        return {
+            'total_cases': total,
+            'missing': by_status.get('missing', 0),
+            'found': by_status.get('found', 0),
+            'closed': by_status.get('closed', 0),
+            'by_status': by_status,
+            'by_gender': by_gender,
+            'by_location': [{'location': r.value, 'count': r.count} for r in top_locations]
+        }
+
+    @staticmethod
+    def reconcile():
+        """
+        Correct every counter from missing_persons, then the map tile
+        aggregate, in one transaction. Repairs drift from writes that
+        bypass the ORM (bulk deletes, manual SQL).
+
+        The true counts and the stored counters are read by one statement,
+        so from one snapshot, and only the difference is added, with the
+        upsert the session hooks use. Increments committed while this runs
+        are kept rather than overwritten. On PostgreSQL an advisory lock
+        makes a second concurrent run skip instead of repeating the work.
+        Returns:
+            int: number of counters corrected, or None if another run holds the lock
+        """
+        if db.session.get_bind().dialect.name == 'postgresql':
+            locked = db.session.execute(
+                select(func.pg_try_advisory_xact_lock(RECONCILE_LOCK_KEY))
+            ).scalar()
+            if not locked:
+                db.session.rollback()
+                return None
+
+        columns = [getattr(MissingPerson, field) for field in TRACKED_FIELDS]
+        grouped = select(literal('report'), *columns, func.count()).group_by(*columns)
+        stored = select(
+            literal('stored'), CaseStatistic.dimension, CaseStatistic.value, null(), CaseStatistic.count
+        )
+        deltas = {}
+        for source, *values, count in db.session.execute(union_all(grouped, stored)):
+            if source == 'report':
+                for key in report_keys(dict(zip(TRACKED_FIELDS, values))):
+                    deltas[key] = deltas.get(key, 0) + count
+            else:
+                key = (values[0], values[1])
+                deltas[key] = deltas.get(key, 0) - count
+        deltas = {key: change for key, change in deltas.items() if change}
+
+        apply_deltas(db.session.connection(), deltas)
+        # counters of values no report has any more
+        db.session.query(CaseStatistic).filter(CaseStatistic.count == 0).delete()
+        rebuild_tiles(commit=False)
+        db.session.commit()
+        return len(deltas)
+
+    @staticmethod
+    def start_reconcile_job(app, interval):
+        """
+        Run reconcile() every `interval` seconds on a daemon thread. Every
+        process that creates the app starts one, so only enable this for a
+        single-process deployment; elsewhere run `flask stats reconcile`
+        from one cron job.
+        """
+        def run():
+            while True:
+                time.sleep(interval)
+                with app.app_context():
+                    try:
+                        StatisticsController.reconcile()
+                    except Exception:
+                        db.session.rollback()
+                        app.logger.exception("statistics reconcile failed")
+                    finally:
+                        db.session.remove()
+
+        thread = threading.Thread(target=run, name="stats-reconcile", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,40 @@
+"""Add trigram index on full_name and updated_at index
+
+Revision ID: a2d5e8c31f47
+Revises: f3a0b6d2c817
+Create Date: 2026-10-18 15:02:44.618203
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2d5e8c31f47'
+down_revision = 'f3a0b6d2c817'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_missing_persons_updated_at', 'missing_persons', ['updated_at'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        if op.get_bind().dialect.name == 'postgresql':
+            # fuzzy name search; sqlite keeps its name index in memory instead
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_missing_persons_full_name_trgm "
+                "ON missing_persons USING gin (full_name gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        if op.get_bind().dialect.name == 'postgresql':
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_missing_persons_full_name_trgm")
+        op.drop_index(
+            'ix_missing_persons_updated_at', table_name='missing_persons',
+            postgresql_concurrently=True, if_exists=True
+        )
@@ -0,0 +1,77 @@
+"""Add full-text search index to missing_persons
+
+Revision ID: b7e1c2d94a10
+Revises: 379bf463965d
+Create Date: 2026-10-18 09:12:31.204118
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1c2d94a10'
+down_revision = '379bf463965d'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(full_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(last_seen_location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(distinguishing_features, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(last_seen_wearing, '')), 'C')"
+)
+
+FTS_COLUMNS = "full_name, last_seen_location, distinguishing_features, last_seen_wearing"
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # generated column: postgres recomputes it on every insert/update
+        op.execute(
+            "ALTER TABLE missing_persons ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+        )
+        op.execute(
+            "CREATE INDEX ix_missing_persons_search_vector "
+            "ON missing_persons USING gin (search_vector)"
+        )
+        return
+
+    # sqlite fallback: external content FTS5 table kept in sync by triggers
+    new_values = ", ".join(f"new.{c.strip()}" for c in FTS_COLUMNS.split(","))
+    old_values = ", ".join(f"old.{c.strip()}" for c in FTS_COLUMNS.split(","))
+    op.execute(
+        f"CREATE VIRTUAL TABLE missing_persons_fts USING fts5({FTS_COLUMNS}, "
+        "content='missing_persons', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER missing_persons_fts_ai AFTER INSERT ON missing_persons BEGIN "
+        f"INSERT INTO missing_persons_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {new_values}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER missing_persons_fts_ad AFTER DELETE ON missing_persons BEGIN "
+        f"INSERT INTO missing_persons_fts(missing_persons_fts, rowid, {FTS_COLUMNS}) "
+        f"VALUES ('delete', old.id, {old_values}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER missing_persons_fts_au AFTER UPDATE ON missing_persons BEGIN "
+        f"INSERT INTO missing_persons_fts(missing_persons_fts, rowid, {FTS_COLUMNS}) "
+        f"VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO missing_persons_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {new_values}); END"
+    )
+    # index the rows that already exist
+    op.execute("INSERT INTO missing_persons_fts(missing_persons_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_missing_persons_search_vector', table_name='missing_persons')
+        with op.batch_alter_table('missing_persons', schema=None) as batch_op:
+            batch_op.drop_column('search_vector')
+        return
+
+    for trigger in ('missing_persons_fts_ai', 'missing_persons_fts_ad', 'missing_persons_fts_au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS missing_persons_fts")
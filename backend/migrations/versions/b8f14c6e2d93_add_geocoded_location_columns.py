@@ -0,0 +1,37 @@
+"""Add geocoded location columns to missing_persons
+
+Revision ID: b8f14c6e2d93
+Revises: a2d5e8c31f47
+Create Date: 2026-10-18 16:10:27.904415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8f14c6e2d93'
+down_revision = 'a2d5e8c31f47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('missing_persons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('county', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+        batch_op.create_index('ix_missing_persons_geohash', ['geohash'], unique=False)
+        batch_op.create_index('ix_missing_persons_county', ['county'], unique=False)
+    # existing reports are geocoded with `flask locations geocode`
+
+
+def downgrade():
+    with op.batch_alter_table('missing_persons', schema=None) as batch_op:
+        batch_op.drop_index('ix_missing_persons_county')
+        batch_op.drop_index('ix_missing_persons_geohash')
+        batch_op.drop_column('geohash')
+        batch_op.drop_column('county')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
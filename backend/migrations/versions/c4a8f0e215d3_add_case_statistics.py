@@ -0,0 +1,50 @@
+"""Add case_statistics summary table
+
+Revision ID: c4a8f0e215d3
+Revises: b7e1c2d94a10
+Create Date: 2026-10-18 10:02:47.518832
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a8f0e215d3'
+down_revision = 'b7e1c2d94a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('case_statistics',
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.String(length=200), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'value')
+    )
+
+    # backfill from the existing reports (same normalization as the app)
+    op.execute(
+        "INSERT INTO case_statistics (dimension, value, count) "
+        "SELECT 'total', 'all', count(*) FROM missing_persons"
+    )
+    op.execute(
+        "INSERT INTO case_statistics (dimension, value, count) "
+        "SELECT 'status', coalesce(status, 'missing'), count(*) FROM missing_persons "
+        "GROUP BY coalesce(status, 'missing')"
+    )
+    op.execute(
+        "INSERT INTO case_statistics (dimension, value, count) "
+        "SELECT 'gender', coalesce(gender, 'unknown'), count(*) FROM missing_persons "
+        "GROUP BY coalesce(gender, 'unknown')"
+    )
+    op.execute(
+        "INSERT INTO case_statistics (dimension, value, count) "
+        "SELECT 'location', trim(last_seen_location), count(*) FROM missing_persons "
+        "GROUP BY trim(last_seen_location)"
+    )
+
+
+def downgrade():
+    op.drop_table('case_statistics')
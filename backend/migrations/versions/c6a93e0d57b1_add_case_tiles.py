@@ -0,0 +1,44 @@
+"""Add case_tiles map aggregate table
+
+Revision ID: c6a93e0d57b1
+Revises: b8f14c6e2d93
+Create Date: 2026-10-18 17:04:51.226730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6a93e0d57b1'
+down_revision = 'b8f14c6e2d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('case_tiles',
+    sa.Column('precision', sa.SmallInteger(), nullable=False),
+    sa.Column('cell', sa.String(length=12), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('latitude_sum', sa.Float(), nullable=False),
+    sa.Column('longitude_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('precision', 'cell', 'status', 'day')
+    )
+
+    # backfill from the reports geocoded so far (same keys as the app)
+    for precision in (1, 2, 3, 4, 5):
+        op.execute(
+            "INSERT INTO case_tiles "
+            "(precision, cell, status, day, count, latitude_sum, longitude_sum) "
+            f"SELECT {precision}, substr(geohash, 1, {precision}), coalesce(status, 'missing'), "
+            "date(last_seen_date), count(*), sum(latitude), sum(longitude) "
+            "FROM missing_persons WHERE geohash IS NOT NULL AND last_seen_date IS NOT NULL "
+            f"GROUP BY substr(geohash, 1, {precision}), coalesce(status, 'missing'), date(last_seen_date)"
+        )
+
+
+def downgrade():
+    op.drop_table('case_tiles')
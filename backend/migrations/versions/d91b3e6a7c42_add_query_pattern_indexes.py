@@ -0,0 +1,43 @@
+"""Add composite indexes for search, list and my-reports queries
+
+Revision ID: d91b3e6a7c42
+Revises: c4a8f0e215d3
+Create Date: 2026-10-18 11:20:05.337410
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91b3e6a7c42'
+down_revision = 'c4a8f0e215d3'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_missing_persons_status_last_seen_date', ['status', 'last_seen_date', 'id']),
+    ('ix_missing_persons_last_seen_date', ['last_seen_date', 'id']),
+    ('ix_missing_persons_created_at', ['created_at', 'id']),
+    ('ix_missing_persons_user_id_created_at', ['user_id', 'created_at', 'id']),
+    ('ix_missing_persons_gender_age', ['gender', 'age']),
+]
+
+
+def upgrade():
+    # build without locking the table against writes on postgres
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name, 'missing_persons', columns,
+                postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(
+                name, table_name='missing_persons',
+                postgresql_concurrently=True, if_exists=True
+            )
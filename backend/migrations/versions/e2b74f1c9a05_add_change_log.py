@@ -0,0 +1,42 @@
+"""Add change_log table for the change feed
+
+Revision ID: e2b74f1c9a05
+Revises: c6a93e0d57b1
+Create Date: 2026-10-18 19:12:37.508114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b74f1c9a05'
+down_revision = 'c6a93e0d57b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('person_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('operation', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_person_id', 'change_log', ['person_id'])
+    op.create_index('ix_change_log_user_id_id', 'change_log', ['user_id', 'id'])
+    op.create_index('ix_change_log_changed_at', 'change_log', ['changed_at'])
+
+    # every existing report starts out as one change, so a full sync from
+    # the start of the log returns them all
+    op.execute(
+        "INSERT INTO change_log (person_id, user_id, operation, changed_at) "
+        "SELECT id, user_id, 'upsert', coalesce(updated_at, created_at, CURRENT_TIMESTAMP) "
+        "FROM missing_persons ORDER BY id"
+    )
+
+
+def downgrade():
+    op.drop_table('change_log')
@@ -0,0 +1,29 @@
+"""Add photo_status to missing_persons
+
+Revision ID: e5c27d9f1b86
+Revises: d91b3e6a7c42
+Create Date: 2026-10-18 12:41:19.006725
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c27d9f1b86'
+down_revision = 'd91b3e6a7c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('missing_persons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('photo_status', sa.String(length=20), nullable=True))
+
+    # photos uploaded before the background pipeline are already done
+    op.execute("UPDATE missing_persons SET photo_status = 'uploaded' WHERE photo_url IS NOT NULL")
+
+
+def downgrade():
+    with op.batch_alter_table('missing_persons', schema=None) as batch_op:
+        batch_op.drop_column('photo_status')
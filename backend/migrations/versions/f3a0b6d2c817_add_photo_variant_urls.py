@@ -0,0 +1,28 @@
+"""Add thumbnail and medium photo URLs to missing_persons
+
+Revision ID: f3a0b6d2c817
+Revises: e5c27d9f1b86
+Create Date: 2026-10-18 13:55:02.771490
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a0b6d2c817'
+down_revision = 'e5c27d9f1b86'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('missing_persons', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumbnail_url', sa.String(length=300), nullable=True))
+        batch_op.add_column(sa.Column('photo_medium_url', sa.String(length=300), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('missing_persons', schema=None) as batch_op:
+        batch_op.drop_column('photo_medium_url')
+        batch_op.drop_column('thumbnail_url')
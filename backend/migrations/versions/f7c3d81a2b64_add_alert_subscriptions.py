@@ -0,0 +1,55 @@
+"""Add saved-search alert subscriptions and notification outbox
+
+Revision ID: f7c3d81a2b64
+Revises: e2b74f1c9a05
+Create Date: 2026-10-18 20:41:09.117532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c3d81a2b64'
+down_revision = 'e2b74f1c9a05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('alert_subscriptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('filters', sa.JSON(), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_alert_subscriptions_user_id', 'alert_subscriptions', ['user_id'])
+    op.create_index('ix_alert_subscriptions_updated_at', 'alert_subscriptions', ['updated_at'])
+
+    op.create_table('alert_notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subscription_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('person_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['subscription_id'], ['alert_subscriptions.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('subscription_id', 'person_id', name='uq_alert_notifications_subscription_person')
+    )
+    op.create_index('ix_alert_notifications_status_next_attempt', 'alert_notifications', ['status', 'next_attempt_at'])
+    op.create_index('ix_alert_notifications_user_id', 'alert_notifications', ['user_id', 'id'])
+
+
+def downgrade():
+    op.drop_table('alert_notifications')
+    op.drop_table('alert_subscriptions')
@@ -0,0 +1,166 @@
+# models/alert.py
+#
+# Saved-search alerts. Users save a search (AlertSubscription); when a new
+# report is flushed, the session hook below matches it against the
+# in-memory SubscriptionIndex and queues an AlertNotification per match in
+# the same transaction, so a report and its alerts commit together. A
+# worker (AlertsController.deliver_pending) sends the queued notifications
+# through the configured outbox.
+
+import logging
+import time
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .db import db
+from .missing_person import MissingPerson
+from utils.alert_matching import SubscriptionIndex, compile_filters
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+SENT = 'sent'
+FAILED = 'failed'
+
+
+class AlertSubscription(db.Model):
+    """A saved search a user wants to hear about new matches for"""
+    __tablename__ = 'alert_subscriptions'
+    __table_args__ = (
+        db.Index('ix_alert_subscriptions_user_id', 'user_id'),
+        db.Index('ix_alert_subscriptions_updated_at', 'updated_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    # search parameters, as accepted by /api/search
+    filters = db.Column(db.JSON, nullable=False)
+    # deleting only deactivates, so index syncs see the change
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'filters': self.filters,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class AlertNotification(db.Model):
+    """Outbox entry: one report matched one subscription, to be delivered"""
+    __tablename__ = 'alert_notifications'
+    __table_args__ = (
+        db.UniqueConstraint('subscription_id', 'person_id', name='uq_alert_notifications_subscription_person'),
+        db.Index('ix_alert_notifications_status_next_attempt', 'status', 'next_attempt_at'),
+        db.Index('ix_alert_notifications_user_id', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    subscription_id = db.Column(db.Integer, db.ForeignKey('alert_subscriptions.id'), nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    person_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'subscription_id': self.subscription_id,
+            'person_id': self.person_id,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+        }
+
+
+def _sync(index, connection):
+    """Fold subscriptions changed since the last sync into the index"""
+    table = AlertSubscription.__table__
+    statement = select(table.c.id, table.c.user_id, table.c.filters, table.c.active, table.c.updated_at)
+    if index.synced_until is not None:
+        statement = statement.where(table.c.updated_at >= index.synced_until)
+    for row in connection.execute(statement):
+        if row.active:
+            try:
+                index.upsert(row.id, row.user_id, compile_filters(row.filters))
+            except ValueError:
+                # validated when saved; e.g. a place dropped from the gazetteer since
+                logger.warning("skipping alert subscription %s with invalid filters", row.id)
+                index.remove(row.id)
+        else:
+            index.remove(row.id)
+        if row.updated_at is not None and (index.synced_until is None or row.updated_at > index.synced_until):
+            index.synced_until = row.updated_at
+
+
+def get_subscription_index(app, connection):
+    """
+    The app's subscription index, brought up to date with one indexed query
+    (subscriptions saved by other workers included). Syncs only read rows
+    stamped since the last one, so a transaction committing after a later
+    stamped one is missed until the full rebuild every
+    ALERT_INDEX_REBUILD_INTERVAL seconds.
+    """
+    index = app.extensions.get('alert_index')
+    if index is None:
+        index = app.extensions.setdefault('alert_index', SubscriptionIndex())
+    with index.lock:
+        now = time.monotonic()
+        if index.built_at is None or now - index.built_at >= app.config.get('ALERT_INDEX_REBUILD_INTERVAL', 300):
+            rebuilt = SubscriptionIndex()
+            _sync(rebuilt, connection)
+            index.postings = rebuilt.postings
+            index.subscriptions = rebuilt.subscriptions
+            index.synced_until = rebuilt.synced_until
+            index.built_at = now
+        else:
+            _sync(index, connection)
+    return index
+
+
+def report_values(person):
+    """The attributes the matcher reads, from a flushed report"""
+    return {
+        'status': person.status,
+        'gender': person.gender,
+        'age': person.age,
+        'full_name': person.full_name,
+        'last_seen_location': person.last_seen_location,
+        'county': person.county,
+        'latitude': person.latitude,
+        'longitude': person.longitude,
+        'geohash': person.geohash,
+    }
+
+
+@event.listens_for(Session, 'after_flush')
+def _queue_alerts(session, flush_context):
+    reports = [obj for obj in session.new if isinstance(obj, MissingPerson)]
+    if not reports or not has_app_context() or not current_app.config.get('ALERTS_ENABLED', True):
+        return
+    connection = session.connection()
+    index = get_subscription_index(current_app, connection)
+    if not len(index):
+        return
+    now = datetime.utcnow()
+    rows = [
+        {'subscription_id': subscription_id, 'user_id': user_id, 'person_id': person.id,
+         'status': PENDING, 'attempts': 0, 'created_at': now, 'next_attempt_at': now}
+        for person in reports
+        for subscription_id, user_id in index.match(report_values(person))
+        # nobody needs an alert about their own report
+        if user_id != person.user_id
+    ]
+    if rows:
+        connection.execute(AlertNotification.__table__.insert(), rows)
@@ -0,0 +1,139 @@
+# models/case_statistic.py
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .db import db
+from .missing_person import MissingPerson
+
+
+class CaseStatistic(db.Model):
+    """
+    Running counter of reports per (dimension, value), e.g. ('status', 'found')
+    or ('gender', 'Female'). Kept up to date by the session hooks below so the
+    stats endpoint reads a handful of rows instead of counting the table.
+    """
+    __tablename__ = 'case_statistics'
+
+    dimension = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(200), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# report attribute -> statistics dimension
+TRACKED_FIELDS = {
+    'status': 'status',
+    'gender': 'gender',
+    'last_seen_location': 'location',
+}
+
+
+def dimension_value(field, value):
+    """Normalize a report attribute into the value it is counted under"""
+    if field == 'status':
+        return value or 'missing'  # column default
+    if field == 'last_seen_location':
+        return (value or '').strip()[:200]
+    return value or 'unknown'
+
+
+def report_keys(values):
+    """All (dimension, value) counters a report with these attributes counts towards"""
+    keys = [('total', 'all')]
+    for field, dimension in TRACKED_FIELDS.items():
+        keys.append((dimension, dimension_value(field, values.get(field))))
+    return keys
+
+
+def apply_deltas(connection, deltas):
+    """
+    Add each delta to its counter with a single upsert per counter, so
+    concurrent writers never lose an increment.
+    Args:
+        connection: connection in the caller's transaction
+        deltas (dict): {(dimension, value): change}
+    """
+    rows = [
+        {'dimension': dimension, 'value': value, 'count': change}
+        for (dimension, value), change in deltas.items() if change
+    ]
+    if not rows:
+        return
+
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = CaseStatistic.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.dimension, table.c.value],
+        set_={'count': table.c.count + statement.excluded.count},
+    )
+    connection.execute(statement, rows)
+
+
+def _old_values(person):
+    """Attribute values as they are in the database, before this flush"""
+    state = inspect(person)
+    values = {}
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            values[field] = history.deleted[0]
+        elif history.unchanged:
+            values[field] = history.unchanged[0]
+        else:
+            values[field] = getattr(person, field)
+    return values
+
+
+def _new_values(person):
+    return {field: getattr(person, field) for field in TRACKED_FIELDS}
+
+
+# Load the previous value when a tracked attribute is assigned, otherwise an
+# expired attribute would be overwritten without us ever seeing the old value
+for _field in TRACKED_FIELDS:
+    event.listen(getattr(MissingPerson, _field), 'set', lambda *args: None, active_history=True)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_statistic_deltas(session, flush_context, instances):
+    # Runs while deleted rows still exist, so their values can be loaded
+    deltas = session.info.setdefault('case_statistic_deltas', {})
+
+    def add(keys, change):
+        for key in keys:
+            deltas[key] = deltas.get(key, 0) + change
+
+    for obj in session.new:
+        if isinstance(obj, MissingPerson):
+            add(report_keys(_new_values(obj)), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, MissingPerson) and inspect(obj).has_identity:
+            add(report_keys(_old_values(obj)), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, MissingPerson) or obj in session.deleted:
+            continue
+        if not session.is_modified(obj):
+            continue
+        old, new = report_keys(_old_values(obj)), report_keys(_new_values(obj))
+        add([key for key in old if key not in new], -1)
+        add([key for key in new if key not in old], 1)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_statistic_deltas(session, flush_context):
+    # Same transaction as the report change: both commit or neither does
+    deltas = session.info.pop('case_statistic_deltas', None)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_statistic_deltas(session, previous_transaction):
+    session.info.pop('case_statistic_deltas', None)
@@ -0,0 +1,217 @@
+# models/case_tile.py
+
+from sqlalchemy import event, func, inspect, literal, or_, select, true, union_all
+from sqlalchemy.orm import Session
+
+from .db import db
+from .missing_person import MissingPerson
+# imported first so reports are geocoded before the tile deltas are collected
+from . import geo  # noqa: F401
+
+# Geohash precisions kept in the aggregate, coarsest (continent) to finest
+# (about 5 x 5 km). Each report counts once per precision.
+TILE_PRECISIONS = (1, 2, 3, 4, 5)
+
+# report attributes a tile key depends on
+TILE_FIELDS = ('geohash', 'latitude', 'longitude', 'status', 'last_seen_date')
+
+
+class CaseTile(db.Model):
+    """
+    Number of reports per (geohash precision, cell, status, last seen day),
+    with coordinate sums for the cluster centroid. Kept up to date by the
+    session hooks below, so a map view reads a few aggregated rows instead
+    of every report in view.
+    """
+    __tablename__ = 'case_tiles'
+
+    precision = db.Column(db.SmallInteger, primary_key=True)
+    cell = db.Column(db.String(12), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    latitude_sum = db.Column(db.Float, nullable=False, default=0)
+    longitude_sum = db.Column(db.Float, nullable=False, default=0)
+
+
+def tile_contributions(values):
+    """
+    {(precision, cell, status, day): (count, latitude, longitude)} a report
+    with these attributes adds to the aggregate; empty when not geocoded.
+    """
+    if not values['geohash'] or values['last_seen_date'] is None:
+        return {}
+    status = values['status'] or 'missing'  # column default
+    day = values['last_seen_date'].date()
+    return {
+        (precision, values['geohash'][:precision], status, day):
+            (1, values['latitude'], values['longitude'])
+        for precision in TILE_PRECISIONS
+    }
+
+
+def apply_tile_deltas(connection, deltas):
+    """
+    Add each delta to its tile with one upsert per tile.
+    Args:
+        connection: connection in the caller's transaction
+        deltas (dict): {(precision, cell, status, day): [count, lat sum, lon sum]}
+    """
+    rows = [
+        {
+            'precision': precision, 'cell': cell, 'status': status, 'day': day,
+            'count': count, 'latitude_sum': lat_sum, 'longitude_sum': lon_sum,
+        }
+        for (precision, cell, status, day), (count, lat_sum, lon_sum) in deltas.items()
+        if count or lat_sum or lon_sum
+    ]
+    if not rows:
+        return
+
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    table = CaseTile.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.precision, table.c.cell, table.c.status, table.c.day],
+        set_={
+            'count': table.c.count + statement.excluded.count,
+            'latitude_sum': table.c.latitude_sum + statement.excluded.latitude_sum,
+            'longitude_sum': table.c.longitude_sum + statement.excluded.longitude_sum,
+        },
+    )
+    connection.execute(statement, rows)
+
+
+def rebuild_tiles(commit=True):
+    """
+    Bring the whole aggregate in line with missing_persons, e.g. after
+    writes that bypassed the ORM. A single statement works out, per tile,
+    the true values minus the stored ones and adds that difference with the
+    same upsert the session hooks use. Increments committed while it runs
+    are therefore kept rather than overwritten. Tiles left empty are
+    deleted. Returns the number of tiles.
+    """
+    table = MissingPerson.__table__
+    tiles = CaseTile.__table__
+    day = func.date(table.c.last_seen_date)
+    parts = []
+    for precision in TILE_PRECISIONS:
+        cell = func.substr(table.c.geohash, 1, precision)
+        status = func.coalesce(table.c.status, 'missing')
+        parts.append(
+            select(
+                literal(precision).label('precision'), cell.label('cell'), status.label('status'),
+                day.label('day'), func.count().label('count'),
+                func.sum(table.c.latitude).label('latitude_sum'),
+                func.sum(table.c.longitude).label('longitude_sum'),
+            )
+            .where(table.c.geohash.is_not(None), table.c.last_seen_date.is_not(None))
+            .group_by(cell, status, day)
+        )
+    # minus what is stored, so the sums below are the corrections
+    parts.append(select(
+        tiles.c.precision, tiles.c.cell, tiles.c.status, tiles.c.day,
+        -tiles.c.count, -tiles.c.latitude_sum, -tiles.c.longitude_sum,
+    ))
+    combined = union_all(*parts).subquery()
+    key = [combined.c.precision, combined.c.cell, combined.c.status, combined.c.day]
+    count = func.sum(combined.c.count)
+    latitude_sum = func.sum(combined.c.latitude_sum)
+    longitude_sum = func.sum(combined.c.longitude_sum)
+    corrections = (
+        select(*key, count, latitude_sum, longitude_sum)
+        # sqlite needs a WHERE to parse INSERT ... SELECT ... ON CONFLICT
+        .where(true())
+        .group_by(*key)
+        .having(or_(count != 0, func.abs(latitude_sum) > 1e-9, func.abs(longitude_sum) > 1e-9))
+    )
+
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(tiles).from_select(
+        ['precision', 'cell', 'status', 'day', 'count', 'latitude_sum', 'longitude_sum'], corrections
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[tiles.c.precision, tiles.c.cell, tiles.c.status, tiles.c.day],
+        set_={
+            'count': tiles.c.count + statement.excluded.count,
+            'latitude_sum': tiles.c.latitude_sum + statement.excluded.latitude_sum,
+            'longitude_sum': tiles.c.longitude_sum + statement.excluded.longitude_sum,
+        },
+    )
+    connection.execute(statement)
+    connection.execute(tiles.delete().where(tiles.c.count == 0))
+    if commit:
+        db.session.commit()
+    return db.session.query(func.count()).select_from(CaseTile).scalar()
+
+
+def _old_values(person):
+    """Attribute values as they are in the database, before this flush"""
+    state = inspect(person)
+    values = {}
+    for field in TILE_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            values[field] = history.deleted[0]
+        elif history.unchanged:
+            values[field] = history.unchanged[0]
+        else:
+            values[field] = getattr(person, field)
+    return values
+
+
+def _new_values(person):
+    return {field: getattr(person, field) for field in TILE_FIELDS}
+
+
+# see case_statistic: load old values on assignment so they are never lost
+for _field in TILE_FIELDS:
+    event.listen(getattr(MissingPerson, _field), 'set', lambda *args: None, active_history=True)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_tile_deltas(session, flush_context, instances):
+    deltas = session.info.setdefault('case_tile_deltas', {})
+
+    def add(contributions, sign):
+        for key, (count, latitude, longitude) in contributions.items():
+            total = deltas.setdefault(key, [0, 0.0, 0.0])
+            total[0] += sign * count
+            total[1] += sign * latitude
+            total[2] += sign * longitude
+
+    for obj in session.new:
+        if isinstance(obj, MissingPerson):
+            add(tile_contributions(_new_values(obj)), 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, MissingPerson) and inspect(obj).has_identity:
+            add(tile_contributions(_old_values(obj)), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, MissingPerson) or obj in session.deleted:
+            continue
+        old, new = _old_values(obj), _new_values(obj)
+        if old != new:
+            add(tile_contributions(old), -1)
+            add(tile_contributions(new), 1)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_tile_deltas(session, flush_context):
+    deltas = session.info.pop('case_tile_deltas', None)
+    if deltas:
+        apply_tile_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_tile_deltas(session, previous_transaction):
+    session.info.pop('case_tile_deltas', None)
@@ -0,0 +1,88 @@
+# models/change_log.py
+
+from datetime import datetime
+
+from sqlalchemy import event, literal, select
+from sqlalchemy.orm import Session
+
+from .db import db
+from .missing_person import MissingPerson
+
+UPSERT = 'upsert'
+DELETE = 'delete'
+
+
+class ChangeLog(db.Model):
+    """
+    One row per report created, updated or deleted, numbered by an
+    increasing sequence (`id`). Clients remember the last number they saw
+    and ask for what came after it, so syncing costs O(changes) and deletes
+    show up as tombstones instead of as rows silently missing from a list.
+    Written by the session hook below, in the same transaction as the change.
+    """
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        db.Index('ix_change_log_person_id', 'person_id'),
+        db.Index('ix_change_log_user_id_id', 'user_id', 'id'),
+        db.Index('ix_change_log_changed_at', 'changed_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    person_id = db.Column(db.Integer, nullable=False)
+    # owner of the report, kept so tombstones can still be filtered by user
+    user_id = db.Column(db.Integer)
+    operation = db.Column(db.String(10), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+def log_bulk_changes(operation, person_ids):
+    """
+    Log `operation` for every report id selected by `person_ids`, for
+    writes that bypass the ORM (bulk inserts and deletes). Run it in the
+    same transaction, before a bulk delete.
+    Args:
+        operation (str): UPSERT or DELETE
+        person_ids: select() of MissingPerson.id
+    """
+    reports = MissingPerson.__table__
+    rows = (
+        select(reports.c.id, reports.c.user_id, literal(operation), literal(datetime.utcnow()))
+        .where(reports.c.id.in_(person_ids.scalar_subquery()))
+        .order_by(reports.c.id)
+    )
+    table = ChangeLog.__table__
+    db.session.execute(table.insert().from_select(
+        [table.c.person_id, table.c.user_id, table.c.operation, table.c.changed_at], rows
+    ))
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_deleted_reports(session, flush_context, instances):
+    # Owners of deleted reports must be read while the rows still exist
+    deleted = session.info.setdefault('change_log_deleted', [])
+    for obj in session.deleted:
+        if isinstance(obj, MissingPerson):
+            deleted.append({'person_id': obj.id, 'user_id': obj.user_id, 'operation': DELETE})
+
+
+@event.listens_for(Session, 'after_flush')
+def _log_report_changes(session, flush_context):
+    # new / dirty still describe what this flush wrote, and new rows have
+    # their ids by now
+    rows = [
+        {'person_id': obj.id, 'user_id': obj.user_id, 'operation': UPSERT}
+        for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, MissingPerson) and obj not in session.deleted
+        and (obj in session.new or session.is_modified(obj, include_collections=False))
+    ]
+    rows.extend(session.info.pop('change_log_deleted', None) or [])
+    if rows:
+        now = datetime.utcnow()
+        session.connection().execute(
+            ChangeLog.__table__.insert(), [dict(row, changed_at=now) for row in rows]
+        )
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_deleted_reports(session, previous_transaction):
+    session.info.pop('change_log_deleted', None)
@@ -1,6 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 
+from utils.password_hasher import PasswordHasher
+from .routing import RoutingSession
+
 # create single shared instances for the entire app
-db = SQLAlchemy()
+# (the session class sends some reads to replicas, see models/routing.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 bcrypt = Bcrypt()
+# bounded pool that runs bcrypt off the request thread
+password_hasher = PasswordHasher(bcrypt)
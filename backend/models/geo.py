@@ -0,0 +1,127 @@
+# models/geo.py
+#
+# Geocoding and location queries for missing person reports.
+#
+# Whenever last_seen_location changes the report is geocoded against the
+# offline gazetteer at flush time, filling latitude/longitude, the normalized
+# county and a geohash. Radius and bounding-box queries first narrow the table to the
+# few geohash prefixes covering the area (btree range scans on the geohash
+# index), then apply an exact distance / box check on what is left.
+
+import math
+
+from sqlalchemy import event, inspect, or_
+from sqlalchemy.orm import Session
+
+from .db import db
+from .missing_person import MissingPerson
+from utils import geohash
+from utils.gazetteer import geocode
+
+# Largest radius accepted by the API
+MAX_RADIUS_KM = 500
+
+# Rows geocoded per commit by geocode_reports()
+GEOCODE_BATCH_SIZE = 500
+
+
+def _geocode(person):
+    attrs = inspect(person).attrs
+    if attrs.last_seen_location.history.has_changes():
+        place = geocode(person.last_seen_location)
+        # coordinates sent with the report win over the gazetteer
+        if not (attrs.latitude.history.has_changes() or attrs.longitude.history.has_changes()):
+            person.latitude = place.latitude if place else None
+            person.longitude = place.longitude if place else None
+        if not attrs.county.history.has_changes():
+            person.county = place.county if place else None
+
+    if person.latitude is None or person.longitude is None:
+        person.geohash = None
+    else:
+        person.geohash = geohash.encode(person.latitude, person.longitude)
+
+
+# Runs before the other before_flush hooks (they import this module first),
+# so summary tables fed from the flush already see the new coordinates
+@event.listens_for(Session, "before_flush")
+def _geocode_reports(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, MissingPerson) and obj not in session.deleted:
+            _geocode(obj)
+
+
+def _in_cells(min_lat, min_lon, max_lat, max_lon):
+    """Condition matching reports whose geohash lies in the cells covering a box"""
+    conditions = []
+    for prefix in geohash.cover(min_lat, min_lon, max_lat, max_lon):
+        # every hash starting with `prefix` sorts between these two
+        upper = prefix + "z" * (geohash.PRECISION - len(prefix))
+        conditions.append(MissingPerson.geohash.between(prefix, upper))
+    return or_(*conditions)
+
+
+def within_radius(query, latitude, longitude, radius_km):
+    """
+    Restrict a MissingPerson query to reports last seen within `radius_km`
+    of a point.
+    Returns:
+        tuple: (filtered query, nearest-first ORDER BY clause)
+    Raises:
+        ValueError: if the radius is out of range
+    """
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValueError(f"radius_km must be between 0 and {MAX_RADIUS_KM}")
+
+    box = geohash.bbox_around(latitude, longitude, radius_km)
+    # equirectangular distance in degrees of latitude; plain arithmetic, so it
+    # runs on sqlite too, and accurate to well under 1% at these distances
+    scale = math.cos(math.radians(latitude))
+    dlat = MissingPerson.latitude - latitude
+    dlon = (MissingPerson.longitude - longitude) * scale
+    distance_squared = dlat * dlat + dlon * dlon
+
+    query = query.filter(
+        _in_cells(*box),
+        distance_squared <= (radius_km / geohash.KM_PER_DEGREE) ** 2,
+    )
+    return query, distance_squared.asc()
+
+
+def within_bbox(query, min_lat, min_lon, max_lat, max_lon):
+    """Restrict a MissingPerson query to reports last seen inside a box"""
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+    return query.filter(
+        _in_cells(min_lat, min_lon, max_lat, max_lon),
+        MissingPerson.latitude.between(min_lat, max_lat),
+        MissingPerson.longitude.between(min_lon, max_lon),
+    )
+
+
+def geocode_reports(only_missing=True):
+    """
+    Geocode reports in place, e.g. after the gazetteer was extended or for
+    reports created before locations were geocoded.
+    Args:
+        only_missing (bool): skip reports that already have coordinates
+    Returns:
+        int: number of reports that now have coordinates
+    """
+    located = 0
+    last_id = 0
+    while True:
+        query = MissingPerson.query.filter(MissingPerson.id > last_id)
+        if only_missing:
+            query = query.filter(MissingPerson.latitude.is_(None))
+        batch = query.order_by(MissingPerson.id).limit(GEOCODE_BATCH_SIZE).all()
+        if not batch:
+            return located
+        for person in batch:
+            place = geocode(person.last_seen_location)
+            person.latitude = place.latitude if place else None
+            person.longitude = place.longitude if place else None
+            person.county = place.county if place else None
+            located += place is not None
+        last_id = batch[-1].id
+        db.session.commit()
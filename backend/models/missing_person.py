@@ -2,10 +2,31 @@
 # models/missing_person.py
 
 from datetime import datetime
+from functools import lru_cache
 from .db import db  # Use shared SQLAlchemy instance
 
 class MissingPerson(db.Model):
     __tablename__ = 'missing_persons'
+    # Composite indexes matching the access paths in the controllers. The
+    # trailing id makes each one usable for keyset pagination; a btree is
+    # scanned backwards for the DESC orderings, so no DESC columns needed.
+    __table_args__ = (
+        # search: status filter ordered by last_seen_date
+        db.Index('ix_missing_persons_status_last_seen_date', 'status', 'last_seen_date', 'id'),
+        # search: unfiltered / date range ordered by last_seen_date
+        db.Index('ix_missing_persons_last_seen_date', 'last_seen_date', 'id'),
+        # list and recent reports ordered by created_at
+        db.Index('ix_missing_persons_created_at', 'created_at', 'id'),
+        # my reports
+        db.Index('ix_missing_persons_user_id_created_at', 'user_id', 'created_at', 'id'),
+        # search: gender with an age range
+        db.Index('ix_missing_persons_gender_age', 'gender', 'age'),
+        # incremental sync of the in-memory name index
+        db.Index('ix_missing_persons_updated_at', 'updated_at'),
+        # location queries: radius / bounding box by geohash prefix, county
+        db.Index('ix_missing_persons_geohash', 'geohash'),
+        db.Index('ix_missing_persons_county', 'county'),
+    )
 
     # Link each report to the user who created it
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -22,6 +43,11 @@ class MissingPerson(db.Model):
 
     last_seen_date = db.Column(db.DateTime, nullable=False)
     last_seen_location = db.Column(db.String(200), nullable=False)
+    # geocoded from last_seen_location against the offline gazetteer
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    county = db.Column(db.String(50))
+    geohash = db.Column(db.String(12))
     last_seen_wearing = db.Column(db.Text)
 
     contact_name = db.Column(db.String(100), nullable=False)
@@ -32,6 +58,11 @@ class MissingPerson(db.Model):
     case_number = db.Column(db.String(50), unique=True)
     additional_info = db.Column(db.Text)
     photo_url = db.Column(db.String(300))
+    # resized copies generated from the uploaded photo
+    thumbnail_url = db.Column(db.String(300))
+    photo_medium_url = db.Column(db.String(300))
+    # None when no photo was sent, otherwise pending -> uploaded / failed
+    photo_status = db.Column(db.String(20))
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -58,6 +89,9 @@ class MissingPerson(db.Model):
             "distinguishing_features": self.distinguishing_features,
             "last_seen_date": self.last_seen_date.isoformat() if self.last_seen_date else None,
             "last_seen_location": self.last_seen_location,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "county": self.county,
             "last_seen_wearing": self.last_seen_wearing,
             "contact_name": self.contact_name,
             "contact_phone": self.contact_phone,
@@ -66,6 +100,81 @@ class MissingPerson(db.Model):
             "case_number": self.case_number,
             "additional_info": self.additional_info,
             "photo_url": self.photo_url,
+            "thumbnail_url": self.thumbnail_url,
+            "photo_medium_url": self.photo_medium_url,
+            "photo_status": self.photo_status,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-        }
\ No newline at end of file
+        }
+
+
+# Fields returned by the API, in to_dict() order. List endpoints select only
+# these columns (or the `fields=` subset) and serialize the raw row tuples,
+# so no ORM objects are built for them.
+SERIALIZED_FIELDS = (
+    "id", "user_id", "full_name", "age", "gender", "height", "weight",
+    "hair_color", "eye_color", "distinguishing_features", "last_seen_date",
+    "last_seen_location", "latitude", "longitude", "county",
+    "last_seen_wearing", "contact_name", "contact_phone",
+    "contact_email", "status", "case_number", "additional_info", "photo_url",
+    "thumbnail_url", "photo_medium_url", "photo_status", "created_at", "updated_at",
+)
+DATETIME_FIELDS = frozenset({"last_seen_date", "created_at", "updated_at"})
+
+
+def parse_fields(value):
+    """
+    Turn a `fields=` query parameter ("id,full_name,status") into the tuple
+    of fields to return, in canonical order. `id` is always included and an
+    empty value means every field.
+    Raises:
+        ValueError: if an unknown field is requested
+    """
+    if not value:
+        return SERIALIZED_FIELDS
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = sorted(requested.difference(SERIALIZED_FIELDS))
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}")
+    requested.add("id")
+    return tuple(name for name in SERIALIZED_FIELDS if name in requested)
+
+
+def project(query, fields, key_columns=()):
+    """
+    Make a MissingPerson query return plain row tuples holding `fields`,
+    followed by any pagination key columns that were not requested.
+    """
+    names = list(fields) + [c.key for c in key_columns if c.key not in fields]
+    return query.with_entities(*[getattr(MissingPerson, name) for name in names])
+
+
+@lru_cache(maxsize=128)
+def row_serializer(fields):
+    """
+    Compile a function that turns a projected row into the API dict.
+
+    The function body is generated once per field tuple as a single dict
+    literal with positional row access, which avoids the per-row loop and
+    attribute lookups of to_dict(). Field names come from SERIALIZED_FIELDS
+    only, never from user input.
+    """
+    entries = []
+    for position, name in enumerate(fields):
+        if name not in SERIALIZED_FIELDS:
+            raise ValueError(f"unknown field: {name}")
+        if name in DATETIME_FIELDS:
+            value = f"(row[{position}].isoformat() if row[{position}] is not None else None)"
+        else:
+            value = f"row[{position}]"
+        entries.append(f"{name!r}: {value}")
+
+    namespace = {}
+    exec(f"def serialize(row):\n    return {{{', '.join(entries)}}}\n", namespace)
+    return namespace["serialize"]
+
+
+def serialize_rows(rows, fields):
+    """Serialize projected rows with the compiled serializer for `fields`"""
+    serialize = row_serializer(tuple(fields))
+    return [serialize(row) for row in rows]
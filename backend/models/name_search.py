@@ -0,0 +1,120 @@
+# models/name_search.py
+#
+# Fuzzy and phonetic matching on report names, for spelling variants that
+# full-text search misses (Wanjiku / Wanjiru, Otieno / Otyeno).
+#
+# On PostgreSQL this is pg_trgm: a GIN trigram index on full_name answers
+# word-similarity queries without a scan. SQLite has no trigram support, so
+# each app keeps an in-memory trigram + phonetic index of the names instead,
+# brought up to date from `updated_at` before it is queried.
+
+import time
+
+from flask import current_app
+from sqlalchemy import DDL, case, event, false, func, literal, select, text
+
+from .db import db
+from .missing_person import MissingPerson
+from utils.name_matching import NameIndex
+
+# Minimum similarity (0..1) for a name to count as a match
+SIMILARITY_THRESHOLD = 0.3
+
+# Name matches checked against the query's other filters per statement
+MAX_CANDIDATES = 500
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_missing_persons_full_name_trgm "
+    "ON missing_persons USING gin (full_name gin_trgm_ops)",
+]
+
+for _statement in POSTGRES_DDL:
+    event.listen(
+        MissingPerson.__table__, "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+
+
+def get_name_index():
+    """
+    The app's in-memory name index, synced with the table. Only rows changed
+    since the last sync are read; a full rebuild every
+    NAME_INDEX_REBUILD_INTERVAL seconds drops reports deleted elsewhere.
+    """
+    index = current_app.extensions.get("name_index")
+    if index is None:
+        index = current_app.extensions.setdefault("name_index", NameIndex())
+
+    now = time.monotonic()
+    sync_interval = current_app.config.get("NAME_INDEX_SYNC_INTERVAL", 5)
+    if index.checked_at is not None and now - index.checked_at < sync_interval:
+        return index
+
+    with index.lock:
+        rebuild_interval = current_app.config.get("NAME_INDEX_REBUILD_INTERVAL", 3600)
+        if index.built_at is None or now - index.built_at >= rebuild_interval:
+            rebuilt = NameIndex()
+            rebuilt.built_at = now
+            _sync(rebuilt)
+            index.names = rebuilt.names
+            index.trigram_postings = rebuilt.trigram_postings
+            index.phonetic_postings = rebuilt.phonetic_postings
+            index.synced_until = rebuilt.synced_until
+            index.built_at = now
+        else:
+            _sync(index)
+        index.checked_at = now
+    return index
+
+
+def _sync(index):
+    stmt = select(MissingPerson.id, MissingPerson.full_name, MissingPerson.updated_at)
+    if index.synced_until is not None:
+        # >= so rows sharing the last seen timestamp are not missed
+        stmt = stmt.where(MissingPerson.updated_at >= index.synced_until)
+    for report_id, full_name, updated_at in db.session.execute(stmt):
+        index.add(report_id, full_name)
+        if updated_at is not None and (index.synced_until is None or updated_at > index.synced_until):
+            index.synced_until = updated_at
+
+
+def apply_fuzzy_name_search(query, name):
+    """
+    Restrict a MissingPerson query to reports whose name is similar to
+    `name`, tolerating misspellings and transliteration variants. Apply it
+    after the query's other filters: without pg_trgm, the name matches are
+    narrowed down to those passing them before the query is built.
+    Args:
+        query: MissingPerson query to filter
+        name (str): name as typed, possibly partial
+    Returns:
+        tuple: (filtered query, similarity ORDER BY clause or None)
+    """
+    if not name or not name.strip():
+        return query, None
+
+    if db.engine.dialect.name == "postgresql":
+        # the <% operator is what the trigram index serves; its cutoff is a setting
+        db.session.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(SIMILARITY_THRESHOLD)},
+        )
+        query = query.filter(literal(name).op("<%")(MissingPerson.full_name))
+        return query, func.word_similarity(name, MissingPerson.full_name).desc()
+
+    matches = get_name_index().search(name, SIMILARITY_THRESHOLD, limit=None)
+    if len(matches) > MAX_CANDIDATES:
+        # common name: keep only the matches the other filters let through,
+        # a chunk at a time, so none is dropped before filtering
+        passing = set()
+        for start in range(0, len(matches), MAX_CANDIDATES):
+            chunk = [report_id for report_id, _ in matches[start:start + MAX_CANDIDATES]]
+            passing.update(report_id for (report_id,) in query.filter(
+                MissingPerson.id.in_(chunk)).with_entities(MissingPerson.id).order_by(None))
+        matches = [(report_id, score) for report_id, score in matches if report_id in passing]
+    if not matches:
+        return query.filter(false()), None
+    scores = dict(matches)
+    query = query.filter(MissingPerson.id.in_(scores))
+    return query, case(scores, value=MissingPerson.id, else_=0).desc()
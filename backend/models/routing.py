@@ -0,0 +1,142 @@
+# models/routing.py
+#
+# Read-replica routing. Each of SQLALCHEMY_REPLICA_URLS gets an engine with
+# the same SQLALCHEMY_ENGINE_OPTIONS as the primary, and the session sends
+# the reads of GET requests to the read-only endpoints below to one of
+# them, chosen per request.
+# Everything else stays on the primary: writes, flushes, any read in a
+# session holding unflushed changes, and every request from a user that
+# wrote within SQLALCHEMY_REPLICA_STICKY_SECONDS (read-your-writes). The
+# user is the identity of the request's bearer token, and the time of their
+# last write is kept on the server: per process, or in Redis at
+# SQLALCHEMY_REPLICA_STICKY_REDIS_URL so it holds across worker processes.
+#
+# On PostgreSQL, transactions begun while handling a request (on the primary
+# or a replica) get REQUEST_STATEMENT_TIMEOUT_MS as their statement timeout.
+# CLI commands and background jobs run without one.
+
+import random
+import time
+
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from utils.lru_cache import LRUCache
+
+# Endpoints whose GETs may read slightly stale data
+REPLICA_ENDPOINTS = frozenset({
+    "search.search_missing_persons",
+    "search.filter_by_location",
+    "search.get_recent_reports",
+    "search.get_statistics",
+    "search.get_map_clusters",
+    "search.export_missing_persons",
+    "missing_persons.list_all_reports",
+    "missing_persons.get_single_report",
+    "missing_persons.get_changes",
+})
+
+
+
+class MemoryWriteLog:
+    """Users who wrote recently, known to this process only"""
+
+    def __init__(self, maxsize=10000):
+        self.entries = LRUCache(maxsize)
+
+    def wrote(self, user_id, seconds):
+        self.entries.set(user_id, True, expires_at=time.time() + seconds)
+
+    def wrote_recently(self, user_id):
+        return self.entries.get(user_id) is not None
+
+
+class RedisWriteLog:
+    """
+    Users who wrote recently, shared by every worker in Redis (or anything
+    with the same set(ex=) / exists interface).
+    """
+
+    def __init__(self, client, prefix="findme:wrote:"):
+        self.client = client
+        self.prefix = prefix
+
+    def wrote(self, user_id, seconds):
+        self.client.set(f"{self.prefix}{user_id}", b"1", ex=seconds)
+
+    def wrote_recently(self, user_id):
+        return bool(self.client.exists(f"{self.prefix}{user_id}"))
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica picked for the current request"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            replica = g.get("db_replica")
+            if replica is not None and not (self.new or self.dirty or self.deleted):
+                return get_replicas(current_app)[replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _limit_request_statements(session, transaction, connection):
+    if connection.dialect.name != "postgresql" or not has_request_context():
+        return
+    timeout = current_app.config.get("REQUEST_STATEMENT_TIMEOUT_MS")
+    if timeout:
+        # LOCAL: ends with the transaction, before the connection is reused
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
+
+
+def get_replicas(app):
+    """Replica engines of `app`, empty when none are configured"""
+    return app.extensions.get("read_replicas", [])
+
+
+def use_primary():
+    """
+    Send the rest of the current request's reads to the primary.
+    Returns:
+        bool: whether they were going to a replica until now
+    """
+    return g.pop("db_replica", None) is not None
+
+
+def configure_replicas(app):
+    """Create the replica engines and the request hooks that route to them"""
+    urls = app.config.get("SQLALCHEMY_REPLICA_URLS") or []
+    if not urls:
+        return
+    # utils.auth imports the models, which import this module
+    from utils.auth import token_identity
+    options = app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    app.extensions["read_replicas"] = [sa.create_engine(url, **options) for url in urls]
+    sticky_seconds = app.config.get("SQLALCHEMY_REPLICA_STICKY_SECONDS", 10)
+    redis_url = app.config.get("SQLALCHEMY_REPLICA_STICKY_REDIS_URL")
+    if redis_url:
+        # optional dependency, only needed to share the write log
+        import redis
+        write_log = RedisWriteLog(redis.Redis.from_url(redis_url))
+    else:
+        write_log = MemoryWriteLog()
+    app.extensions["replica_write_log"] = write_log
+
+    @app.before_request
+    def _choose_database():
+        if request.method not in ("GET", "HEAD") or request.endpoint not in REPLICA_ENDPOINTS:
+            return
+        user_id = token_identity()
+        if user_id is not None and write_log.wrote_recently(user_id):
+            return
+        g.db_replica = random.randrange(len(urls))
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            user_id = token_identity()
+            if user_id is not None:
+                write_log.wrote(user_id, sticky_seconds)
+        return response
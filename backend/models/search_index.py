@@ -0,0 +1,127 @@
+# models/search_index.py
+#
+# Full-text search over missing person reports.
+#
+# On PostgreSQL the table carries a generated, weighted `search_vector`
+# tsvector column with a GIN index, so postgres keeps it in sync on every
+# insert and update. SQLite (used by the test suite) has no tsvector, so an
+# external-content FTS5 table is kept in sync by triggers instead.
+
+import re
+
+from sqlalchemy import DDL, event, func, literal_column, select, table
+
+from .db import db
+from .missing_person import MissingPerson
+
+FTS_TABLE = "missing_persons_fts"
+
+# Columns covered by the index, most important first. The weights are used
+# for relevance ranking: a hit in the name beats a hit in the location,
+# which beats a hit in the free-text description fields.
+SEARCH_COLUMNS = (
+    ("full_name", "A", 10.0),
+    ("last_seen_location", "B", 5.0),
+    ("distinguishing_features", "C", 2.0),
+    ("last_seen_wearing", "C", 2.0),
+)
+
+# Cap the number of terms so a pasted paragraph can't build a huge query
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _pg_vector_expression():
+    return " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({name}, '')), '{weight}')"
+        for name, weight, _ in SEARCH_COLUMNS
+    )
+
+
+_columns = ", ".join(name for name, _, _ in SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{name}" for name, _, _ in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{name}" for name, _, _ in SEARCH_COLUMNS)
+
+POSTGRES_DDL = [
+    f"ALTER TABLE missing_persons ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({_pg_vector_expression()}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_missing_persons_search_vector "
+    "ON missing_persons USING gin (search_vector)",
+]
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_columns}, content='missing_persons', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON missing_persons BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON missing_persons BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) "
+    f"VALUES ('delete', old.id, {_old_values}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON missing_persons BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) "
+    f"VALUES ('delete', old.id, {_old_values}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values}); END",
+]
+
+# Create the index alongside the table so db.create_all() (tests, fresh
+# databases) gets the same setup as the alembic migration
+for _statement in POSTGRES_DDL:
+    event.listen(
+        MissingPerson.__table__, "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
+for _statement in SQLITE_DDL:
+    event.listen(
+        MissingPerson.__table__, "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    MissingPerson.__table__, "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {FTS_TABLE}").execute_if(dialect="sqlite"),
+)
+
+
+def search_terms(text):
+    """Split user input into lowercase search terms (punctuation is dropped)"""
+    if not text:
+        return []
+    return _TERM_RE.findall(text.lower())[:MAX_TERMS]
+
+
+def apply_full_text_search(query, text):
+    """
+    Restrict a MissingPerson query to reports matching every term in `text`.
+    Terms are prefix-matched so partial words work for search-as-you-type.
+    Args:
+        query: MissingPerson query to filter
+        text (str): raw search input
+    Returns:
+        tuple: (filtered query, relevance ORDER BY clause or None)
+    """
+    terms = search_terms(text)
+    if not terms:
+        return query, None
+
+    if db.engine.dialect.name == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column("missing_persons.search_vector")
+        query = query.filter(vector.op("@@")(tsquery))
+        return query, func.ts_rank_cd(vector, tsquery).desc()
+
+    # sqlite: join against the FTS5 table, bm25() is lower-is-better
+    fts = literal_column(FTS_TABLE)
+    weights = [literal_column(str(weight)) for _, _, weight in SEARCH_COLUMNS]
+    match = " ".join(f'"{term}"*' for term in terms)
+    hits = (
+        select(
+            literal_column("rowid").label("id"),
+            func.bm25(fts, *weights).label("rank"),
+        )
+        .select_from(table(FTS_TABLE))
+        .where(fts.op("MATCH")(match))
+        .subquery()
+    )
+    query = query.join(hits, hits.c.id == MissingPerson.id)
+    return query, hits.c.rank.asc()
@@ -1,4 +1,4 @@
-from .db import db, bcrypt
+from .db import db, password_hasher
 import datetime
 
 class User(db.Model):
@@ -11,10 +11,11 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        # may raise HasherBusy when the hashing pool is saturated
+        self.password_hash = password_hasher.hash(password)
         
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -0,0 +1,56 @@
+# routes/alerts.py
+
+from flask import Blueprint, request, jsonify
+from utils.auth import auth_required, current_user_id
+from controllers.alerts_controller import AlertsController
+
+alerts_bp = Blueprint("alerts", __name__, url_prefix="/api/alerts")
+
+
+# ----------------------------------------
+# SAVE A SEARCH TO BE ALERTED ABOUT (AUTH REQUIRED)
+# body: {"name": "...", "filters": {search parameters}}
+# ----------------------------------------
+@alerts_bp.route("/subscriptions", methods=["POST"])
+@auth_required
+def create_subscription():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "expected a JSON object"}), 400
+    try:
+        subscription = AlertsController.create_subscription(current_user_id(), data)
+    except ValueError as e:  # bad filters, unknown place, too many alerts
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    return jsonify({"success": True, "data": subscription}), 201
+
+
+@alerts_bp.route("/subscriptions", methods=["GET"])
+@auth_required
+def list_subscriptions():
+    return jsonify({
+        "success": True,
+        "data": AlertsController.list_subscriptions(current_user_id())
+    }), 200
+
+
+@alerts_bp.route("/subscriptions/<int:subscription_id>", methods=["DELETE"])
+@auth_required
+def delete_subscription(subscription_id):
+    if not AlertsController.delete_subscription(current_user_id(), subscription_id):
+        return jsonify({"success": False, "error": "Not found"}), 404
+    return jsonify({"success": True}), 200
+
+
+# ----------------------------------------
+# ALERTS SENT OR QUEUED FOR ME (AUTH REQUIRED)
+# ----------------------------------------
+@alerts_bp.route("/notifications", methods=["GET"])
+@auth_required
+def list_notifications():
+    return jsonify({
+        "success": True,
+        "data": AlertsController.list_notifications(
+            current_user_id(), request.args.get("limit", 50, type=int)
+        )
+    }), 200
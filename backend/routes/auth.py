@@ -1,11 +1,16 @@
 from flask import Blueprint, request, jsonify
-import jwt
-import datetime
-from models.db import db, bcrypt
+from models.db import db
 from models.user import User
+from utils.auth import auth_required, current_user, issue_token
+from utils.password_hasher import HasherBusy
 
 auth_bp = Blueprint('auth', __name__)
-SECRET_KEY = "findme-secret-key-2024"
+
+def _busy_response(error):
+    """fast 503 when the password hashing pool is saturated"""
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @auth_bp.route('/api/auth/register', methods=['POST'])
 def register():
@@ -28,11 +33,7 @@ def register():
         db.session.add(new_user)
         db.session.commit()
         
-        token = jwt.encode({
-            'user_id': new_user.id,
-            'email': new_user.email,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-        }, SECRET_KEY, algorithm='HS256')
+        token = issue_token(new_user)
         
         return jsonify({
             'message': 'user registered successfully',
@@ -40,6 +41,9 @@ def register():
             'token': token
         }), 201
         
+    except HasherBusy as e:
+        db.session.rollback()
+        return _busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'registration failed: {str(e)}'}), 500
@@ -57,11 +61,7 @@ def login():
         if not user or not user.check_password(data['password']):
             return jsonify({'error': 'invalid email or password'}), 401
         
-        token = jwt.encode({
-            'user_id': user.id,
-            'email': user.email,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=24)
-        }, SECRET_KEY, algorithm='HS256')
+        token = issue_token(user)
         
         return jsonify({
             'message': 'login successful',
@@ -70,29 +70,16 @@ def login():
             'token': token
         }), 200
         
+    except HasherBusy as e:
+        return _busy_response(e)
     except Exception as e:
         return jsonify({'error': f'login failed: {str(e)}'}), 500
 
 @auth_bp.route('/api/auth/me', methods=['GET'])
+@auth_required
 def get_current_user():
-    token = request.headers.get('Authorization')
-    
-    if not token:
-        return jsonify({'error': 'authentication token is required'}), 401
-    
-    try:
-        if token.startswith('Bearer '):
-            token = token[7:]
-            
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        
-        user = User.query.get(payload['user_id'])
-        if not user:
-            return jsonify({'error': 'user not found'}), 404
-            
-        return jsonify(user.to_dict()), 200
+    user = current_user()
+    if not user:
+        return jsonify({'error': 'user not found'}), 404
         
-    except jwt.ExpiredSignatureError:
-        return jsonify({'error': 'your session has expired, please login again'}), 401
-    except jwt.InvalidTokenError:
-        return jsonify({'error': 'invalid authentication token'}), 401
+    return jsonify(user), 200
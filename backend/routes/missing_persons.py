@@ -1,11 +1,28 @@
 
 # routes/missing_persons.py
 
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from utils.cloudinary_helper import upload_photo
+import io
+import logging
+from datetime import datetime
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+from utils.auth import auth_required, current_user_id
+from utils.photo_uploads import get_photo_uploads
+from utils.http_cache import conditional
+from utils.events import EventFilter, format_sse, get_event_broker
 from models.missing_person import MissingPerson
 from models.db import db
+from models.routing import use_primary
+from controllers.changes_controller import DEFAULT_CHANGES_LIMIT, ChangesController
+from controllers.duplicates_controller import DuplicatesController
+from controllers.import_controller import IMPORT_BATCH_SIZE, ImportController, read_records
+from controllers.missing_persons_controller import (
+    DEFAULT_PAGE_SIZE,
+    create_missing_persons,
+    get_all_missing_persons,
+    get_missing_persons_by_ids,
+    stream_missing_persons,
+    update_statuses,
+)
 
 missing_persons_bp = Blueprint(
     "missing_persons", 
@@ -13,54 +30,284 @@ missing_persons_bp = Blueprint(
     url_prefix="/api/missing-persons"
 )
 
+logger = logging.getLogger(__name__)
+
 # ----------------------------------------
 # CREATE REPORT (AUTHENTICATION REQUIRED)
 # ----------------------------------------
 @missing_persons_bp.route("", methods=["POST"])
-@jwt_required()
+@auth_required
 def create_missing_person_route():
-    user_id = get_jwt_identity()
+    user_id = current_user_id()
 
     # Accept form-data and JSON
+    spool_path = None
     if request.content_type and request.content_type.startswith("multipart/form-data"):
         data = request.form.to_dict()
+        # form values always arrive as strings
+        if data.get("age"):
+            data["age"] = int(data["age"])
         photo = request.files.get("photo")
         if photo:
-            data["photo_url"] = upload_photo(photo)
+            # only spool the bytes here, the upload runs in the background
+            try:
+                spool_path = get_photo_uploads(current_app).spool(photo)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            data["photo_status"] = "pending"
     else:
         data = request.get_json()
 
-    data["user_id"] = user_id
+    try:
+        # a real datetime, so the duplicate check can compare dates
+        if isinstance(data.get("last_seen_date"), str):
+            data["last_seen_date"] = datetime.fromisoformat(data["last_seen_date"])
+        data["user_id"] = user_id
+
+        person = MissingPerson(**data)
+        db.session.add(person)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        if spool_path:
+            # never queued, so `flask photos resume` would not pick it up
+            get_photo_uploads(current_app).remove_spooled(spool_path)
+        raise
+
+    if spool_path:
+        get_photo_uploads(current_app).enqueue(person.id, spool_path)
 
-    person = MissingPerson(**data)
-    db.session.add(person)
-    db.session.commit()
+    # the report is saved either way; a failed check must not turn into an
+    # error the client would answer by filing the report again
+    try:
+        possible_duplicates = DuplicatesController.find_candidates(person)
+    except Exception:
+        logger.exception("duplicate check failed for report %s", person.id)
+        possible_duplicates = []
 
     return jsonify({
         "success": True,
         "message": "Missing person report created",
-        "data": person.to_dict()
+        "data": person.to_dict(),
+        "possible_duplicates": possible_duplicates
     }), 201
 
 
+# ----------------------------------------
+# BATCH CREATE AND STATUS UPDATE (AUTHENTICATION REQUIRED)
+# POST body: a JSON list of reports. PATCH body: a JSON list of
+# {"id": ..., "status": ...}. Each request is one transaction and
+# answers with a result per item: 200/201 when every item succeeded,
+# 207 when some did, 400 when none did.
+# ----------------------------------------
+def _batch_response(results, success_status):
+    succeeded = sum(1 for result in results if result["success"])
+    if succeeded == len(results):
+        status = success_status
+    else:
+        status = 207 if succeeded else 400
+    return jsonify({
+        "success": succeeded == len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results
+    }), status
+
+
+@missing_persons_bp.route("/batch", methods=["POST"])
+@auth_required
+def create_batch_route():
+    try:
+        results = create_missing_persons(request.get_json(silent=True), current_user_id())
+    except ValueError as e:  # not a list, or too many reports
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:  # e.g. a case number conflict on the retry too
+        db.session.rollback()
+        logger.exception("batch create failed")
+        return jsonify({"success": False, "error": str(e)}), 500
+    return _batch_response(results, 201)
+
+
+@missing_persons_bp.route("/batch", methods=["PATCH"])
+@auth_required
+def update_batch_route():
+    try:
+        results = update_statuses(request.get_json(silent=True), current_user_id())
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("batch status update failed")
+        return jsonify({"success": False, "error": str(e)}), 500
+    return _batch_response(results, 200)
+
+
+# ----------------------------------------
+# BULK IMPORT (AUTHENTICATION REQUIRED)
+# body is NDJSON (application/x-ndjson) or CSV with a header row
+# (text/csv), or a multipart upload in a `file` field; ?format=ndjson|csv
+# overrides the content type. Rows are validated and inserted in batches
+# and invalid rows are reported without failing the import.
+# ----------------------------------------
+IMPORT_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+@missing_persons_bp.route("/import", methods=["POST"])
+@auth_required
+def import_reports_route():
+    user_id = current_user_id()
+
+    upload = request.files.get("file")
+    if upload:
+        stream = upload.stream
+        default_format = "csv" if (upload.filename or "").lower().endswith(".csv") else "ndjson"
+    else:
+        # read the body as it arrives instead of buffering it
+        stream = io.BufferedReader(request.stream)
+        default_format = IMPORT_CONTENT_TYPES.get(request.mimetype)
+    fmt = request.args.get("format", default_format)
+
+    try:
+        lines = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        summary = ImportController.import_records(
+            read_records(lines, fmt),
+            user_id,
+            batch_size=current_app.config.get("IMPORT_BATCH_SIZE", IMPORT_BATCH_SIZE),
+        )
+    except ValueError as e:  # unknown format
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("bulk import failed")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return jsonify({
+        "success": True,
+        "message": f"Imported {summary['imported']} reports",
+        "data": summary
+    }), 200
+
+
 # ----------------------------------------
 # GET ALL REPORTS
+# ?limit=&cursor= pages through reports newest first,
+# ?format=ndjson streams every report, one JSON object per line,
+# ?fields=id,full_name,... returns only the listed fields,
+# ?ids=1,2,3 returns just those reports (one query), listing unknown ids
+# under "missing"
 # ----------------------------------------
 @missing_persons_bp.route("", methods=["GET"])
+@conditional()
 def list_all_reports():
-    persons = MissingPerson.query.all()
+    try:
+        if request.args.get("ids"):
+            data, missing = get_missing_persons_by_ids(request.args["ids"], request.args.get("fields"))
+            return jsonify({"success": True, "data": data, "missing": missing}), 200
+
+        if request.args.get("format") == "ndjson":
+            return Response(
+                stream_with_context(stream_missing_persons(fields=request.args.get("fields"))),
+                mimetype="application/x-ndjson",
+            )
+
+        data, next_cursor = get_all_missing_persons(
+            limit=request.args.get("limit", DEFAULT_PAGE_SIZE, type=int),
+            cursor=request.args.get("cursor"),
+            fields=request.args.get("fields"),
+        )
+    except ValueError as e:  # bad cursor or unknown field
+        return jsonify({"success": False, "error": str(e)}), 400
+
     return jsonify({
         "success": True,
-        "data": [p.to_dict() for p in persons]
+        "data": data,
+        "next_cursor": next_cursor
     }), 200
 
 
+# ----------------------------------------
+# CHANGES SINCE A SEQUENCE NUMBER OR TIMESTAMP
+# ?since=<next_since from the last call> returns the reports created,
+# updated or deleted since then; no since starts a full sync
+# ----------------------------------------
+def _changes_response(user_id=None):
+    try:
+        result = ChangesController.get_changes(
+            since=request.args.get("since"),
+            limit=request.args.get("limit", DEFAULT_CHANGES_LIMIT, type=int),
+            fields=request.args.get("fields"),
+            user_id=user_id,
+            settle_seconds=current_app.config.get("CHANGE_FEED_SETTLE_SECONDS", 0),
+        )
+    except ValueError as e:  # bad since or unknown field
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    return jsonify({"success": True, **result}), 200
+
+
+@missing_persons_bp.route("/changes", methods=["GET"])
+def get_changes():
+    return _changes_response()
+
+
+@missing_persons_bp.route("/mine/changes", methods=["GET"])
+@auth_required
+def get_my_changes():
+    return _changes_response(user_id=current_user_id())
+
+
+# ----------------------------------------
+# LIVE STREAM OF NEW REPORTS AND CHANGES (server-sent events)
+# ?location=&status=&min_age=&max_age= narrow what is pushed.
+# A "resync" event means the client fell behind and should catch up
+# with /changes before reconnecting.
+# ----------------------------------------
+@missing_persons_bp.route("/stream", methods=["GET"])
+def stream_events():
+    try:
+        event_filter = EventFilter.from_args(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    broker = get_event_broker(current_app)
+    try:
+        subscription = broker.subscribe(event_filter)
+    except RuntimeError as e:  # too many open streams
+        return jsonify({"success": False, "error": str(e)}), 503
+    heartbeat = current_app.config.get("EVENT_HEARTBEAT_SECONDS", 15)
+
+    # runs after the request context is gone; touches no database
+    def generate():
+        try:
+            yield b"retry: 5000\n\n"
+            while not subscription.overflowed:
+                event = subscription.get(timeout=heartbeat)
+                # a comment line keeps proxies from closing an idle stream
+                yield format_sse(event) if event is not None else b": keep-alive\n\n"
+            yield b"event: resync\ndata: {}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx: pass events through immediately
+    })
+
+
 # ----------------------------------------
 # GET SINGLE REPORT
 # ----------------------------------------
 @missing_persons_bp.route("/<int:person_id>", methods=["GET"])
+@conditional(per_item=True)
 def get_single_report(person_id):
     person = MissingPerson.query.get(person_id)
+    if not person and use_primary():
+        # a report created moments ago may not have reached the replica yet
+        person = MissingPerson.query.get(person_id)
     if not person:
         return jsonify({"success": False, "error": "Not found"}), 404
 
@@ -70,16 +317,40 @@ def get_single_report(person_id):
     }), 200
 
 
+# ----------------------------------------
+# POSSIBLE DUPLICATES OF A REPORT
+# ----------------------------------------
+@missing_persons_bp.route("/<int:person_id>/duplicates", methods=["GET"])
+def get_report_duplicates(person_id):
+    person = db.session.get(MissingPerson, person_id)
+    if not person:
+        return jsonify({"success": False, "error": "Not found"}), 404
+
+    return jsonify({
+        "success": True,
+        "data": DuplicatesController.find_candidates(person)
+    }), 200
+
+
 # ----------------------------------------
 # GET MY REPORTS (AUTH REQUIRED)
 # ----------------------------------------
 @missing_persons_bp.route("/mine", methods=["GET"])
-@jwt_required()
+@auth_required
 def get_my_reports():
-    user_id = get_jwt_identity()
-    reports = MissingPerson.query.filter_by(user_id=user_id).all()
+    user_id = current_user_id()
+    try:
+        data, next_cursor = get_all_missing_persons(
+            limit=request.args.get("limit", DEFAULT_PAGE_SIZE, type=int),
+            cursor=request.args.get("cursor"),
+            user_id=user_id,
+            fields=request.args.get("fields"),
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
 
     return jsonify({
         "success": True,
-        "data": [p.to_dict() for p in reports]
+        "data": data,
+        "next_cursor": next_cursor
     }), 200
\ No newline at end of file
@@ -1,41 +1,109 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from utils.auth import auth_required
+from utils.http_cache import conditional
 from controllers.search_controller import SearchController
+from controllers.export_controller import EXPORT_CONTENT_TYPES, ExportController
+from controllers.matching_controller import MatchingController
+from controllers.map_controller import MapController
+from controllers.statistics_controller import StatisticsController
 
 search_bp = Blueprint('search', __name__, url_prefix='/api')
 
 @search_bp.route('/search', methods=['GET'])
+@conditional()
 def search_missing_persons():
     """Search missing persons with filters"""
     try:
         results = SearchController.search_missing_persons(request.args.to_dict())
         return jsonify(results), 200
+    except ValueError as e:
+        # bad cursor, count mode or malformed numeric/date filter
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@search_bp.route('/missing-persons/location/<city>', methods=['GET'])  # Changed county to city
-def filter_by_location(county):  
-    """Filter by location"""
+@search_bp.route('/missing-persons/export', methods=['GET'])
+@auth_required
+def export_missing_persons():
+    """Stream every report matching the search filters as CSV, NDJSON or Parquet"""
+    fmt = request.args.get('format', 'csv')
     try:
-        results = SearchController.filter_by_location(county)
-        return jsonify({'location': county, 'count': len(results), 'results': results}), 200
+        chunks = ExportController.export(request.args.to_dict(), fmt)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_CONTENT_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename=missing-persons.{fmt}'},
+    )
+
+@search_bp.route('/map/clusters', methods=['GET'])
+def get_map_clusters():
+    """Report counts clustered per map tile for one zoom level and view"""
+    try:
+        return jsonify(MapController.get_clusters(request.args.to_dict())), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@search_bp.route('/sightings/match', methods=['POST'])
+def match_sighting():
+    """Rank open cases against a description of someone found or sighted"""
+    try:
+        results = MatchingController.match_sighting(request.get_json(silent=True) or {})
+        return jsonify(results), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@search_bp.route('/missing-persons/location/<city>', methods=['GET'])
+@conditional()
+def filter_by_location(city):
+    """Filter by location (county, town or free text)"""
+    try:
+        results = SearchController.filter_by_location(city, request.args.get('fields'))
+        return jsonify({'location': city, 'count': len(results), 'results': results}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @search_bp.route('/missing-persons/recent', methods=['GET'])
+@conditional(time_bucket=60)  # the "last N days" window moves
 def get_recent_reports():
     """Get recent reports (last 7 days)"""
     try:
         days = request.args.get('days', 7, type=int)
-        results = SearchController.get_recent_reports(days)
+        if 'cursor' in request.args:
+            results, next_cursor = SearchController.get_recent_reports_page(
+                days,
+                request.args.get('cursor'),
+                request.args.get('per_page', 20, type=int),
+                request.args.get('fields')
+            )
+            return jsonify({
+                'days': days,
+                'count': len(results),
+                'results': results,
+                'next_cursor': next_cursor
+            }), 200
+        results = SearchController.get_recent_reports(days, request.args.get('fields'))
         return jsonify({'days': days, 'count': len(results), 'results': results}), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @search_bp.route('/missing-persons/stats', methods=['GET'])
+@conditional(max_age=30)
 def get_statistics():
     """Get platform statistics"""
     try:
-        stats = SearchController.get_statistics()
+        stats = StatisticsController.get_statistics()
         return jsonify(stats), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
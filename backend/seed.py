@@ -1,5 +1,6 @@
 from app import create_app, db
 from models.missing_person import MissingPerson
+from controllers.statistics_controller import StatisticsController
 from datetime import datetime, timedelta
 import random
 
@@ -11,6 +12,8 @@ def seed_database():
         print("🗑️  Clearing existing data...")
         MissingPerson.query.delete()
         db.session.commit()
+        # bulk delete bypasses the statistics hooks
+        StatisticsController.reconcile()
         
         # Sample data
         first_names = ["John", "Mary", "David", "Alice", "Peter", "Grace", "James", "Sarah", "Michael", "Jane"]
@@ -0,0 +1,184 @@
+import pytest
+import json
+from app import create_app, db
+from models.alert import AlertNotification, AlertSubscription
+from models.missing_person import MissingPerson
+from models.user import User
+from flask_jwt_extended import create_access_token
+from controllers.alerts_controller import AlertsController
+from utils.alert_outbox import MemoryOutbox
+from utils.alert_matching import SubscriptionIndex, compile_filters, matches
+from datetime import datetime
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def users(app):
+    users = [User(name=f"User {n}", email=f"user{n}@test.com") for n in range(3)]
+    for user in users:
+        user.set_password("secret123")
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+def headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+def add_report(case_number, user, **values):
+    fields = dict(
+        full_name=f"Person {case_number}", age=19, gender="Female",
+        last_seen_date=datetime(2026, 9, 1), last_seen_location="Kisumu",
+        contact_name="Contact", contact_phone="+254712345678",
+        case_number=case_number, user_id=user.id
+    )
+    fields.update(values)
+    person = MissingPerson(**fields)
+    db.session.add(person)
+    db.session.commit()
+    return person
+
+def subscribe(client, user, filters, name="Watch"):
+    response = client.post('/api/alerts/subscriptions', headers=headers(user),
+                           json={'name': name, 'filters': filters})
+    assert response.status_code == 201, response.data
+    return json.loads(response.data)['data']
+
+def test_new_reports_queue_matching_alerts(client, users):
+    """Test that a new report queues alerts for the saved searches it matches only"""
+    watcher, other, reporter = users
+    near = subscribe(client, watcher, {'gender': 'female', 'age_min': 15, 'age_max': 25,
+                                       'near': 'Kisumu', 'radius_km': 30})
+    subscribe(client, other, {'status': 'missing', 'location': 'mombasa'})
+
+    add_report("MATCH", reporter)
+    add_report("TOO-OLD", reporter, age=40)
+    add_report("FAR", reporter, last_seen_location="Mombasa")
+    # no alert about your own report
+    add_report("OWN", watcher)
+
+    queued = AlertNotification.query.order_by(AlertNotification.id).all()
+    assert [(n.subscription_id, n.person_id) for n in queued] == [(near['id'], 1), (2, 3)]
+    assert {n.status for n in queued} == {'pending'}
+
+def test_delivery_through_outbox(app, client, users):
+    watcher, _, reporter = users
+    subscribe(client, watcher, {'county': 'Kisumu'}, name="Kisumu cases")
+    add_report("K1", reporter)
+    add_report("K2", reporter)
+
+    outbox = app.extensions['alert_outbox']
+    assert AlertsController.deliver_pending(outbox) == {'sent': 2, 'retrying': 0, 'failed': 0}
+    assert [m['report']['case_number'] for m in outbox.sent] == ['K1', 'K2']
+    assert outbox.sent[0]['user']['email'] == 'user0@test.com'
+    assert outbox.sent[0]['subscription']['name'] == 'Kisumu cases'
+    # sent notifications are not sent again
+    assert AlertsController.deliver_pending(outbox) == {'sent': 0, 'retrying': 0, 'failed': 0}
+
+    response = client.get('/api/alerts/notifications', headers=headers(watcher))
+    assert [n['status'] for n in json.loads(response.data)['data']] == ['sent', 'sent']
+
+def test_sending_happens_outside_the_claim(app, client, users):
+    """Test that messages are sent with no transaction open and the batch leased"""
+    subscribe(client, users[0], {'status': 'missing'})
+    add_report("LEASED", users[1])
+    seen = []
+
+    class CheckingOutbox:
+        def send(self, message):
+            seen.append(db.session().in_transaction())
+            # another worker finds nothing due while this one sends
+            seen.append(AlertsController.deliver_pending(MemoryOutbox()))
+
+    assert AlertsController.deliver_pending(CheckingOutbox())['sent'] == 1
+    assert seen == [False, {'sent': 0, 'retrying': 0, 'failed': 0}]
+    assert AlertNotification.query.one().status == 'sent'
+
+def test_failed_deliveries_are_retried(client, users):
+    class BrokenOutbox:
+        def send(self, message):
+            raise RuntimeError("gateway down")
+
+    subscribe(client, users[0], {'status': 'missing'})
+    add_report("RETRY", users[1])
+    assert AlertsController.deliver_pending(BrokenOutbox(), retry_delay=0) == {'sent': 0, 'retrying': 1, 'failed': 0}
+    notification = AlertNotification.query.one()
+    assert notification.attempts == 1 and notification.last_error == "gateway down"
+    assert AlertsController.deliver_pending(BrokenOutbox(), retry_delay=0, max_attempts=2)['failed'] == 1
+    assert AlertNotification.query.one().status == 'failed'
+
+def test_unsubscribe_and_validation(client, users):
+    user = users[0]
+    saved = subscribe(client, user, {'location': 'nairobi'})
+    assert len(json.loads(client.get('/api/alerts/subscriptions', headers=headers(user)).data)['data']) == 1
+    assert client.delete(f"/api/alerts/subscriptions/{saved['id']}", headers=headers(users[1])).status_code == 404
+    assert client.delete(f"/api/alerts/subscriptions/{saved['id']}", headers=headers(user)).status_code == 200
+    add_report("NAIROBI", users[1], last_seen_location="Nairobi")
+    assert AlertNotification.query.count() == 0
+
+    for filters in ({'q': 'red shirt'}, {'near': 'Atlantis'}, {}, {'age_min': 'x'},
+                    {'lat': 1}, {'lon': 36.8}, {'age_min': [1]}, {'lat': [1], 'lon': 2},
+                    {'bbox': {'min': 1}}):
+        response = client.post('/api/alerts/subscriptions', headers=headers(user),
+                               json={'name': 'Bad', 'filters': filters})
+        assert response.status_code == 400
+        assert 'error' in json.loads(response.data)
+    assert client.post('/api/alerts/subscriptions', json={'name': 'x', 'filters': {}}).status_code == 401
+
+    for body in (['name', 'filters'], "x", 5, None):
+        response = client.post('/api/alerts/subscriptions', headers=headers(user), json=body)
+        assert response.status_code == 400
+    response = client.post('/api/alerts/subscriptions', headers=headers(user), data='{not json',
+                           content_type='application/json')
+    assert response.status_code == 400
+
+def test_late_commits_are_picked_up_by_rebuild(app, client, users):
+    """Test that a subscription stamped before the last sync is not missed for good"""
+    watcher, _, reporter = users
+    subscribe(client, watcher, {'location': 'kisumu'})
+    add_report("SYNCED", reporter)
+    # committed late by another worker: stamped before what this one has synced
+    db.session.add(AlertSubscription(user_id=users[1].id, name="Late", filters={'location': 'kisumu'},
+                                     updated_at=datetime(2020, 1, 1)))
+    db.session.commit()
+    add_report("MISSED", reporter)
+    assert AlertNotification.query.filter_by(user_id=users[1].id).count() == 0
+
+    app.config['ALERT_INDEX_REBUILD_INTERVAL'] = 0
+    add_report("REBUILT", reporter)
+    assert AlertNotification.query.filter_by(user_id=users[1].id).count() == 1
+
+def test_index_only_checks_candidates():
+    index = SubscriptionIndex()
+    for n in range(100):
+        index.upsert(n, n, compile_filters({'location': f'village {n:03d}'}))
+    index.upsert(100, 1, compile_filters({'gender': 'male', 'age_min': 10, 'age_max': 14}))
+    report = {'status': 'missing', 'gender': 'Male', 'age': 12, 'full_name': 'Juma',
+              'last_seen_location': 'Village 042, Kakamega'}
+    candidates = index.candidates(report)
+    assert 42 in candidates and 100 in candidates
+    assert len(candidates) < 5
+    assert index.match(report) == [(42, 42), (100, 1)]
+
+    index.remove(42)
+    assert index.match(report) == [(100, 1)]
+
+def test_matches_follows_search_semantics():
+    criteria = compile_filters({'bbox': '34.0,-1.0,35.0,0.0', 'status': 'missing', 'name': 'ann'})
+    report = {'status': None, 'full_name': 'Joanne W', 'latitude': -0.1, 'longitude': 34.7}
+    assert matches(criteria, report)
+    assert not matches(criteria, dict(report, latitude=None))
+    assert not matches(compile_filters({'age_max': 30}), {'age': None})
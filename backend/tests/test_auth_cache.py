@@ -0,0 +1,107 @@
+import pytest
+from app import create_app
+from models.db import db
+from models.user import User
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from datetime import timedelta
+
+@pytest.fixture
+def app():
+    """create a test application instance"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """create a test client for making requests"""
+    return app.test_client()
+
+@pytest.fixture
+def token(client):
+    """register a user and return the issued token"""
+    response = client.post('/api/auth/register', json={
+        'name': 'Test User',
+        'email': 'test@test.com',
+        'password': 'test123'
+    })
+    return response.json['token']
+
+def count_queries(app, fn):
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+def test_register_token_works_on_missing_persons_routes(client, token):
+    """test that one token is accepted by both blueprints"""
+    headers = {'Authorization': f'Bearer {token}'}
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+    response = client.get('/api/missing-persons/mine', headers=headers)
+    assert response.status_code == 200
+    assert response.json['data'] == []
+
+def test_me_is_served_from_cache(app, client, token):
+    """test that repeat calls skip the users lookup"""
+    headers = {'Authorization': f'Bearer {token}'}
+    first = client.get('/api/auth/me', headers=headers)
+    assert first.json['email'] == 'test@test.com'
+
+    statements = count_queries(app, lambda: client.get('/api/auth/me', headers=headers))
+    assert statements == []
+
+    cache = app.extensions['auth']
+    assert cache.tokens.hits >= 1
+    assert cache.users.hits >= 1
+
+def test_user_change_invalidates_cache(app, client, token):
+    """test that an updated user is not served stale"""
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/api/auth/me', headers=headers)
+
+    user = User.query.filter_by(email='test@test.com').first()
+    user.name = 'Renamed User'
+    db.session.commit()
+
+    assert client.get('/api/auth/me', headers=headers).json['name'] == 'Renamed User'
+
+def test_deleted_user_returns_404(app, client, token):
+    """test that a cached user disappears once deleted"""
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/api/auth/me', headers=headers)
+
+    db.session.delete(User.query.first())
+    db.session.commit()
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 404
+
+def test_missing_and_invalid_tokens(client):
+    """test the 401 responses"""
+    assert client.get('/api/auth/me').status_code == 401
+
+    response = client.get('/api/auth/me', headers={'Authorization': 'Bearer not.a.token'})
+    assert response.status_code == 401
+    assert response.json['error'] == 'invalid authentication token'
+
+def test_expired_token_rejected(app, client, token):
+    """test that expired tokens are rejected, including cached ones"""
+    expired = create_access_token(identity=1, expires_delta=timedelta(seconds=-1))
+    response = client.get('/api/auth/me', headers={'Authorization': f'Bearer {expired}'})
+    assert response.status_code == 401
+    assert 'expired' in response.json['error']
+
+def test_token_from_other_secret_rejected(app, client):
+    """test that tokens signed with another key are not accepted"""
+    import jwt
+    forged = jwt.encode({'sub': 1, 'type': 'access'}, 'findme-secret-key-2024', algorithm='HS256')
+    response = client.get('/api/auth/me', headers={'Authorization': f'Bearer {forged}'})
+    assert response.status_code == 401
@@ -0,0 +1,136 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def users(app):
+    users = [User(name=f"Partner {n}", email=f"partner{n}@test.com") for n in range(2)]
+    for user in users:
+        user.set_password("secret123")
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+def headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+def report(case_number, **values):
+    data = {
+        "full_name": f"Person {case_number}", "age": 25, "gender": "Male",
+        "last_seen_date": "2026-09-01T10:00:00", "last_seen_location": "Nakuru",
+        "contact_name": "Station", "contact_phone": "+254712345678",
+        "case_number": case_number,
+    }
+    data.update(values)
+    return data
+
+@pytest.fixture
+def count_statements(app):
+    """Collects every SQL statement run while the test is active"""
+    statements = []
+    engine = db.engine
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+def test_batch_create(client, users, count_statements):
+    """Test that a batch is created in one transaction with per-item results"""
+    items = [report(f"POL{n:03d}") for n in range(50)]
+    response = client.post('/api/missing-persons/batch', headers=headers(users[0]), json=items)
+    assert response.status_code == 201
+    body = json.loads(response.data)
+    assert body['succeeded'] == 50 and body['failed'] == 0
+    assert [r['data']['case_number'] for r in body['results']] == [f"POL{n:03d}" for n in range(50)]
+    assert MissingPerson.query.filter_by(user_id=users[0].id).count() == 50
+    # lookups and side tables are done once for the whole batch, not per report
+    # (SQLite sends the rows one INSERT at a time, PostgreSQL in one statement)
+    others = [s for s in count_statements if not s.startswith('INSERT INTO missing_persons')]
+    assert len(others) < 20
+
+def test_batch_create_reports_bad_items(client, users):
+    client.post('/api/missing-persons/batch', headers=headers(users[0]), json=[report("TAKEN")])
+    items = [report("OK1"), report("BAD", age=300), report("TAKEN"), report("OK1"), report("OK2")]
+    response = client.post('/api/missing-persons/batch', headers=headers(users[0]), json=items)
+    assert response.status_code == 207
+    results = json.loads(response.data)['results']
+    assert [r['success'] for r in results] == [True, False, False, False, True]
+    assert 'age' in results[1]['error']
+    assert results[2]['error'] == {'case_number': ['case number already exists']}
+
+    assert client.post('/api/missing-persons/batch', headers=headers(users[0]),
+                       json=[report("BAD", gender="?")]).status_code == 400
+    assert client.post('/api/missing-persons/batch', headers=headers(users[0]), json={}).status_code == 400
+    assert client.post('/api/missing-persons/batch', json=[report("X")]).status_code == 401
+
+def test_batch_create_conflict_on_retry(client, users, monkeypatch):
+    """Test that a batch failing twice answers with a JSON 500 and rolls back"""
+    def conflict():
+        raise IntegrityError("INSERT INTO missing_persons", {}, Exception("UNIQUE constraint failed"))
+    monkeypatch.setattr(db.session, 'flush', conflict)
+    response = client.post('/api/missing-persons/batch', headers=headers(users[0]), json=[report("RACE")])
+    assert response.status_code == 500
+    assert json.loads(response.data)['success'] is False
+
+    monkeypatch.undo()
+    assert client.post('/api/missing-persons/batch', headers=headers(users[0]),
+                       json=[report("RACE")]).status_code == 201
+
+def test_get_by_ids(client, users):
+    client.post('/api/missing-persons/batch', headers=headers(users[0]),
+                json=[report(f"IDS{n}") for n in range(5)])
+    response = client.get('/api/missing-persons?ids=4,2,99,2&fields=case_number')
+    assert response.status_code == 200
+    body = json.loads(response.data)
+    assert body['data'] == [{'id': 4, 'case_number': 'IDS3'}, {'id': 2, 'case_number': 'IDS1'}]
+    assert body['missing'] == [99]
+    assert client.get('/api/missing-persons?ids=1,x').status_code == 400
+    ids = ','.join(str(n) for n in range(1, 102))
+    assert client.get(f'/api/missing-persons?ids={ids}').status_code == 400
+
+def test_batch_status_update(client, users):
+    mine = headers(users[0])
+    client.post('/api/missing-persons/batch', headers=mine, json=[report("UPD1"), report("UPD2")])
+    client.post('/api/missing-persons/batch', headers=headers(users[1]), json=[report("OTHER")])
+
+    response = client.patch('/api/missing-persons/batch', headers=mine, json=[
+        {"id": 1, "status": "found"},
+        {"id": 2, "status": "closed"},
+        {"id": 3, "status": "found"},
+        {"id": 404, "status": "found"},
+        {"id": 1, "status": "lost"},
+    ])
+    assert response.status_code == 207
+    results = json.loads(response.data)['results']
+    assert [(r['success'], r.get('status')) for r in results] == [
+        (True, None), (True, None), (False, 403), (False, 404), (False, 400)
+    ]
+    assert results[0]['data']['status'] == 'found'
+    assert [p.status for p in MissingPerson.query.order_by(MissingPerson.id)] == ['found', 'closed', 'missing']
+
+    response = client.patch('/api/missing-persons/batch', headers=mine, json=[{"id": 1, "status": "missing"}])
+    assert response.status_code == 200
+    assert client.patch('/api/missing-persons/batch', headers=mine, json=[]).status_code == 400
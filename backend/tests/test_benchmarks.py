@@ -0,0 +1,66 @@
+import pytest
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.case_statistic import CaseStatistic
+from models.user import User
+from benchmarks.datagen import CASE_PREFIX, clear_dataset, generate_dataset, generate_reports
+from benchmarks.run import compare, percentile, run_benchmarks
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+def test_generated_data_is_reproducible(app):
+    """Test that the same seed gives the same reports"""
+    first = list(generate_reports(50, [1, 2, 3], seed=7))
+    second = list(generate_reports(50, [1, 2, 3], seed=7))
+    other = list(generate_reports(50, [1, 2, 3], seed=8))
+    strip = lambda rows: [{k: v for k, v in r.items() if k not in ('last_seen_date', 'created_at', 'updated_at')} for r in rows]
+    assert strip(first) == strip(second)
+    assert strip(first) != strip(other)
+    assert len({r['case_number'] for r in first}) == 50
+
+def test_generate_dataset(app):
+    """Test that bulk inserted data is complete and the counters agree"""
+    written = generate_dataset(300, 20, seed=1, batch_size=64)
+    assert written == {'users': 20, 'reports': 300}
+    assert MissingPerson.query.filter(MissingPerson.case_number.startswith(CASE_PREFIX)).count() == 300
+    total = CaseStatistic.query.filter_by(dimension='total').first()
+    assert total.count == 300
+    # most locations come from the gazetteer, so most reports are geocoded
+    assert MissingPerson.query.filter(MissingPerson.geohash.isnot(None)).count() > 250
+
+    with pytest.raises(ValueError):
+        generate_dataset(10, 2)
+
+    assert clear_dataset() == 300
+    assert User.query.count() == 0
+
+def test_run_benchmarks(app):
+    """Test that every scenario runs without errors and reports percentiles"""
+    generate_dataset(200, 10, batch_size=100)
+    results = run_benchmarks(app, iterations=4, warmup=1, concurrency=2)
+    assert results['meta']['reports'] == 200
+    assert set(results['results']) >= {'search_name', 'list', 'mine', 'recent', 'stats', 'login'}
+    for name, result in results['results'].items():
+        assert result['requests'] == 4, name
+        assert result['errors'] == 0, name
+        assert result['p50_ms'] <= result['p95_ms'] <= result['max_ms']
+
+    slower = {'results': {name: dict(r, p95_ms=r['p95_ms'] / 2) for name, r in results['results'].items()}}
+    assert {name for name, _, _ in compare(results, slower, 0.2)} == set(results['results'])
+    assert compare(results, results, 0.2) == []
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([5], 95) == 5
+    assert percentile([], 50) is None
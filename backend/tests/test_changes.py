@@ -0,0 +1,151 @@
+import pytest
+import json
+from app import create_app, db
+from models.change_log import ChangeLog
+from models.missing_person import MissingPerson
+from models.user import User
+from flask_jwt_extended import create_access_token
+from controllers.changes_controller import ChangesController
+from benchmarks.datagen import clear_dataset, generate_dataset
+from datetime import datetime, timedelta
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def users(app):
+    users = [User(name=f"User {n}", email=f"user{n}@test.com") for n in range(2)]
+    for user in users:
+        user.set_password("secret123")
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+def add_report(case_number, user):
+    person = MissingPerson(
+        full_name=f"Person {case_number}", age=30, gender="Male",
+        last_seen_date=datetime(2026, 9, 1), last_seen_location="Eldoret",
+        contact_name="Contact", contact_phone="+254712345678",
+        case_number=case_number, user_id=user.id
+    )
+    db.session.add(person)
+    db.session.commit()
+    return person
+
+def get_changes(client, **params):
+    response = client.get('/api/missing-persons/changes', query_string=params)
+    assert response.status_code == 200, response.data
+    return json.loads(response.data)
+
+def test_full_sync_then_deltas(client, users):
+    """Test that a client sees creates, updates and deletes after its cursor"""
+    first, second = add_report("CHG1", users[0]), add_report("CHG2", users[0])
+    synced = get_changes(client)
+    assert [(c['op'], c['data']['case_number']) for c in synced['changes']] == [
+        ('upsert', 'CHG1'), ('upsert', 'CHG2')
+    ]
+    since = synced['next_since']
+    assert get_changes(client, since=since)['changes'] == []
+
+    first.status = 'found'
+    db.session.commit()
+    third = add_report("CHG3", users[1])
+    second_id = second.id
+    db.session.delete(second)
+    db.session.commit()
+
+    delta = get_changes(client, since=since)
+    assert [(c['op'], c['id']) for c in delta['changes']] == [
+        ('upsert', first.id), ('upsert', third.id), ('delete', second_id)
+    ]
+    assert delta['changes'][0]['data']['status'] == 'found'
+    assert delta['next_since'] > since and delta['has_more'] is False
+
+def test_paging_and_fields(client, users):
+    for n in range(5):
+        add_report(f"PAGE{n}", users[0])
+    page = get_changes(client, limit=2, fields='case_number')
+    assert page['has_more'] is True
+    assert page['changes'][0]['data'] == {'id': 1, 'case_number': 'PAGE0'}
+    rest = get_changes(client, since=page['next_since'], limit=10)
+    assert [c['data']['case_number'] for c in rest['changes']] == ['PAGE2', 'PAGE3', 'PAGE4']
+    assert rest['has_more'] is False
+
+def test_repeated_changes_collapse(client, users):
+    """Test that a report changed twice, or created then deleted, appears once"""
+    person = add_report("TWICE", users[0])
+    person.age = 31
+    db.session.commit()
+    gone = add_report("GONE", users[0])
+    db.session.delete(gone)
+    db.session.commit()
+    assert ChangeLog.query.count() == 4
+
+    changes = get_changes(client)['changes']
+    assert [(c['op'], c['id']) for c in changes] == [('upsert', person.id), ('delete', 2)]
+    assert changes[0]['data']['age'] == 31
+
+    assert ChangesController.compact() == 2
+    assert get_changes(client)['changes'] == changes
+
+def test_since_timestamp_and_bad_cursor(client, users):
+    add_report("OLD", users[0])
+    ChangeLog.query.update({'changed_at': datetime.utcnow() - timedelta(days=2)})
+    db.session.commit()
+    add_report("NEW", users[0])
+    since = (datetime.utcnow() - timedelta(days=1)).isoformat() + 'Z'
+    changes = get_changes(client, since=since)['changes']
+    assert [c['data']['case_number'] for c in changes] == ['NEW']
+
+    response = client.get('/api/missing-persons/changes?since=yesterday')
+    assert response.status_code == 400
+
+def test_settle_window_is_a_cutoff(app, users):
+    """Test that a young entry holds back later numbers instead of being skipped"""
+    now = datetime.utcnow()
+    # sequence numbers and timestamps out of step, as with concurrent flushes
+    # or clock skew between hosts
+    for person_id, age in ((1, 60), (2, 0), (3, 60)):
+        db.session.add(ChangeLog(person_id=person_id, user_id=users[0].id, operation='delete',
+                                 changed_at=now - timedelta(seconds=age)))
+    db.session.commit()
+
+    settled = ChangesController.get_changes(settle_seconds=30)
+    assert [c['id'] for c in settled['changes']] == [1]
+    assert settled['next_since'] == 1
+    # once entry 2 is old enough, both it and 3 are delivered
+    ChangeLog.query.filter_by(person_id=2).update({'changed_at': now - timedelta(seconds=60)})
+    later = ChangesController.get_changes(since=str(settled['next_since']), settle_seconds=30)
+    assert [c['id'] for c in later['changes']] == [2, 3]
+
+def test_my_changes(client, users):
+    mine = add_report("MINE", users[0])
+    add_report("THEIRS", users[1])
+    db.session.delete(mine)
+    db.session.commit()
+
+    headers = {'Authorization': f'Bearer {create_access_token(identity=users[0].id)}'}
+    response = client.get('/api/missing-persons/mine/changes', headers=headers)
+    assert [(c['op'], c['id']) for c in json.loads(response.data)['changes']] == [('delete', 1)]
+    assert client.get('/api/missing-persons/mine/changes').status_code == 401
+
+def test_bulk_generated_data_is_logged(client):
+    generate_dataset(reports=20, users=2, batch_size=8)
+    synced = get_changes(client)
+    assert len(synced['changes']) == 20
+    clear_dataset()
+    changes = get_changes(client, since=synced['next_since'])['changes']
+    assert len(changes) == 20 and {c['op'] for c in changes} == {'delete'}
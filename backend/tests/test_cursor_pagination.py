@@ -0,0 +1,104 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from datetime import datetime, timedelta
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def seed_data(app):
+    """Seed 7 reports, two of them sharing the same last seen date"""
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+
+    base = datetime(2025, 11, 1, 12, 0, 0)
+    days_ago = [1, 2, 2, 3, 4, 5, 6]
+    db.session.add_all([
+        MissingPerson(
+            full_name=f"Person {i}", age=20 + i, gender="Female" if i % 2 else "Male",
+            last_seen_date=base - timedelta(days=days),
+            last_seen_location="Nairobi, Kenya",
+            contact_name="Contact", contact_phone="+254700000000",
+            status="missing", case_number=f"CUR{i:03d}", user_id=user.id
+        )
+        for i, days in enumerate(days_ago)
+    ])
+    db.session.commit()
+
+def get(client, query):
+    response = client.get(f'/api/search?{query}')
+    return response.status_code, json.loads(response.data)
+
+def test_cursor_walks_every_row_once(client, seed_data):
+    """Test that following next_cursor visits every row exactly once, newest first"""
+    seen = []
+    cursor = ''
+    while True:
+        status, data = get(client, f'per_page=3&cursor={cursor}')
+        assert status == 200
+        assert len(data['results']) <= 3
+        seen.extend(data['results'])
+        cursor = data['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len({r['id'] for r in seen}) == 7
+    keys = [(r['last_seen_date'], r['id']) for r in seen]
+    assert keys == sorted(keys, reverse=True)
+
+def test_cursor_mode_skips_count_by_default(client, seed_data):
+    """Test that the total is only computed when requested"""
+    _, data = get(client, 'cursor=&per_page=2')
+    assert data['total'] is None
+    assert data['next_cursor']
+
+    _, data = get(client, 'cursor=&per_page=2&count=exact')
+    assert data['total'] == 7
+    assert data['total_is_estimate'] is False
+
+    _, data = get(client, 'cursor=&per_page=2&count=estimate')
+    assert data['total'] == 7
+
+def test_cursor_respects_filters(client, seed_data):
+    """Test that filters apply on every cursor page"""
+    _, first = get(client, 'cursor=&per_page=2&gender=Female')
+    _, second = get(client, f"cursor={first['next_cursor']}&per_page=2&gender=Female")
+    results = first['results'] + second['results']
+    assert len(results) == 3
+    assert all(r['gender'] == 'Female' for r in results)
+    assert second['next_cursor'] is None
+
+def test_invalid_cursor_returns_400(client, seed_data):
+    """Test that a tampered cursor is rejected"""
+    status, data = get(client, 'cursor=not-a-cursor')
+    assert status == 400
+    assert 'error' in data
+
+    status, _ = get(client, 'cursor=&count=maybe')
+    assert status == 400
+
+def test_page_mode_unchanged(client, seed_data):
+    """Test that page/per_page pagination still returns page metadata"""
+    _, data = get(client, 'per_page=5&page=2')
+    assert data['total'] == 7
+    assert data['page'] == 2
+    assert len(data['results']) == 2
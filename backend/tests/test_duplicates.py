@@ -0,0 +1,121 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from flask_jwt_extended import create_access_token
+from utils.duplicate_matching import find_clusters, match_score
+from datetime import datetime, timedelta
+
+BASE_DATE = datetime(2026, 9, 1, 18, 0)
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def user(app):
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def report(user, case_number, full_name, age, gender, location, days=0):
+    return MissingPerson(
+        full_name=full_name, age=age, gender=gender,
+        last_seen_date=BASE_DATE + timedelta(days=days),
+        last_seen_location=location,
+        contact_name="Contact", contact_phone="+254712345678",
+        status="missing", case_number=case_number, user_id=user.id
+    )
+
+@pytest.fixture
+def seed_data(app, user):
+    """Two filings of the same girl, plus people who merely look similar"""
+    people = [
+        report(user, "DUP001", "Grace Wanjiru", 16, "Female", "Thika, Kenya"),
+        report(user, "DUP002", "Grace Wanjiku", 17, "Female", "Thika Town", days=2),
+        # same name, but a man
+        report(user, "DUP003", "Grace Wanjiru", 16, "Male", "Thika, Kenya"),
+        # same name, a year later
+        report(user, "DUP004", "Grace Wanjiru", 16, "Female", "Thika, Kenya", days=365),
+        # same surname, different person
+        report(user, "DUP005", "Mary Wanjiru", 45, "Female", "Nyeri"),
+        report(user, "DUP006", "Peter Otieno", 40, "Male", "Kisumu"),
+        report(user, "DUP007", "Peter Otyeno", 41, "Male", "Kisumu, Kenya", days=-1),
+    ]
+    db.session.add_all(people)
+    db.session.commit()
+    return people
+
+def test_duplicates_of_report(client, seed_data):
+    """Test that only plausible duplicates are returned, with scores"""
+    response = client.get(f'/api/missing-persons/{seed_data[0].id}/duplicates')
+    assert response.status_code == 200
+    data = json.loads(response.data)['data']
+    assert [c['case_number'] for c in data] == ['DUP002']
+    assert 0.7 <= data[0]['score'] <= 1
+
+def test_duplicates_of_missing_report(client, seed_data):
+    response = client.get('/api/missing-persons/9999/duplicates')
+    assert response.status_code == 404
+
+def test_create_returns_possible_duplicates(client, seed_data, user):
+    """Test that filing a report again flags the earlier one"""
+    token = create_access_token(identity=user.id)
+    response = client.post('/api/missing-persons', json={
+        "full_name": "Peter Otieno", "age": 40, "gender": "Male",
+        "last_seen_date": (BASE_DATE + timedelta(days=1)).isoformat(),
+        "last_seen_location": "Kisumu", "contact_name": "Mary Otieno",
+        "contact_phone": "+254723456789", "case_number": "DUP008"
+    }, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert data['data']['case_number'] == 'DUP008'
+    assert [c['case_number'] for c in data['possible_duplicates']] == ['DUP006', 'DUP007']
+
+def test_scan_finds_clusters(app, seed_data):
+    """Test the batch scan over the whole table"""
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['duplicates', 'scan', '--json'])
+    assert result.exit_code == 0
+    clusters = json.loads(result.output)
+    ids = {p.case_number: p.id for p in seed_data}
+    assert sorted(c['report_ids'] for c in clusters) == sorted([
+        [ids['DUP001'], ids['DUP002']],
+        [ids['DUP006'], ids['DUP007']],
+    ])
+
+def test_score_rejects_incompatible_reports(app, seed_data):
+    grace, variant, man, year_later, mary = seed_data[:5]
+    assert match_score(grace, variant) >= 0.7
+    assert match_score(grace, man) == 0
+    assert match_score(grace, year_later) == 0
+    assert match_score(grace, mary) == 0
+
+def test_clusters_are_transitive(app, user):
+    """Test that A~B and B~C end up in one cluster"""
+    people = [
+        report(user, "T1", "John Kamau", 30, "Male", "Nakuru", days=0),
+        report(user, "T2", "John Kamau", 30, "Male", "Nakuru", days=20),
+        report(user, "T3", "John Kamau", 30, "Male", "Nakuru", days=40),
+    ]
+    for i, person in enumerate(people, start=1):
+        person.id = i
+    clusters = find_clusters(people)
+    assert len(clusters) == 1
+    assert clusters[0]['report_ids'] == [1, 2, 3]
+    assert len(clusters[0]['pairs']) == 2
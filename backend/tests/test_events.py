@@ -0,0 +1,151 @@
+import pytest
+import json
+import queue
+from app import create_app, db
+from config import config, TestingConfig
+from models.missing_person import MissingPerson
+from models.user import User
+from utils.events import EventBroker, EventFilter, PubSubBroker, get_event_broker
+from datetime import datetime
+
+class StreamingConfig(TestingConfig):
+    EVENT_HEARTBEAT_SECONDS = 0.05
+    EVENT_QUEUE_SIZE = 5
+
+class FakePubSub:
+    """Minimal stand-in for a redis pub/sub server shared by two workers"""
+
+    def __init__(self):
+        self.listeners = []
+
+    def publish(self, channel, message):
+        for listener in self.listeners:
+            listener.put({'type': 'message', 'channel': channel, 'data': message})
+
+    def pubsub(self):
+        server = self
+
+        class Connection:
+            def subscribe(self, channel):
+                self.messages = queue.Queue()
+                server.listeners.append(self.messages)
+                self.messages.put({'type': 'subscribe', 'channel': channel, 'data': 1})
+
+            def listen(self):
+                while True:
+                    yield self.messages.get()
+        return Connection()
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create application for testing"""
+    monkeypatch.setitem(config, 'streaming', StreamingConfig)
+    app = create_app('streaming')
+
+    with app.app_context():
+        db.create_all()
+        user = User(name="Reporter", email="reporter@test.com")
+        user.set_password("secret123")
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+def add_report(case_number, **values):
+    fields = dict(
+        full_name=f"Person {case_number}", age=12, gender="Female",
+        last_seen_date=datetime(2026, 9, 1), last_seen_location="Kisumu Town",
+        contact_name="Contact", contact_phone="+254712345678",
+        case_number=case_number, user_id=1
+    )
+    fields.update(values)
+    person = MissingPerson(**fields)
+    db.session.add(person)
+    db.session.commit()
+    return person
+
+def read_events(chunks, count):
+    """Next `count` events from an open stream, skipping keep-alives"""
+    events = []
+    for _ in range(count + 100):
+        if len(events) == count:
+            break
+        chunk = next(chunks).decode()
+        if chunk.startswith('event: '):
+            name, data = chunk.split('\n')[:2]
+            events.append((name[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+def test_stream_pushes_matching_changes(client):
+    """Test that a subscriber receives creates, status changes and deletes it asked for"""
+    response = client.get('/api/missing-persons/stream?location=kisumu&status=missing&max_age=17')
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    chunks = iter(response.response)
+    assert next(chunks) == b'retry: 5000\n\n'
+
+    add_report("ADULT", age=40)
+    add_report("ELSEWHERE", last_seen_location="Mombasa")
+    child, duplicate = add_report("CHILD"), add_report("DUPLICATE")
+    child.status = 'found'
+    db.session.commit()
+    duplicate_id = duplicate.id
+    db.session.delete(duplicate)
+    db.session.commit()
+
+    events = read_events(chunks, 4)
+    assert [(name, e['id']) for name, e in events] == [
+        ('created', child.id), ('created', duplicate_id), ('updated', child.id), ('deleted', duplicate_id)
+    ]
+    assert events[0][1]['data']['case_number'] == 'CHILD'
+    # found no longer matches status=missing, but leaving it is reported
+    assert events[2][1]['data']['status'] == 'found'
+    assert events[2][1]['previous_status'] == 'missing'
+
+    response.close()
+    assert not get_event_broker(client.application).wants_events
+
+def test_rolled_back_writes_are_not_published(app):
+    broker = get_event_broker(app)
+    subscription = broker.subscribe(EventFilter())
+    db.session.add(MissingPerson(
+        full_name="Draft", age=5, gender="Male", last_seen_date=datetime(2026, 9, 1),
+        last_seen_location="Nakuru", contact_name="C", contact_phone="+254712345678",
+        case_number="DRAFT", user_id=1
+    ))
+    db.session.flush()
+    db.session.rollback()
+    add_report("KEPT")
+    assert subscription.get(timeout=0.1)['data']['case_number'] == 'KEPT'
+    assert subscription.get(timeout=0.05) is None
+    broker.unsubscribe(subscription)
+
+def test_slow_subscriber_is_told_to_resync(client):
+    response = client.get('/api/missing-persons/stream')
+    chunks = iter(response.response)
+    next(chunks)
+    for n in range(8):
+        add_report(f"BURST{n}")
+    remaining = b''.join(chunks).decode()
+    assert remaining.endswith('event: resync\ndata: {}\n\n')
+    assert not get_event_broker(client.application).wants_events
+
+def test_bad_filter_and_subscriber_limit(app, client):
+    assert client.get('/api/missing-persons/stream?min_age=old').status_code == 400
+    app.extensions['events'] = EventBroker(max_subscribers=0)
+    assert client.get('/api/missing-persons/stream').status_code == 503
+
+def test_pubsub_broker_reaches_other_workers(app):
+    server = FakePubSub()
+    here, there = PubSubBroker(server), PubSubBroker(server)
+    subscription = there.subscribe(EventFilter(status='missing'))
+    app.extensions['events'] = here
+    add_report("SHARED")
+    event = subscription.get(timeout=2)
+    assert event['type'] == 'created' and event['data']['case_number'] == 'SHARED'
@@ -0,0 +1,121 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from datetime import datetime, timedelta
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def seed_data(app):
+    """Seed reports with different text in each indexed column"""
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+
+    people = [
+        MissingPerson(
+            full_name="Grace Wanjiru", age=16, gender="Female",
+            last_seen_date=datetime.utcnow() - timedelta(days=1),
+            last_seen_location="Thika, Kenya",
+            last_seen_wearing="School uniform",
+            distinguishing_features="Wears glasses",
+            contact_name="Jane Wanjiru", contact_phone="+254712345678",
+            status="missing", case_number="FTS001", user_id=user.id
+        ),
+        MissingPerson(
+            full_name="Peter Otieno", age=40, gender="Male",
+            last_seen_date=datetime.utcnow() - timedelta(days=3),
+            last_seen_location="Kisumu, Kenya",
+            last_seen_wearing="Green hoodie",
+            distinguishing_features="Scar on left cheek",
+            contact_name="Mary Otieno", contact_phone="+254723456789",
+            status="missing", case_number="FTS002", user_id=user.id
+        ),
+        MissingPerson(
+            full_name="James Kamau", age=30, gender="Male",
+            last_seen_date=datetime.utcnow() - timedelta(days=2),
+            last_seen_location="Grace Road, Thika",
+            last_seen_wearing="Red jacket",
+            distinguishing_features="Tattoo on right arm",
+            contact_name="Ann Kamau", contact_phone="+254734567890",
+            status="found", case_number="FTS003", user_id=user.id
+        ),
+    ]
+    db.session.add_all(people)
+    db.session.commit()
+    return people
+
+def search(client, query):
+    response = client.get(f'/api/search?{query}')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+def test_search_matches_clothing_and_features(client, seed_data):
+    """Test that wearing and distinguishing features are indexed"""
+    data = search(client, 'q=hoodie')
+    assert [r['case_number'] for r in data['results']] == ['FTS002']
+
+    data = search(client, 'q=tattoo')
+    assert [r['case_number'] for r in data['results']] == ['FTS003']
+
+def test_search_requires_every_term(client, seed_data):
+    """Test that multi-word queries match all terms"""
+    data = search(client, 'q=thika glasses')
+    assert data['total'] == 1
+    assert data['results'][0]['case_number'] == 'FTS001'
+
+def test_search_prefix_match(client, seed_data):
+    """Test that partial words match for search-as-you-type"""
+    data = search(client, 'q=otie')
+    assert data['total'] == 1
+    assert data['results'][0]['full_name'] == 'Peter Otieno'
+
+def test_search_ranks_name_above_location(client, seed_data):
+    """Test that a hit in the name outranks a hit in the location"""
+    data = search(client, 'q=grace')
+    assert [r['case_number'] for r in data['results']] == ['FTS001', 'FTS003']
+
+def test_search_sort_by_date(client, seed_data):
+    """Test that relevance ordering can be turned off"""
+    data = search(client, 'q=thika&sort=date')
+    assert [r['case_number'] for r in data['results']] == ['FTS001', 'FTS003']
+
+def test_search_combines_with_filters(client, seed_data):
+    """Test full-text search together with the regular filters"""
+    data = search(client, 'q=thika&status=found')
+    assert [r['case_number'] for r in data['results']] == ['FTS003']
+
+def test_search_ignores_query_syntax(client, seed_data):
+    """Test that operators and quotes in user input are not interpreted"""
+    data = search(client, 'q=%22kisumu%22%20*(')
+    assert [r['case_number'] for r in data['results']] == ['FTS002']
+
+def test_index_follows_updates_and_deletes(app, client, seed_data):
+    """Test that the index stays in sync with the table"""
+    person = MissingPerson.query.filter_by(case_number='FTS002').first()
+    person.last_seen_wearing = "Yellow raincoat"
+    db.session.commit()
+
+    assert search(client, 'q=hoodie')['total'] == 0
+    assert search(client, 'q=raincoat')['total'] == 1
+
+    db.session.delete(person)
+    db.session.commit()
+    assert search(client, 'q=raincoat')['total'] == 0
@@ -0,0 +1,133 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from models import name_search
+from utils.name_matching import NameIndex, phonetic_key
+from datetime import datetime, timedelta
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def seed_data(app):
+    """Seed reports whose names have common spelling variants"""
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+
+    names = ["Grace Wanjiru", "Peter Otieno", "James Kamau", "Achieng Odhiambo"]
+    people = [
+        MissingPerson(
+            full_name=name, age=20 + i, gender="Female",
+            last_seen_date=datetime.utcnow() - timedelta(days=i),
+            last_seen_location="Nairobi, Kenya",
+            contact_name="Contact", contact_phone="+254712345678",
+            status="missing", case_number=f"FZ{i:03d}", user_id=user.id
+        )
+        for i, name in enumerate(names)
+    ]
+    db.session.add_all(people)
+    db.session.commit()
+    return people
+
+def fuzzy(client, name, extra=''):
+    response = client.get(f'/api/search?match=fuzzy&name={name}{extra}')
+    assert response.status_code == 200
+    return [r['full_name'] for r in json.loads(response.data)['results']]
+
+def test_fuzzy_matches_spelling_variants(client, seed_data):
+    """Test that misspelled and transliterated names still match"""
+    assert fuzzy(client, 'Wanjiku') == ['Grace Wanjiru']
+    assert fuzzy(client, 'Otyeno') == ['Peter Otieno']
+    assert fuzzy(client, 'Kamua') == ['James Kamau']
+    assert fuzzy(client, 'Odiambo') == ['Achieng Odhiambo']
+
+def test_fuzzy_prefix_for_search_as_you_type(client, seed_data):
+    """Test that a partial name matches"""
+    assert fuzzy(client, 'Wanj') == ['Grace Wanjiru']
+
+def test_fuzzy_ranks_closest_first(client, seed_data):
+    """Test that an exact name outranks a variant"""
+    person = MissingPerson.query.filter_by(case_number='FZ003').first()
+    person.full_name = "Grace Wanjiku"
+    db.session.commit()
+    assert fuzzy(client, 'Grace Wanjiku') == ['Grace Wanjiku', 'Grace Wanjiru']
+
+def test_fuzzy_ignores_unrelated_names(client, seed_data):
+    """Test that dissimilar names are not returned"""
+    assert fuzzy(client, 'Mohamed') == []
+
+def test_fuzzy_follows_updates_and_deletes(client, seed_data):
+    """Test that renamed and deleted reports are reflected"""
+    person = MissingPerson.query.filter_by(case_number='FZ001').first()
+    person.full_name = "Peter Mwangi"
+    db.session.commit()
+    assert fuzzy(client, 'Otieno') == []
+    assert fuzzy(client, 'Mwangy') == ['Peter Mwangi']
+
+    db.session.delete(person)
+    db.session.commit()
+    assert fuzzy(client, 'Mwangi') == []
+
+def test_fuzzy_combines_with_filters(client, seed_data):
+    """Test fuzzy name search together with the regular filters"""
+    assert fuzzy(client, 'Wanjiku', '&status=found') == []
+    assert fuzzy(client, 'Wanjiku', '&cursor=') == ['Grace Wanjiru']
+
+def test_common_name_filters_apply_before_the_cap(client, seed_data, monkeypatch):
+    """Test that filtered matches are not lost when a name matches more than the cap"""
+    db.session.add_all([
+        MissingPerson(
+            full_name=f"Mary Wanjiru {n}", age=30 + n, gender="Female",
+            last_seen_date=datetime.utcnow(), last_seen_location="Nakuru",
+            contact_name="Contact", contact_phone="+254712345678",
+            status="missing", case_number=f"FZC{n:03d}", user_id=seed_data[0].user_id
+        )
+        for n in range(7)
+    ])
+    db.session.commit()
+    monkeypatch.setattr(name_search, 'MAX_CANDIDATES', 2)
+
+    response = client.get('/api/search?match=fuzzy&name=Wanjiru&age_min=35')
+    body = json.loads(response.data)
+    assert sorted(r['full_name'] for r in body['results']) == ['Mary Wanjiru 5', 'Mary Wanjiru 6']
+    assert body['total'] == 2
+    assert len(fuzzy(client, 'Wanjiru')) == 8
+
+def test_invalid_match_mode(client, seed_data):
+    """Test that an unknown match mode is rejected"""
+    response = client.get('/api/search?match=sounds-like&name=Otieno')
+    assert response.status_code == 400
+
+def test_phonetic_key_folds_variants():
+    """Test that sound-alike spellings share a key"""
+    assert phonetic_key('otyeno') == phonetic_key('otieno')
+    assert phonetic_key('filip') == phonetic_key('philip')
+    assert phonetic_key('kamau') != phonetic_key('otieno')
+
+def test_name_index_remove():
+    """Test that removed names leave no postings behind"""
+    index = NameIndex()
+    index.add(1, "Grace Wanjiru")
+    index.add(2, "Grace Wanjiku")
+    index.remove(1)
+    assert [rid for rid, _ in index.search("Wanjiru")] == [2]
+    index.remove(2)
+    assert len(index) == 0
+    assert not index.trigram_postings and not index.phonetic_postings
@@ -0,0 +1,160 @@
+import pytest
+import json
+from app import create_app, db
+from config import config, TestingConfig
+from models.missing_person import MissingPerson
+from models.user import User
+from controllers.statistics_controller import StatisticsController
+from utils.http_cache import RedisResponseCache, get_response_cache
+from datetime import datetime, timedelta
+
+class CachingConfig(TestingConfig):
+    HTTP_CACHE_ENABLED = True
+    RESPONSE_CACHE = 'memory'
+
+class FakeRedis:
+    """Just enough of the redis client for the response cache"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create application with HTTP caching on"""
+    monkeypatch.setitem(config, 'caching', CachingConfig)
+    app = create_app('caching')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def seed_data(app):
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    people = [
+        MissingPerson(
+            full_name=f"Person {n}", age=20 + n, gender="Female",
+            last_seen_date=datetime.utcnow() - timedelta(days=n),
+            last_seen_location="Nakuru", contact_name="Contact",
+            contact_phone="+254712345678", status="missing",
+            case_number=f"HTC{n:03d}", user_id=user.id
+        )
+        for n in range(3)
+    ]
+    db.session.add_all(people)
+    db.session.commit()
+    return people
+
+def test_list_revalidates_with_etag(client, seed_data):
+    """Test that an unchanged list answers 304 and repeats come from the cache"""
+    first = client.get('/api/missing-persons')
+    assert first.status_code == 200
+    assert first.headers['X-Cache'] == 'MISS'
+    assert first.headers['Cache-Control'] == 'public, no-cache'
+    etag = first.headers['ETag']
+
+    revalidated = client.get('/api/missing-persons', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+
+    repeat = client.get('/api/missing-persons')
+    assert repeat.headers['X-Cache'] == 'HIT'
+    assert repeat.data == first.data
+
+def test_writes_invalidate(client, seed_data):
+    etag = client.get('/api/missing-persons').headers['ETag']
+
+    seed_data[0].status = 'found'
+    db.session.commit()
+    response = client.get('/api/missing-persons', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    statuses = {r['case_number']: r['status'] for r in json.loads(response.data)['data']}
+    assert statuses['HTC000'] == 'found'
+
+    # a delete changes the row count even if the newest update stays the same
+    etag = response.headers['ETag']
+    db.session.delete(seed_data[1])
+    db.session.commit()
+    response = client.get('/api/missing-persons', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(json.loads(response.data)['data']) == 2
+
+def test_query_args_are_normalized(client, seed_data):
+    a = client.get('/api/search?status=missing&location=Nakuru')
+    b = client.get('/api/search?location=Nakuru&status=missing')
+    assert a.headers['ETag'] == b.headers['ETag']
+    assert b.headers['X-Cache'] == 'HIT'
+    assert client.get('/api/search?status=found').headers['ETag'] != a.headers['ETag']
+
+def test_single_report_last_modified(client, seed_data):
+    person = seed_data[2]
+    response = client.get(f'/api/missing-persons/{person.id}')
+    last_modified = response.headers['Last-Modified']
+    assert client.get(f'/api/missing-persons/{person.id}',
+                      headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    # writes to other reports leave this one's validators alone
+    seed_data[0].status = 'found'
+    db.session.commit()
+    assert client.get(f'/api/missing-persons/{person.id}',
+                      headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+    person.updated_at = datetime.utcnow() + timedelta(seconds=5)
+    db.session.commit()
+    assert client.get(f'/api/missing-persons/{person.id}',
+                      headers={'If-Modified-Since': last_modified}).status_code == 200
+    assert client.get('/api/missing-persons/999').status_code == 404
+
+def test_stats_and_recent_policies(client, seed_data):
+    StatisticsController.reconcile()
+    db.session.commit()
+    stats = client.get('/api/missing-persons/stats')
+    assert stats.headers['Cache-Control'] == 'public, max-age=30'
+    assert json.loads(stats.data)['total_cases'] == 3
+    recent = client.get('/api/missing-persons/recent')
+    assert recent.status_code == 200 and 'ETag' in recent.headers
+    # streamed and failed responses are never cached
+    streamed = client.get('/api/missing-persons?format=ndjson')
+    assert 'ETag' not in streamed.headers and 'X-Cache' not in streamed.headers
+    assert 'ETag' not in client.get('/api/missing-persons?cursor=bad').headers
+
+def test_redis_backend(app, client, seed_data):
+    redis = FakeRedis()
+    app.extensions['response_cache'] = RedisResponseCache(redis, ttl=120)
+    first = client.get('/api/search?q=Person')
+    assert first.headers['X-Cache'] == 'MISS'
+    assert list(redis.ttls.values()) == [120]
+    second = client.get('/api/search?q=Person')
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.mimetype == 'application/json'
+    assert second.data == first.data
+    assert get_response_cache(app) is app.extensions['response_cache']
+
+def test_disabled_in_testing_config():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        response = app.test_client().get('/api/missing-persons')
+        assert 'ETag' not in response.headers
+        assert get_response_cache(app) is None
+        db.drop_all()
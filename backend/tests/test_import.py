@@ -0,0 +1,128 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.case_statistic import CaseStatistic
+from models.user import User
+from flask_jwt_extended import create_access_token
+from cli import import_cases
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def user(app):
+    user = User(name="Partner", email="partner@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def auth_headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=user.id)}'}
+
+def record(number, **overrides):
+    data = {
+        "full_name": f"Imported Person {number}",
+        "age": 20 + number % 50,
+        "gender": "Female" if number % 2 else "Male",
+        "last_seen_date": "2026-09-01T18:00:00",
+        "last_seen_location": "Thika",
+        "contact_name": "Partner Desk",
+        "contact_phone": "+254700000000",
+        "case_number": f"IMP{number:05d}",
+    }
+    data.update(overrides)
+    return data
+
+def ndjson(records):
+    return "\n".join(json.dumps(r) for r in records) + "\n"
+
+def test_import_ndjson(client, auth_headers, user):
+    """Test that every valid line is imported under the caller's account"""
+    body = ndjson(record(n) for n in range(25))
+    response = client.post('/api/missing-persons/import', data=body,
+                           headers=auth_headers, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    data = json.loads(response.data)['data']
+    assert data['imported'] == 25
+    assert data['failed'] == 0
+
+    people = MissingPerson.query.all()
+    assert len(people) == 25
+    assert {p.user_id for p in people} == {user.id}
+    # imported rows go through the same hooks as single creates
+    assert people[0].county == 'Kiambu'
+    total = CaseStatistic.query.filter_by(dimension='total').first()
+    assert total.count == 25
+
+def test_import_reports_row_errors(app, client, auth_headers):
+    """Test that bad rows are reported by line and the rest still import"""
+    lines = [
+        json.dumps(record(1)),
+        json.dumps(record(2, age=300)),
+        "{not json",
+        json.dumps(record(1)),  # repeated case number
+        "",
+        json.dumps(record(3, gender="Unknown", full_name="")),
+        json.dumps(record(4)),
+    ]
+    app.config['IMPORT_BATCH_SIZE'] = 2
+    response = client.post('/api/missing-persons/import', data="\n".join(lines),
+                           headers=auth_headers, content_type='application/x-ndjson')
+    data = json.loads(response.data)['data']
+    assert data['imported'] == 2
+    assert data['failed'] == 4
+    errors = {e['line']: e for e in data['errors']}
+    assert set(errors) == {2, 3, 4, 6}
+    assert 'age' in errors[2]['errors']
+    assert errors[4]['errors'] == {'case_number': ['case number already exists']}
+    assert set(errors[6]['errors']) == {'gender', 'full_name'}
+    assert MissingPerson.query.count() == 2
+
+def test_import_csv(client, auth_headers):
+    rows = [
+        "full_name,age,gender,last_seen_date,last_seen_location,contact_name,contact_phone,case_number,height",
+        "Achieng Odhiambo,12,Female,2026-09-02T08:00:00,\"Kisumu, Kenya\",Mother,+254711111111,CSV001,",
+        "Kamau Njoroge,40,Male,2026-09-03T08:00:00,Nyeri,Brother,+254722222222,CSV002,5ft 9in",
+    ]
+    response = client.post('/api/missing-persons/import', data="\n".join(rows),
+                           headers=auth_headers, content_type='text/csv')
+    assert json.loads(response.data)['data']['imported'] == 2
+    person = MissingPerson.query.filter_by(case_number='CSV002').first()
+    assert person.age == 40
+    assert person.height == '5ft 9in'
+    assert MissingPerson.query.filter_by(case_number='CSV001').first().height is None
+
+def test_import_requires_auth_and_format(client, auth_headers):
+    body = ndjson([record(1)])
+    assert client.post('/api/missing-persons/import', data=body,
+                       content_type='application/x-ndjson').status_code == 401
+    response = client.post('/api/missing-persons/import', data=body,
+                           headers=auth_headers, content_type='text/plain')
+    assert response.status_code == 400
+    response = client.post('/api/missing-persons/import?format=ndjson', data=body,
+                           headers=auth_headers, content_type='text/plain')
+    assert response.status_code == 200
+
+def test_import_cli(app, user, tmp_path):
+    source = tmp_path / 'partner.ndjson'
+    source.write_text(ndjson(record(n) for n in range(10)))
+    result = app.test_cli_runner().invoke(import_cases, [str(source), '--user', user.email, '--batch-size', '3'])
+    assert result.exit_code == 0, result.output
+    assert 'imported 10 reports, 0 failed' in result.output
+    assert MissingPerson.query.count() == 10
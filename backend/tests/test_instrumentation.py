@@ -0,0 +1,88 @@
+import pytest
+import logging
+from app import create_app, db
+from config import config, TestingConfig
+from models.user import User
+from sqlalchemy import text
+
+class InstrumentedConfig(TestingConfig):
+    INSTRUMENTATION_ENABLED = True
+    INSTRUMENTATION_N_PLUS_ONE_THRESHOLD = 5
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """Create an instrumented application for testing"""
+    InstrumentedConfig.INSTRUMENTATION_PROFILE_DIR = str(tmp_path / 'profiles')
+    monkeypatch.setitem(config, 'instrumented', InstrumentedConfig)
+    app = create_app('instrumented')
+
+    @app.route('/test/n-plus-one')
+    def n_plus_one():
+        # one lookup per row, the pattern the detector is for
+        for user_id in range(1, 8):
+            db.session.execute(text(f"SELECT id FROM users WHERE id = {user_id}"))
+        return {'ok': True}
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+def test_disabled_by_default():
+    app = create_app('testing')
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 404
+    assert 'Server-Timing' not in client.get('/').headers
+
+def test_request_timing_and_sql_counts(client):
+    """Test that requests report their time and SQL statements"""
+    response = client.get('/api/missing-persons')
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    assert timing.startswith('app;dur=')
+    assert 'db;dur=' in timing and 'desc="1 queries"' in timing
+
+    client.get('/api/missing-persons')
+    client.get('/api/missing-persons/999')
+    metrics = client.get('/metrics').data.decode()
+    assert 'findme_http_requests_total{method="GET",endpoint="/api/missing-persons",status="200"} 2' in metrics
+    assert 'findme_http_requests_total{method="GET",endpoint="/api/missing-persons/<int:person_id>",status="404"} 1' in metrics
+    assert 'findme_http_request_duration_seconds_count{endpoint="/api/missing-persons"} 2' in metrics
+    assert 'findme_sql_queries_per_request_bucket{endpoint="/api/missing-persons",le="1"} 2' in metrics
+    # the scrape itself is not counted
+    assert 'endpoint="/metrics"' not in metrics
+
+def test_n_plus_one_detection(client, caplog):
+    with caplog.at_level(logging.WARNING, logger='utils.instrumentation'):
+        client.get('/test/n-plus-one')
+    assert any('possible N+1' in r.getMessage() and 'run 7 times' in r.getMessage() for r in caplog.records)
+    metrics = client.get('/metrics').data.decode()
+    assert 'findme_n_plus_one_requests_total{endpoint="/test/n-plus-one"} 1' in metrics
+
+def test_slow_requests_are_profiled(app, client, tmp_path):
+    """Test that sampled requests over the threshold leave a profile on disk"""
+    instrumentation = app.extensions['instrumentation']
+    instrumentation.slow_seconds = 0
+    instrumentation.profile_rate = 1.0
+    client.get('/api/missing-persons')
+    profiles = list((tmp_path / 'profiles').iterdir())
+    assert len(profiles) == 1
+    assert profiles[0].name.endswith('-GET-api_missing_persons.prof')
+    metrics = client.get('/metrics').data.decode()
+    assert 'findme_profiles_saved_total 1' in metrics
+    assert 'findme_slow_requests_total{endpoint="/api/missing-persons"} 1' in metrics
+
+def test_metrics_include_hasher_and_auth_cache(client):
+    user = User(name="Metrics", email="metrics@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    metrics = client.get('/metrics').data.decode()
+    assert 'findme_password_hash_completed_total 1' in metrics
+    assert 'findme_auth_cache_hits_total{cache="tokens"}' in metrics
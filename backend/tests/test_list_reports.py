@@ -0,0 +1,112 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from flask_jwt_extended import create_access_token
+from datetime import datetime, timedelta
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def users(app):
+    """Two reporters"""
+    alice = User(name="Alice", email="alice@test.com")
+    bob = User(name="Bob", email="bob@test.com")
+    alice.set_password("secret123")
+    bob.set_password("secret123")
+    db.session.add_all([alice, bob])
+    db.session.commit()
+    return alice.id, bob.id
+
+@pytest.fixture
+def seed_data(app, users):
+    """Seed 12 reports split between two users"""
+    alice_id, bob_id = users
+    db.session.add_all([
+        MissingPerson(
+            full_name=f"Person {i}", age=30, gender="Male",
+            last_seen_date=datetime.utcnow() - timedelta(days=i),
+            last_seen_location="Nakuru, Kenya",
+            contact_name="Contact", contact_phone="+254700000000",
+            status="missing", case_number=f"LST{i:03d}",
+            user_id=alice_id if i < 4 else bob_id
+        )
+        for i in range(12)
+    ])
+    db.session.commit()
+
+def test_list_is_paginated(client, seed_data):
+    """Test that the list endpoint returns bounded pages with a cursor"""
+    response = client.get('/api/missing-persons?limit=5')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['data']) == 5
+    assert body['next_cursor']
+
+    ids = [p['id'] for p in body['data']]
+    cursor = body['next_cursor']
+    while cursor:
+        body = client.get(f'/api/missing-persons?limit=5&cursor={cursor}').get_json()
+        ids.extend(p['id'] for p in body['data'])
+        cursor = body['next_cursor']
+
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 12
+
+def test_list_rejects_bad_cursor(client, seed_data):
+    """Test that an unknown cursor returns 400"""
+    response = client.get('/api/missing-persons?cursor=garbage')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+def test_list_ndjson_stream(client, seed_data):
+    """Test the streamed full dump, one report per line"""
+    response = client.get('/api/missing-persons?format=ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.is_streamed
+
+    lines = response.get_data(as_text=True).strip().split('\n')
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 12
+    assert [r['id'] for r in records] == sorted(r['id'] for r in records)
+
+def test_my_reports_paginated(app, client, seed_data, users):
+    """Test that /mine pages through only the caller's reports"""
+    alice_id, _ = users
+    token = create_access_token(identity=alice_id)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    body = client.get('/api/missing-persons/mine?limit=3', headers=headers).get_json()
+    assert len(body['data']) == 3
+    rest = client.get(
+        f"/api/missing-persons/mine?limit=3&cursor={body['next_cursor']}", headers=headers
+    ).get_json()
+    assert len(rest['data']) == 1
+    assert rest['next_cursor'] is None
+    assert all(p['user_id'] == alice_id for p in body['data'] + rest['data'])
+
+def test_recent_cursor_mode(client, seed_data):
+    """Test cursor pages on the recent reports endpoint"""
+    body = client.get('/api/missing-persons/recent?cursor=&per_page=10').get_json()
+    assert body['count'] == 10
+    rest = client.get(
+        f"/api/missing-persons/recent?cursor={body['next_cursor']}&per_page=10"
+    ).get_json()
+    assert rest['count'] == 2
+    assert rest['next_cursor'] is None
@@ -0,0 +1,125 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from utils.gazetteer import geocode
+from utils import geohash
+from datetime import datetime, timedelta
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def seed_data(app):
+    """Reports around Nairobi and further away, in free-text locations"""
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+
+    locations = [
+        ("LOC001", "Thika, Kenya"),
+        ("LOC002", "Juja town"),
+        ("LOC003", "Westlands, Nairobi"),
+        ("LOC004", "Nairobi CBD, Kenya"),
+        ("LOC005", "Kisumu"),
+        ("LOC006", "Behind the old mill"),
+    ]
+    people = [
+        MissingPerson(
+            full_name=f"Person {number}", age=30, gender="Female",
+            last_seen_date=datetime.utcnow() - timedelta(days=i),
+            last_seen_location=location,
+            contact_name="Contact", contact_phone="+254712345678",
+            status="missing", case_number=number, user_id=user.id
+        )
+        for i, (number, location) in enumerate(locations)
+    ]
+    db.session.add_all(people)
+    db.session.commit()
+    return people
+
+def case_numbers(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.data
+    return [r['case_number'] for r in json.loads(response.data)['results']]
+
+def test_geocode_free_text():
+    """Test that the most specific known place in the text wins"""
+    assert geocode("Westlands, Nairobi").name == "Westlands"
+    assert geocode("Nairobi CBD, Kenya").name == "Nairobi CBD"
+    assert geocode("Grace Road, Thika").county == "Kiambu"
+    assert geocode("Murang'a County").name == "Murang'a"
+    assert geocode("Behind the old mill") is None
+
+def test_reports_are_geocoded(app, seed_data):
+    """Test that coordinates, county and geohash are filled on insert and update"""
+    person = MissingPerson.query.filter_by(case_number='LOC003').first()
+    assert person.county == 'Nairobi'
+    assert person.geohash == geohash.encode(person.latitude, person.longitude)
+
+    person.last_seen_location = "Malindi"
+    db.session.commit()
+    assert person.county == 'Kilifi'
+    assert person.geohash.startswith(geohash.encode(-3.2192, 40.1169, 4))
+
+    unknown = MissingPerson.query.filter_by(case_number='LOC006').first()
+    assert unknown.latitude is None and unknown.county is None and unknown.geohash is None
+
+def test_search_near_place(client, seed_data):
+    """Test radius search around a named place"""
+    assert case_numbers(client, '/api/search?near=Thika&radius_km=20&sort=distance') == ['LOC001', 'LOC002']
+    assert case_numbers(client, '/api/search?near=Thika&radius_km=50&sort=distance') == [
+        'LOC001', 'LOC002', 'LOC003', 'LOC004'
+    ]
+
+def test_search_near_coordinates(client, seed_data):
+    assert case_numbers(client, '/api/search?lat=-0.09&lon=34.77&radius_km=5') == ['LOC005']
+
+def test_search_bbox(client, seed_data):
+    """Test bounding box search (min_lon,min_lat,max_lon,max_lat)"""
+    assert sorted(case_numbers(client, '/api/search?bbox=36.7,-1.35,36.9,-1.2')) == ['LOC003', 'LOC004']
+
+def test_search_county(client, seed_data):
+    assert sorted(case_numbers(client, '/api/search?county=kiambu')) == ['LOC001', 'LOC002']
+
+def test_search_rejects_bad_location_params(client, seed_data):
+    assert client.get('/api/search?near=Atlantis').status_code == 400
+    assert client.get('/api/search?near=Thika&radius_km=5000').status_code == 400
+    assert client.get('/api/search?bbox=1,2,3').status_code == 400
+    assert client.get('/api/search?sort=distance').status_code == 400
+    assert client.get('/api/search?bbox=36.9,-1.2,36.7,-1.35').status_code == 400
+    response = client.get('/api/search?lat=-1.28')
+    assert response.status_code == 400
+    assert json.loads(response.data)['error'] == "lat and lon must be given together"
+    assert client.get('/api/search?lon=36.8').status_code == 400
+    # nearest-first order cannot be paged by cursor
+    assert client.get('/api/search?lat=-1.28&lon=36.8&sort=distance&cursor=').status_code == 400
+
+def test_location_route(client, seed_data):
+    """Test county, town and free-text lookups on the location route"""
+    assert sorted(case_numbers(client, '/api/missing-persons/location/Nairobi')) == ['LOC003', 'LOC004']
+    assert case_numbers(client, '/api/missing-persons/location/Juja') == ['LOC002']
+    assert case_numbers(client, '/api/missing-persons/location/old mill') == ['LOC006']
+
+def test_geohash_cover_contains_points():
+    """Test that the cells covering a box contain every point inside it"""
+    cells = geohash.cover(-1.35, 36.7, -1.2, 36.9)
+    for lat in (-1.35, -1.3, -1.2):
+        for lon in (36.7, 36.8, 36.9):
+            point = geohash.encode(lat, lon)
+            assert any(point.startswith(cell) for cell in cells)
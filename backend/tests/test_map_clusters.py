@@ -0,0 +1,133 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.case_tile import CaseTile, rebuild_tiles
+from models.user import User
+from sqlalchemy import func
+from datetime import datetime
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def seed_data(app):
+    """Reports in and around Nairobi and one in Kisumu"""
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+
+    reports = [
+        ("MAP001", "Westlands, Nairobi", "missing", datetime(2026, 9, 1)),
+        ("MAP002", "Nairobi CBD", "missing", datetime(2026, 9, 5)),
+        ("MAP003", "Kibera", "found", datetime(2026, 9, 5)),
+        ("MAP004", "Thika", "missing", datetime(2026, 9, 20)),
+        ("MAP005", "Kisumu", "missing", datetime(2026, 9, 20)),
+        ("MAP006", "Somewhere unknown", "missing", datetime(2026, 9, 20)),
+    ]
+    people = [
+        MissingPerson(
+            full_name=f"Person {number}", age=30, gender="Female",
+            last_seen_date=seen, last_seen_location=location,
+            contact_name="Contact", contact_phone="+254712345678",
+            status=status, case_number=number, user_id=user.id
+        )
+        for number, location, status, seen in reports
+    ]
+    db.session.add_all(people)
+    db.session.commit()
+    return people
+
+def clusters(client, query):
+    response = client.get(f'/api/map/clusters?{query}')
+    assert response.status_code == 200, response.data
+    return json.loads(response.data)
+
+def tile_rows():
+    return sorted(
+        (t.precision, t.cell, t.status, t.day, t.count, round(t.latitude_sum, 6), round(t.longitude_sum, 6))
+        for t in CaseTile.query.filter(CaseTile.count != 0)
+    )
+
+def test_country_zoom_clusters(client, seed_data):
+    """Test that a country-level view returns a handful of clusters"""
+    data = clusters(client, 'zoom=5')
+    assert data['precision'] == 3
+    assert data['total'] == 5  # the report that could not be geocoded is left out
+    assert sum(c['count'] for c in data['clusters']) == 5
+    assert len(data['clusters']) == 2  # greater Nairobi and Kisumu
+
+def test_city_zoom_splits_clusters(client, seed_data):
+    """Test that zooming in splits clusters and the bbox limits the view"""
+    data = clusters(client, 'zoom=11&bbox=36.7,-1.35,36.9,-1.2')
+    assert data['precision'] == 5
+    assert data['total'] == 3
+    assert len(data['clusters']) > 1
+    for cluster in data['clusters']:
+        assert -1.35 <= cluster['latitude'] <= -1.2
+        assert 36.7 <= cluster['longitude'] <= 36.9
+
+def test_cluster_filters(client, seed_data):
+    assert clusters(client, 'zoom=5&status=found')['total'] == 1
+    assert clusters(client, 'zoom=5&date_from=2026-09-05&date_to=2026-09-05')['total'] == 2
+
+def test_cluster_bad_params(client, seed_data):
+    assert client.get('/api/map/clusters').status_code == 400
+    assert client.get('/api/map/clusters?zoom=30').status_code == 400
+    assert client.get('/api/map/clusters?zoom=5&bbox=1,2').status_code == 400
+
+def test_tiles_follow_writes(app, client, seed_data):
+    """Test that inserts, moves, status changes and deletes update the tiles"""
+    person = MissingPerson.query.filter_by(case_number='MAP005').first()
+    person.last_seen_location = "Nairobi CBD"
+    db.session.commit()
+    assert len(clusters(client, 'zoom=5')['clusters']) == 1
+
+    person.status = 'found'
+    db.session.commit()
+    assert clusters(client, 'zoom=5&status=found')['total'] == 2
+
+    db.session.delete(person)
+    db.session.commit()
+    assert clusters(client, 'zoom=5')['total'] == 4
+
+    # incremental maintenance agrees with a full rebuild
+    incremental = tile_rows()
+    rebuild_tiles()
+    assert tile_rows() == incremental
+
+def test_each_report_counted_once_per_precision(app, seed_data):
+    totals = dict(
+        db.session.query(CaseTile.precision, func.sum(CaseTile.count)).group_by(CaseTile.precision)
+    )
+    assert totals == {1: 5, 2: 5, 3: 5, 4: 5, 5: 5}
+
+def test_rebuild_corrects_drift_in_place(app, seed_data):
+    """Test that a rebuild fixes wrong, stale and missing tiles"""
+    correct = tile_rows()
+    tiles = CaseTile.query.order_by(CaseTile.precision, CaseTile.cell).all()
+    tiles[0].count += 3
+    db.session.delete(tiles[1])
+    db.session.add(CaseTile(precision=5, cell='zzzzz', status='missing', day=tiles[0].day,
+                            count=2, latitude_sum=1.0, longitude_sum=1.0))
+    db.session.commit()
+    assert tile_rows() != correct
+
+    rebuild_tiles()
+    assert tile_rows() == correct
+    # emptied tiles are removed, not left at zero
+    assert CaseTile.query.filter_by(cell='zzzzz').count() == 0
@@ -0,0 +1,127 @@
+import threading
+import time
+import pytest
+from app import create_app
+from models.db import db, bcrypt, password_hasher
+from models.user import User
+from utils.password_hasher import HashPool, PasswordHasher, HasherBusy
+
+@pytest.fixture
+def app():
+    """create a test application instance"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """create a test client for making requests"""
+    return app.test_client()
+
+@pytest.fixture
+def blocked(app):
+    """occupy every slot of the app's hashing pool until the test ends"""
+    release = threading.Event()
+    hashers = []
+    pool = app.extensions['password_hasher']
+    slots = pool.workers + pool.max_queue
+
+    def hold():
+        release.wait(10)
+
+    for _ in range(slots):
+        thread = threading.Thread(target=lambda: pool.run(hold))
+        thread.start()
+        hashers.append(thread)
+    while pool.metrics()['running'] < pool.workers:
+        time.sleep(0.01)
+    yield
+    release.set()
+    for thread in hashers:
+        thread.join()
+
+def test_hash_and_check_round_trip(app):
+    """test that the pool produces normal bcrypt hashes"""
+    user = User(name='Test User', email='test@test.com')
+    user.set_password('test123')
+    assert user.password_hash.startswith('$2b$04$')  # testing work factor
+    assert user.check_password('test123')
+    assert not user.check_password('wrong')
+
+def test_work_factor_is_configurable():
+    """test that BCRYPT_LOG_ROUNDS sets the cost of new hashes, per app"""
+    app = create_app('testing')
+    app.config['BCRYPT_LOG_ROUNDS'] = 5
+    password_hasher.init_app(app)
+    other = create_app('testing')
+    with app.app_context():
+        assert password_hasher.hash('secret').startswith('$2b$05$')
+    with other.app_context():
+        assert password_hasher.hash('secret').startswith('$2b$04$')
+
+def test_saturated_pool_rejects_fast(app, blocked):
+    """test that work beyond the queue limit is rejected, not queued"""
+    with pytest.raises(HasherBusy):
+        password_hasher.hash('test123')
+
+    metrics = password_hasher.metrics()
+    assert metrics['running'] == metrics['workers']
+    assert metrics['queued'] == metrics['max_queue']
+    assert metrics['rejected'] >= 1
+
+def test_slow_hash_times_out_as_busy():
+    """test that a hash outliving the timeout is reported as busy"""
+    pool = HashPool(workers=1, max_queue=0, timeout=0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(HasherBusy):
+            pool.run(release.wait, 10)
+    finally:
+        release.set()
+        pool.shutdown()
+
+@pytest.fixture
+def user(app):
+    """an account to log in to, created before the pool is saturated"""
+    user = User(name='Test User', email='test@test.com')
+    user.set_password('test123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def test_login_returns_503_when_saturated(client, user, blocked):
+    """test that login sheds load with a 503 and Retry-After"""
+    response = client.post('/api/auth/login', json={
+        'email': 'test@test.com',
+        'password': 'test123'
+    })
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+def test_register_returns_503_when_saturated(client, blocked):
+    """test that registration sheds load with a 503 and creates nothing"""
+    response = client.post('/api/auth/register', json={
+        'name': 'Test User',
+        'email': 'test@test.com',
+        'password': 'test123'
+    })
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert User.query.count() == 0
+
+def test_each_app_has_its_own_pool(app):
+    """test that creating another app neither replaces nor shares this app's pool"""
+    pool = app.extensions['password_hasher']
+    other = create_app('testing')
+    assert other.extensions['password_hasher'] is not pool
+    assert password_hasher.pool() is pool
+    with other.app_context():
+        assert password_hasher.pool() is other.extensions['password_hasher']
+
+def test_unbound_hasher_runs_inline():
+    """test that a hasher outside an app hashes on the calling thread"""
+    hasher = PasswordHasher(bcrypt)
+    hashed = hasher.hash('secret')
+    assert hasher.check(hashed, 'secret')
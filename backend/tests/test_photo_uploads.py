@@ -0,0 +1,237 @@
+import io
+import os
+import pytest
+from PIL import Image
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from flask_jwt_extended import create_access_token
+from utils.photo_uploads import PhotoUploadQueue, get_photo_uploads
+from datetime import datetime
+
+@pytest.fixture
+def app(tmp_path):
+    """Create application for testing with storage and spool under tmp_path"""
+    app = create_app('testing')
+    uploads = get_photo_uploads(app)
+    uploads.spool_dir = str(tmp_path / 'spool')
+    uploads.failed_dir = str(tmp_path / 'spool' / 'failed')
+    uploads.variants_dir = str(tmp_path / 'spool' / 'variants')
+    uploads.storage.root = str(tmp_path / 'media')
+    os.makedirs(uploads.failed_dir)
+    os.makedirs(uploads.variants_dir)
+    os.makedirs(uploads.storage.root)
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def auth_header(app):
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    token = create_access_token(identity=user.id)
+    return {"Authorization": f"Bearer {token}"}
+
+class FlakyStorage:
+    """Fails the first `failures` uploads, then stores nothing and returns a URL"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def upload(self, path, filename):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("cloudinary timed out")
+        return f"https://cdn.example.com/{filename}"
+
+def form_data(**overrides):
+    data = {
+        "full_name": "Grace Wanjiru",
+        "age": "16",
+        "gender": "Female",
+        "last_seen_date": datetime(2025, 11, 1, 12, 0).isoformat(),
+        "last_seen_location": "Thika, Kenya",
+        "contact_name": "Jane Wanjiru",
+        "contact_phone": "+254712345678",
+        "case_number": "PH001",
+        "photo": (io.BytesIO(b"\xff\xd8\xff fake jpeg bytes"), "grace.jpg"),
+    }
+    data.update(overrides)
+    return data
+
+def create_report(client, auth_header, **overrides):
+    response = client.post(
+        "/api/missing-persons", data=form_data(**overrides),
+        headers=auth_header, content_type="multipart/form-data"
+    )
+    assert response.status_code == 201
+    return response.get_json()["data"]
+
+def test_report_is_created_before_upload(app, client, auth_header):
+    """Test that the response returns at once with the photo pending"""
+    get_photo_uploads(app).storage = FlakyStorage(failures=0)
+    data = create_report(client, auth_header)
+    assert data["photo_status"] == "pending"
+    assert data["photo_url"] is None
+
+def test_photo_url_filled_in_after_upload(app, client, auth_header, tmp_path):
+    """Test the local storage backend end to end"""
+    uploads = get_photo_uploads(app)
+    data = create_report(client, auth_header)
+    uploads.wait(timeout=10)
+
+    person = db.session.get(MissingPerson, data["id"])
+    db.session.refresh(person)
+    assert person.photo_status == "uploaded"
+    assert person.photo_url.startswith("/media/")
+
+    stored = tmp_path / "media" / person.photo_url.rsplit("/", 1)[-1]
+    assert stored.read_bytes() == b"\xff\xd8\xff fake jpeg bytes"
+    # spool is cleaned up once the upload succeeded
+    assert [f for f in os.listdir(uploads.spool_dir) if f not in ("failed", "variants")] == []
+
+def test_spool_removed_when_report_not_saved(app, client, auth_header):
+    """Test that a photo spooled for a report that fails to save is deleted"""
+    uploads = get_photo_uploads(app)
+    uploads.storage = FlakyStorage(failures=0)
+    create_report(client, auth_header)
+    uploads.wait(timeout=10)
+
+    # same case number: the commit fails
+    with pytest.raises(Exception):
+        client.post("/api/missing-persons", data=form_data(), headers=auth_header,
+                    content_type="multipart/form-data")
+    assert [f for f in os.listdir(uploads.spool_dir) if f not in ("failed", "variants")] == []
+    assert MissingPerson.query.count() == 1
+
+def test_non_image_extension_rejected(app, client, auth_header):
+    """Test that a photo without an image extension is refused before spooling"""
+    uploads = get_photo_uploads(app)
+    response = client.post(
+        "/api/missing-persons",
+        data=form_data(photo=(io.BytesIO(b"<?php"), "grace.php")),
+        headers=auth_header, content_type="multipart/form-data"
+    )
+    assert response.status_code == 400
+    assert MissingPerson.query.count() == 0
+    assert [f for f in os.listdir(uploads.spool_dir) if f not in ("failed", "variants")] == []
+
+def test_reinit_shuts_down_previous_queue(app):
+    """Test that initialising the queue again stops the old worker pool"""
+    previous = get_photo_uploads(app)
+    PhotoUploadQueue(app)
+    assert get_photo_uploads(app) is not previous
+    with pytest.raises(RuntimeError):
+        previous.executor.submit(print)
+
+def test_upload_retries_transient_failures(app, client, auth_header):
+    """Test that failed uploads are retried"""
+    uploads = get_photo_uploads(app)
+    uploads.storage = FlakyStorage(failures=2)
+    data = create_report(client, auth_header)
+    uploads.wait(timeout=10)
+
+    person = db.session.get(MissingPerson, data["id"])
+    db.session.refresh(person)
+    assert uploads.storage.calls == 3
+    assert person.photo_status == "uploaded"
+    assert person.photo_url.startswith("https://cdn.example.com/")
+
+def test_upload_gives_up_after_retries(app, client, auth_header):
+    """Test that a permanently failing upload is marked failed and kept"""
+    uploads = get_photo_uploads(app)
+    uploads.storage = FlakyStorage(failures=100)
+    data = create_report(client, auth_header)
+    uploads.wait(timeout=10)
+
+    person = db.session.get(MissingPerson, data["id"])
+    db.session.refresh(person)
+    assert uploads.storage.calls == uploads.retries + 1
+    assert person.photo_status == "failed"
+    assert person.photo_url is None
+    assert len(os.listdir(uploads.failed_dir)) == 1
+
+def test_resume_uploads_spooled_files(app, client, auth_header):
+    """Test that files left in the spool are picked up again"""
+    uploads = get_photo_uploads(app)
+    person = MissingPerson(
+        full_name="Peter Otieno", age=40, gender="Male",
+        last_seen_date=datetime(2025, 11, 1), last_seen_location="Kisumu, Kenya",
+        contact_name="Mary Otieno", contact_phone="+254723456789",
+        case_number="PH002", user_id=1, photo_status="pending"
+    )
+    db.session.add(person)
+    db.session.commit()
+
+    with open(os.path.join(uploads.spool_dir, f"{person.id}__leftover.jpg"), "wb") as f:
+        f.write(b"jpeg")
+
+    uploads.storage = FlakyStorage(failures=0)
+    assert uploads.resume() == 1
+    uploads.wait(timeout=10)
+
+    db.session.refresh(person)
+    assert person.photo_status == "uploaded"
+
+def jpeg_with_exif(size=(2000, 1500)):
+    """A real JPEG carrying camera and GPS metadata"""
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"      # camera make
+    exif[0x8825] = {2: (1.0, 17.0, 0.0)}  # GPS info
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, "JPEG", exif=exif)
+    buffer.seek(0)
+    return buffer
+
+def test_variants_generated_and_stripped(app, client, auth_header, tmp_path):
+    """Test the original, thumbnail and medium variants: sizes, format and no EXIF"""
+    uploads = get_photo_uploads(app)
+    data = create_report(client, auth_header, photo=(jpeg_with_exif(), "grace.jpg"))
+    uploads.wait(timeout=10)
+
+    person = db.session.get(MissingPerson, data["id"])
+    db.session.refresh(person)
+    assert person.photo_status == "uploaded"
+
+    media = tmp_path / "media"
+    with Image.open(media / person.thumbnail_url.rsplit("/", 1)[-1]) as thumb:
+        assert thumb.format == "WEBP"
+        assert thumb.size == (320, 320)
+        assert not thumb.getexif()
+    with Image.open(media / person.photo_medium_url.rsplit("/", 1)[-1]) as medium:
+        assert medium.size == (1024, 768)
+        assert not medium.getexif()
+    with Image.open(media / person.photo_url.rsplit("/", 1)[-1]) as original:
+        assert original.format == "JPEG"
+        assert original.size == (2000, 1500)
+        assert not original.getexif()
+        assert "exif" not in original.info
+
+    # temporary variant files are cleaned up
+    assert os.listdir(uploads.variants_dir) == []
+
+    listed = client.get("/api/missing-persons").get_json()["data"][0]
+    assert listed["thumbnail_url"] == person.thumbnail_url
+
+def test_non_image_still_uploads_original(app, client, auth_header):
+    """Test that an unreadable image is uploaded without variants"""
+    uploads = get_photo_uploads(app)
+    data = create_report(client, auth_header)  # fake jpeg bytes
+    uploads.wait(timeout=10)
+
+    person = db.session.get(MissingPerson, data["id"])
+    db.session.refresh(person)
+    assert person.photo_status == "uploaded"
+    assert person.photo_url
+    assert person.thumbnail_url is None
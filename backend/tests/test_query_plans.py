@@ -0,0 +1,119 @@
+import pytest
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from datetime import datetime, timedelta
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def user_id(app):
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.add_all([
+        MissingPerson(
+            full_name=f"Person {i}", age=20 + i, gender="Female" if i % 2 else "Male",
+            last_seen_date=datetime.utcnow() - timedelta(days=i),
+            last_seen_location="Eldoret, Kenya",
+            contact_name="Contact", contact_phone="+254700000000",
+            status="found" if i % 3 == 0 else "missing",
+            case_number=f"QP{i:03d}", user=user
+        )
+        for i in range(30)
+    ])
+    db.session.commit()
+    return user.id
+
+def report_query_plans(client, url, **kwargs):
+    """
+    Call an endpoint and return the sqlite query plan of every SELECT it
+    ran against missing_persons.
+    """
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM missing_persons' in statement:
+            captured.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url, **kwargs)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capture)
+    assert response.status_code == 200
+
+    plans = []
+    with db.engine.connect() as conn:
+        for statement, parameters in captured:
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            plans.append(' | '.join(row[-1] for row in rows))
+    assert plans
+    return plans
+
+def assert_uses_index(plan, index):
+    assert f'INDEX {index}' in plan, plan
+    assert 'TEMP B-TREE' not in plan, plan
+
+def test_search_by_status_uses_status_date_index(client, user_id):
+    """Test that status + date ordering is served by one index scan"""
+    for plan in report_query_plans(client, '/api/search?status=missing&cursor='):
+        assert_uses_index(plan, 'ix_missing_persons_status_last_seen_date')
+
+def test_search_cursor_page_seeks_date_index(client, user_id):
+    """Test that an unfiltered cursor page walks the last_seen_date index"""
+    first = client.get('/api/search?cursor=&per_page=5').get_json()
+    url = f"/api/search?cursor={first['next_cursor']}&per_page=5"
+    for plan in report_query_plans(client, url):
+        assert_uses_index(plan, 'ix_missing_persons_last_seen_date')
+
+def test_search_by_gender_and_age_uses_index(client, user_id):
+    """Test that gender + age range filters use the composite index"""
+    plans = report_query_plans(client, '/api/search?gender=female&age_min=25&age_max=35&cursor=')
+    assert all('INDEX ix_missing_persons_gender_age' in plan for plan in plans), plans
+
+def test_list_reports_uses_created_at_index(client, user_id):
+    """Test that the paginated list walks the created_at index"""
+    for plan in report_query_plans(client, '/api/missing-persons?limit=10'):
+        assert_uses_index(plan, 'ix_missing_persons_created_at')
+
+def test_recent_reports_uses_created_at_index(client, user_id):
+    """Test that recent reports range-scan the created_at index"""
+    for plan in report_query_plans(client, '/api/missing-persons/recent'):
+        assert_uses_index(plan, 'ix_missing_persons_created_at')
+
+def test_my_reports_uses_user_index(app, client, user_id):
+    """Test that /mine reads only the caller's index range"""
+    token = create_access_token(identity=user_id)
+    plans = report_query_plans(
+        client, '/api/missing-persons/mine?limit=10',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    for plan in plans:
+        assert_uses_index(plan, 'ix_missing_persons_user_id_created_at')
+
+def test_radius_search_uses_geohash_index(client, user_id):
+    """Test that a radius query range-scans geohash cells instead of the table"""
+    plans = report_query_plans(client, '/api/search?near=Eldoret&radius_km=15&sort=distance')
+    assert all('INDEX ix_missing_persons_geohash' in plan for plan in plans), plans
+
+def test_county_filter_uses_county_index(client, user_id):
+    """Test that the location route reads one county from its index"""
+    plans = report_query_plans(client, '/api/missing-persons/location/Uasin Gishu')
+    assert all('INDEX ix_missing_persons_county' in plan for plan in plans), plans
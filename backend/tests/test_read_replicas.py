@@ -0,0 +1,147 @@
+import pytest
+import json
+from app import create_app, db
+from config import config, engine_options, TestingConfig
+from models.routing import _limit_request_statements, get_replicas
+from models.missing_person import MissingPerson
+from models.user import User
+from flask_jwt_extended import create_access_token
+from datetime import datetime
+
+class ReplicaConfig(TestingConfig):
+    SQLALCHEMY_REPLICA_STICKY_SECONDS = 30
+
+def report(case_number, user_id):
+    return dict(
+        full_name=f"Person {case_number}", age=30, gender="Female",
+        last_seen_date=datetime(2026, 9, 1), last_seen_location="Nyeri",
+        contact_name="Contact", contact_phone="+254712345678",
+        status="missing", case_number=case_number, user_id=user_id
+    )
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """Application with a primary and one replica, as two sqlite files"""
+    ReplicaConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+    ReplicaConfig.SQLALCHEMY_REPLICA_URLS = [f"sqlite:///{tmp_path / 'replica.db'}"]
+    monkeypatch.setitem(config, 'replicas', ReplicaConfig)
+    app = create_app('replicas')
+
+    with app.app_context():
+        db.create_all()
+        replica = get_replicas(app)[0]
+        db.metadata.create_all(replica)
+
+        user = User(name="Reporter", email="reporter@test.com")
+        user.set_password("secret123")
+        db.session.add(user)
+        db.session.add(MissingPerson(**report("PRIMARY1", 1)))
+        db.session.commit()
+        # the replica lags behind: it only has an older report
+        with replica.begin() as connection:
+            connection.execute(User.__table__.insert(), [{"id": 1, "name": "Reporter",
+                               "email": "reporter@test.com", "password_hash": user.password_hash}])
+            connection.execute(MissingPerson.__table__.insert(), [report("REPLICA1", 1)])
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(replica)
+        replica.dispose()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(app):
+    return {'Authorization': f'Bearer {create_access_token(identity=1)}'}
+
+def case_numbers(response):
+    assert response.status_code == 200, response.data
+    return [r['case_number'] for r in json.loads(response.data)['data']]
+
+def test_reads_go_to_replica(client):
+    """Test that list and search GETs are served by the replica"""
+    assert case_numbers(client.get('/api/missing-persons')) == ['REPLICA1']
+    results = json.loads(client.get('/api/search').data)['results']
+    assert [r['case_number'] for r in results] == ['REPLICA1']
+
+def test_own_reports_and_writes_use_primary(client, auth_headers):
+    assert case_numbers(client.get('/api/missing-persons/mine', headers=auth_headers)) == ['PRIMARY1']
+
+    response = client.post('/api/missing-persons', headers=auth_headers,
+                           json={**report("NEW1", 1), "last_seen_date": "2026-09-02T10:00:00"})
+    assert response.status_code == 201
+    assert 'Set-Cookie' not in response.headers
+
+    # read-your-writes: the user that wrote reads from the primary for a while
+    assert sorted(case_numbers(client.get('/api/missing-persons', headers=auth_headers))) == ['NEW1', 'PRIMARY1']
+    assert MissingPerson.query.filter_by(case_number='NEW1').count() == 1
+
+    # other users, and anonymous clients, still read from the replica
+    other = {'Authorization': f'Bearer {create_access_token(identity=2)}'}
+    assert case_numbers(client.get('/api/missing-persons', headers=other)) == ['REPLICA1']
+    assert case_numbers(client.get('/api/missing-persons')) == ['REPLICA1']
+
+def test_read_your_writes_without_cookies(app, auth_headers):
+    """Test that stickiness follows the token, not anything the client stores"""
+    writer = app.test_client(use_cookies=False)
+    response = writer.post('/api/missing-persons', headers=auth_headers,
+                           json={**report("NEW2", 1), "last_seen_date": "2026-09-02T10:00:00"})
+    new_id = json.loads(response.data)['data']['id']
+
+    # a fresh client (another tab, or the SPA after a reload) with the same token
+    reader = app.test_client(use_cookies=False)
+    response = reader.get(f'/api/missing-persons/{new_id}', headers=auth_headers)
+    assert response.status_code == 200
+    assert json.loads(response.data)['data']['case_number'] == 'NEW2'
+
+    app.extensions['replica_write_log'].entries.clear()
+    assert case_numbers(reader.get('/api/missing-persons', headers=auth_headers)) == ['REPLICA1']
+
+def test_single_report_falls_back_to_primary(app, client):
+    """Test that a report not replicated yet is read from the primary instead of a 404"""
+    db.session.add(MissingPerson(**report("PRIMARY2", 1)))
+    db.session.commit()
+    assert json.loads(client.get('/api/missing-persons/1').data)['data']['case_number'] == 'REPLICA1'
+    assert json.loads(client.get('/api/missing-persons/2').data)['data']['case_number'] == 'PRIMARY2'
+    assert client.get('/api/missing-persons/3').status_code == 404
+
+def test_no_replicas_configured():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        assert get_replicas(app) == []
+        response = app.test_client().get('/api/missing-persons')
+        assert 'Set-Cookie' not in response.headers
+        db.drop_all()
+
+def test_engine_options():
+    assert engine_options('sqlite:///:memory:') == {}
+    options = engine_options('postgresql://db/findme', pool_size=7)
+    assert options['pool_pre_ping'] is True
+    assert options['pool_size'] == 7
+    # the statement timeout is set per request, not for every connection
+    assert 'connect_args' not in options
+
+def test_statement_timeout_only_inside_requests(app):
+    class Connection:
+        class dialect:
+            name = 'postgresql'
+
+        def __init__(self):
+            self.statements = []
+
+        def exec_driver_sql(self, statement):
+            self.statements.append(statement)
+
+    app.config['REQUEST_STATEMENT_TIMEOUT_MS'] = 5000
+    job = Connection()
+    _limit_request_statements(db.session, None, job)
+    assert job.statements == []
+
+    with app.test_request_context('/api/missing-persons'):
+        handler = Connection()
+        _limit_request_statements(db.session, None, handler)
+    assert handler.statements == ['SET LOCAL statement_timeout = 5000']
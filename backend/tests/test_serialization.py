@@ -0,0 +1,113 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson, SERIALIZED_FIELDS, project, serialize_rows
+from models.user import User
+from sqlalchemy import event
+from utils.json_provider import OrjsonProvider
+from datetime import datetime
+from decimal import Decimal
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def seed_data(app):
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.add_all([
+        MissingPerson(
+            full_name=f"Person {i}", age=20 + i, gender="Female",
+            height="160 cm", weight="55 kg", hair_color="Black", eye_color="Brown",
+            distinguishing_features="Wears glasses",
+            last_seen_date=datetime(2025, 11, i + 1, 8, 30, 15, 250),
+            last_seen_location="Mombasa, Kenya", last_seen_wearing="Red dress",
+            contact_name="Contact", contact_phone="+254700000000",
+            contact_email="contact@example.com", status="missing",
+            case_number=f"SER{i:03d}", additional_info="N/A", user=user
+        )
+        for i in range(5)
+    ])
+    db.session.commit()
+
+def capture_selects(fn):
+    statements = []
+    def record(conn, cursor, statement, *args):
+        if 'FROM missing_persons' in statement:
+            statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+def test_row_serializer_matches_to_dict(app, seed_data):
+    """Test that the compiled serializer produces exactly to_dict()"""
+    people = MissingPerson.query.order_by(MissingPerson.id).all()
+    rows = project(MissingPerson.query, SERIALIZED_FIELDS).order_by(MissingPerson.id).all()
+    assert serialize_rows(rows, SERIALIZED_FIELDS) == [p.to_dict() for p in people]
+
+def test_list_fields_projection(client, seed_data):
+    """Test that only the requested fields are returned and selected"""
+    statements = capture_selects(
+        lambda: client.get('/api/missing-persons?fields=full_name,status')
+    )
+    body = client.get('/api/missing-persons?fields=full_name,status').get_json()
+    assert set(body['data'][0]) == {'id', 'full_name', 'status'}
+    assert body['next_cursor'] is None
+
+    select_list = statements[0].split('FROM')[0]
+    assert 'contact_phone' not in select_list
+    assert 'distinguishing_features' not in select_list
+
+def test_search_fields_projection_with_cursor(client, seed_data):
+    """Test projection on cursor pages, where key columns are still needed"""
+    first = client.get('/api/search?fields=full_name&cursor=&per_page=2').get_json()
+    assert set(first['results'][0]) == {'id', 'full_name'}
+    second = client.get(
+        f"/api/search?fields=full_name&cursor={first['next_cursor']}&per_page=2"
+    ).get_json()
+    ids = [r['id'] for r in first['results'] + second['results']]
+    assert len(set(ids)) == 4
+
+def test_unknown_field_rejected(client, seed_data):
+    """Test that unknown or private fields are a 400"""
+    assert client.get('/api/missing-persons?fields=password_hash').status_code == 400
+    assert client.get('/api/search?fields=nope').status_code == 400
+    assert client.get('/api/missing-persons?format=ndjson&fields=nope').status_code == 400
+
+def test_ndjson_stream_projection(client, seed_data):
+    """Test projected NDJSON lines"""
+    response = client.get('/api/missing-persons?format=ndjson&fields=case_number')
+    lines = response.get_data(as_text=True).strip().split('\n')
+    assert [json.loads(line) for line in lines][0] == {'id': 1, 'case_number': 'SER000'}
+
+def test_full_rows_keep_iso_dates(client, seed_data):
+    """Test that dates keep their ISO format through the fast path"""
+    body = client.get('/api/missing-persons?limit=1').get_json()
+    item = body['data'][0]
+    assert item['last_seen_date'] == '2025-11-05T08:30:15.000250'
+    assert set(item) == set(SERIALIZED_FIELDS)
+
+def test_orjson_provider(app):
+    """Test the orjson provider with jsonify and non-native types"""
+    assert isinstance(app.json, OrjsonProvider)
+    response = app.json.response({'amount': Decimal('1.50'), 1: 'int key'})
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == {'amount': '1.50', '1': 'int key'}
+    assert app.json.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
@@ -0,0 +1,135 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.user import User
+from utils.sighting_matching import parse_height_cm, parse_weight_kg
+from datetime import datetime, timedelta
+
+BASE_DATE = datetime(2026, 9, 1, 18, 0)
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def seed_data(app):
+    """Open and closed cases with different physical descriptions"""
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+
+    def case(number, **attrs):
+        defaults = dict(
+            full_name=f"Person {number}", age=30, gender="Male",
+            last_seen_date=BASE_DATE, last_seen_location="Nairobi",
+            contact_name="Contact", contact_phone="+254712345678",
+            status="missing", case_number=number, user_id=user.id
+        )
+        defaults.update(attrs)
+        return MissingPerson(**defaults)
+
+    people = [
+        case("SM001", age=16, gender="Female", height="5'2\"", weight="48kg",
+             hair_color="Black", eye_color="Brown",
+             distinguishing_features="Scar on left cheek",
+             last_seen_wearing="Blue school uniform", last_seen_location="Thika"),
+        case("SM002", age=40, height="180cm", weight="85 kg", hair_color="Grey",
+             distinguishing_features="Tattoo on right arm",
+             last_seen_wearing="Red jacket", last_seen_location="Kisumu"),
+        case("SM003", age=17, gender="Female", height="1.6m", hair_color="Brown",
+             distinguishing_features="Wears glasses",
+             last_seen_wearing="Green dress", last_seen_location="Nakuru"),
+        # already found: never matched
+        case("SM004", age=16, gender="Female", height="158 cm",
+             distinguishing_features="Scar on left cheek",
+             last_seen_wearing="Blue school uniform", last_seen_location="Thika",
+             status="found"),
+    ]
+    db.session.add_all(people)
+    db.session.commit()
+    return people
+
+def match(client, body):
+    response = client.post('/api/sightings/match', json=body)
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+def test_match_ranks_best_case_first(client, seed_data):
+    """Test that the case fitting the description comes first"""
+    data = match(client, {
+        "age": 15, "gender": "female", "height": "160cm",
+        "description": "girl with a scar on her cheek",
+        "wearing": "school uniform", "location": "Thika town"
+    })
+    assert [r['case_number'] for r in data['results']] == ['SM001', 'SM003']
+    assert data['results'][0]['score'] > data['results'][1]['score']
+    assert data['searched'] == 3
+
+def test_match_excludes_other_gender_and_closed_cases(client, seed_data):
+    data = match(client, {"gender": "Male", "description": "scar on left cheek"})
+    assert [r['case_number'] for r in data['results']] == ['SM002']
+
+def test_match_excludes_cases_missing_after_sighting(client, seed_data):
+    """Test that someone seen before the case opened is not that case"""
+    data = match(client, {"age": 16, "seen_date": (BASE_DATE - timedelta(days=1)).isoformat()})
+    assert data['results'] == []
+
+def test_match_follows_status_changes(client, seed_data):
+    """Test that a case found after the index was built drops out"""
+    assert 'SM002' in [r['case_number'] for r in match(client, {"age": 40})['results']]
+
+    person = MissingPerson.query.filter_by(case_number='SM002').first()
+    person.status = 'found'
+    db.session.commit()
+    assert 'SM002' not in [r['case_number'] for r in match(client, {"age": 40})['results']]
+
+def test_match_limit_and_fields(client, seed_data):
+    data = match(client, {"hair_color": "grey", "limit": 1, "fields": "case_number"})
+    assert data['results'] == [{'id': seed_data[1].id, 'case_number': 'SM002', 'score': data['results'][0]['score']}]
+
+def test_match_requires_a_description(client, seed_data):
+    response = client.post('/api/sightings/match', json={"limit": 5})
+    assert response.status_code == 400
+
+def test_match_rejects_non_string_seen_date(client, seed_data):
+    for seen_date in (20260901, ["2026-09-01"], {"day": 1}):
+        response = client.post('/api/sightings/match', json={"age": 16, "seen_date": seen_date})
+        assert response.status_code == 400
+    response = client.post('/api/sightings/match', json={"age": [16]})
+    assert response.status_code == 400
+
+def test_match_reads_stored_dates_as_utc(client, seed_data):
+    """Test that naive stored dates compare against aware sighting dates as UTC"""
+    before = (BASE_DATE - timedelta(hours=1)).isoformat() + "Z"
+    after = (BASE_DATE + timedelta(hours=1)).isoformat() + "+00:00"
+    assert match(client, {"age": 16, "seen_date": before})['results'] == []
+    assert 'SM001' in [r['case_number'] for r in match(client, {"age": 16, "seen_date": after})['results']]
+
+def test_parse_height_and_weight():
+    assert parse_height_cm("170cm") == 170
+    assert parse_height_cm("1.7m") == 170
+    assert round(parse_height_cm("5'7\"")) == 170
+    assert round(parse_height_cm("5 ft 7 in")) == 170
+    assert parse_height_cm("tall") is None
+    assert parse_weight_kg("60kg") == 60
+    assert round(parse_weight_kg("132 lbs")) == 60
+    assert parse_weight_kg("heavy") is None
+
+def test_match_uses_distance_between_places(client, seed_data):
+    """Test that a sighting near where a case was last seen ranks it higher"""
+    data = match(client, {"gender": "female", "location": "Juja"})
+    assert [r['case_number'] for r in data['results']] == ['SM001', 'SM003']
@@ -0,0 +1,129 @@
+import pytest
+import json
+from app import create_app, db
+from models.missing_person import MissingPerson
+from models.case_statistic import CaseStatistic
+from models.user import User
+from controllers.statistics_controller import StatisticsController
+from datetime import datetime, timedelta
+
+@pytest.fixture
+def app():
+    """Create application for testing"""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client"""
+    return app.test_client()
+
+@pytest.fixture
+def user_id(app):
+    user = User(name="Reporter", email="reporter@test.com")
+    user.set_password("secret123")
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def make_person(user_id, case_number, **overrides):
+    fields = dict(
+        full_name="Test Person", age=25, gender="Male",
+        last_seen_date=datetime.utcnow() - timedelta(days=1),
+        last_seen_location="Nairobi CBD, Kenya",
+        contact_name="Contact", contact_phone="+254700000000",
+        status="missing", case_number=case_number, user_id=user_id
+    )
+    fields.update(overrides)
+    return MissingPerson(**fields)
+
+@pytest.fixture
+def seed_data(app, user_id):
+    db.session.add_all([
+        make_person(user_id, "ST001"),
+        make_person(user_id, "ST002", gender="Female", last_seen_location="Kisumu, Kenya"),
+        make_person(user_id, "ST003", gender="Female", status="found"),
+    ])
+    db.session.commit()
+
+def get_stats(client):
+    response = client.get('/api/missing-persons/stats')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+def test_counters_follow_inserts(client, seed_data):
+    """Test that new reports are counted in every breakdown"""
+    stats = get_stats(client)
+    assert stats['total_cases'] == 3
+    assert stats['missing'] == 2
+    assert stats['found'] == 1
+    assert stats['closed'] == 0
+    assert stats['by_gender'] == {'Male': 1, 'Female': 2}
+    assert stats['by_location'][0] == {'location': 'Nairobi CBD, Kenya', 'count': 2}
+
+def test_counters_follow_updates(client, seed_data):
+    """Test that changing status or location moves the counts"""
+    person = MissingPerson.query.filter_by(case_number="ST001").first()
+    person.status = "closed"
+    person.last_seen_location = "Kisumu, Kenya"
+    db.session.commit()
+
+    stats = get_stats(client)
+    assert stats['total_cases'] == 3
+    assert stats['missing'] == 1
+    assert stats['closed'] == 1
+    assert {'location': 'Kisumu, Kenya', 'count': 2} in stats['by_location']
+
+def test_counters_follow_deletes(client, seed_data):
+    """Test that deleted reports are no longer counted"""
+    person = MissingPerson.query.filter_by(case_number="ST003").first()
+    db.session.delete(person)
+    db.session.commit()
+
+    stats = get_stats(client)
+    assert stats['total_cases'] == 2
+    assert stats['found'] == 0
+    assert stats['by_gender'] == {'Male': 1, 'Female': 1}
+
+def test_rolled_back_changes_are_not_counted(client, seed_data, user_id):
+    """Test that a failed transaction leaves the counters alone"""
+    db.session.add(make_person(user_id, "ST001"))  # duplicate case number
+    with pytest.raises(Exception):
+        db.session.commit()
+    db.session.rollback()
+
+    assert get_stats(client)['total_cases'] == 3
+
+def test_stats_endpoint_does_not_scan_reports(app, client, seed_data):
+    """Test that the endpoint reads only the summary table"""
+    from sqlalchemy import event
+
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        get_stats(client)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert statements
+    assert not any('missing_persons' in s for s in statements)
+
+def test_reconcile_repairs_drift(client, seed_data):
+    """Test that reconcile rebuilds counters after writes that bypass the ORM"""
+    MissingPerson.query.filter_by(status="found").delete()
+    db.session.commit()
+    assert get_stats(client)['total_cases'] == 3
+
+    StatisticsController.reconcile()
+    stats = get_stats(client)
+    assert stats['total_cases'] == 2
+    assert stats['found'] == 0
+    assert CaseStatistic.query.filter_by(dimension='gender', value='Female').first().count == 1
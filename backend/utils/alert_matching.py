@@ -0,0 +1,246 @@
+# utils/alert_matching.py
+#
+# Matching new reports against saved searches ("female, 15-25, near Kisumu").
+#
+# Saved searches use the search endpoint's parameters. Each one is indexed
+# under a single predicate it requires, the most selective it has: a
+# trigram of its location or name text, its county, the geohash cells
+# around its radius or box, the 5-year age buckets it spans, its gender or
+# its status. A new report looks up the postings for its own values, and
+# only those candidate searches are checked in full, so matching costs
+# roughly O(candidates) however many searches are saved.
+
+import math
+import threading
+from collections import defaultdict
+
+from utils import geohash
+from utils.gazetteer import find_place, geocode
+
+# Search parameters a saved search may use
+ALERT_FILTERS = (
+    "status", "gender", "age_min", "age_max", "name", "location",
+    "county", "near", "lat", "lon", "radius_km", "bbox",
+)
+
+# Radius used with `near=` when none is given, as in search
+DEFAULT_RADIUS_KM = 20
+MAX_RADIUS_KM = 500
+
+AGE_BUCKET = 5
+# Age ranges wider than this many buckets are a poor index key
+MAX_AGE_BUCKETS = 6
+
+
+def _place(name):
+    place = find_place(name) or geocode(name)
+    if place is None:
+        raise ValueError(f"unknown place: {name}")
+    return place
+
+
+def trigrams(text):
+    """Every 3-character window of the lowercased text"""
+    text = (text or "").lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def compile_filters(filters):
+    """
+    Check a saved search and resolve it into the criteria matches() uses;
+    place names are looked up once here rather than per report.
+    Raises:
+        ValueError: for unsupported parameters or malformed values
+    """
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object")
+    unknown = sorted(set(filters).difference(ALERT_FILTERS))
+    if unknown:
+        raise ValueError(f"unsupported alert filters: {', '.join(unknown)}")
+    filters = {key: value for key, value in filters.items() if value not in (None, "")}
+    if not filters:
+        raise ValueError("an alert needs at least one filter")
+
+    if ("lat" in filters) != ("lon" in filters):
+        raise ValueError("lat and lon must be given together")
+
+    try:
+        criteria = {}
+        if "status" in filters:
+            criteria["status"] = str(filters["status"])
+        if "gender" in filters:
+            criteria["gender"] = str(filters["gender"]).capitalize()
+        if "age_min" in filters:
+            criteria["age_min"] = int(filters["age_min"])
+        if "age_max" in filters:
+            criteria["age_max"] = int(filters["age_max"])
+        if "name" in filters:
+            criteria["name"] = str(filters["name"]).lower()
+        if "location" in filters:
+            criteria["location"] = str(filters["location"]).lower()
+        if "county" in filters:
+            criteria["county"] = _place(str(filters["county"])).county
+
+        if "near" in filters or "lat" in filters or "lon" in filters:
+            if "near" in filters:
+                place = _place(str(filters["near"]))
+                latitude, longitude = place.latitude, place.longitude
+            else:
+                latitude, longitude = float(filters["lat"]), float(filters["lon"])
+            radius = float(filters.get("radius_km", DEFAULT_RADIUS_KM))
+            if not 0 < radius <= MAX_RADIUS_KM:
+                raise ValueError(f"radius_km must be between 0 and {MAX_RADIUS_KM}")
+            criteria["circle"] = (latitude, longitude, radius)
+
+        if "bbox" in filters:
+            parts = [float(v) for v in str(filters["bbox"]).split(",")]
+            if len(parts) != 4:
+                raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+            min_lon, min_lat, max_lon, max_lat = parts
+            if min_lat > max_lat or min_lon > max_lon:
+                raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat")
+            criteria["bbox"] = (min_lat, min_lon, max_lat, max_lon)
+    except (TypeError, KeyError) as e:
+        # e.g. a list where a number belongs
+        raise ValueError(f"malformed alert filters: {e}")
+    return criteria
+
+
+def matches(criteria, report):
+    """
+    Whether a report (dict of MissingPerson attributes) satisfies the
+    criteria, with the same meaning as the search endpoint's filters.
+    """
+    if "status" in criteria and (report.get("status") or "missing") != criteria["status"]:
+        return False
+    if "gender" in criteria and report.get("gender") != criteria["gender"]:
+        return False
+    age = report.get("age")
+    if "age_min" in criteria and (age is None or age < criteria["age_min"]):
+        return False
+    if "age_max" in criteria and (age is None or age > criteria["age_max"]):
+        return False
+    if "name" in criteria and criteria["name"] not in (report.get("full_name") or "").lower():
+        return False
+    if "location" in criteria and criteria["location"] not in (report.get("last_seen_location") or "").lower():
+        return False
+    if "county" in criteria and report.get("county") != criteria["county"]:
+        return False
+
+    latitude, longitude = report.get("latitude"), report.get("longitude")
+    if "circle" in criteria:
+        if latitude is None or longitude is None:
+            return False
+        # same equirectangular approximation as the radius search
+        center_lat, center_lon, radius = criteria["circle"]
+        dlat = latitude - center_lat
+        dlon = (longitude - center_lon) * math.cos(math.radians(center_lat))
+        if dlat * dlat + dlon * dlon > (radius / geohash.KM_PER_DEGREE) ** 2:
+            return False
+    if "bbox" in criteria:
+        min_lat, min_lon, max_lat, max_lon = criteria["bbox"]
+        if latitude is None or longitude is None:
+            return False
+        if not (min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon):
+            return False
+    return True
+
+
+def index_keys(criteria, posting_size=lambda key: 0):
+    """
+    Postings a saved search is filed under: all the keys of its most
+    selective required predicate. A report matching the search always
+    produces at least one of them (see report_keys).
+    Args:
+        posting_size (callable): current size of a posting, used to pick
+            the least shared trigram of a text pattern
+    """
+    for field in ("location", "name"):
+        if len(criteria.get(field, "")) >= 3:
+            # any one trigram of the pattern occurs in every text containing it
+            gram = min(trigrams(criteria[field]), key=lambda g: (posting_size((field, g)), g))
+            return [(field, gram)]
+    if "county" in criteria:
+        return [("county", criteria["county"])]
+    if "circle" in criteria or "bbox" in criteria:
+        if "circle" in criteria:
+            box = geohash.bbox_around(*criteria["circle"])
+        else:
+            box = criteria["bbox"]
+        return [("cell", prefix) for prefix in geohash.cover(*box)]
+    if "age_min" in criteria or "age_max" in criteria:
+        low = max(criteria.get("age_min", 0), 0) // AGE_BUCKET
+        high = criteria.get("age_max", 150) // AGE_BUCKET
+        if 0 <= high - low < MAX_AGE_BUCKETS:
+            return [("age", bucket) for bucket in range(low, high + 1)]
+    if "gender" in criteria:
+        return [("gender", criteria["gender"])]
+    if "status" in criteria:
+        return [("status", criteria["status"])]
+    return [("any",)]
+
+
+def report_keys(report):
+    """Every posting a report can match through"""
+    keys = [("any",), ("status", report.get("status") or "missing")]
+    keys.extend(("location", gram) for gram in trigrams(report.get("last_seen_location")))
+    keys.extend(("name", gram) for gram in trigrams(report.get("full_name")))
+    if report.get("county"):
+        keys.append(("county", report["county"]))
+    if report.get("geohash"):
+        keys.extend(("cell", report["geohash"][:n]) for n in range(1, len(report["geohash"]) + 1))
+    if report.get("age") is not None:
+        keys.append(("age", report["age"] // AGE_BUCKET))
+    if report.get("gender"):
+        keys.append(("gender", report["gender"]))
+    return keys
+
+
+class SubscriptionIndex:
+    """Inverted index of active saved searches"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = defaultdict(set)
+        # subscription id -> (owner user id, criteria, index keys)
+        self.subscriptions = {}
+        # latest updated_at folded in, for incremental syncs
+        self.synced_until = None
+        # time.monotonic() of the last full rebuild
+        self.built_at = None
+
+    def __len__(self):
+        return len(self.subscriptions)
+
+    def upsert(self, subscription_id, user_id, criteria):
+        self.remove(subscription_id)
+        keys = index_keys(criteria, lambda key: len(self.postings.get(key, ())))
+        self.subscriptions[subscription_id] = (user_id, criteria, keys)
+        for key in keys:
+            self.postings[key].add(subscription_id)
+
+    def remove(self, subscription_id):
+        entry = self.subscriptions.pop(subscription_id, None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            posting = self.postings.get(key)
+            if posting is not None:
+                posting.discard(subscription_id)
+                if not posting:
+                    del self.postings[key]
+
+    def candidates(self, report):
+        found = set()
+        for key in report_keys(report):
+            found.update(self.postings.get(key, ()))
+        return found
+
+    def match(self, report):
+        """(subscription id, owner user id) of every saved search the report satisfies"""
+        results = []
+        for subscription_id in sorted(self.candidates(report)):
+            user_id, criteria, _ = self.subscriptions[subscription_id]
+            if matches(criteria, report):
+                results.append((subscription_id, user_id))
+        return results
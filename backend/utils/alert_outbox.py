@@ -0,0 +1,60 @@
+import json
+import logging
+import threading
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+
+class LogOutbox:
+    """Writes alerts to the application log (development)"""
+
+    def send(self, message):
+        logger.info(
+            "alert for %s: report %s matches %r",
+            message["user"]["email"], message["report"]["id"], message["subscription"]["name"],
+        )
+
+
+class MemoryOutbox:
+    """Keeps sent alerts in a list. Used in tests in place of a real channel."""
+
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        with self._lock:
+            self.sent.append(message)
+
+
+class WebhookOutbox:
+    """
+    POSTs each alert as JSON to a URL, e.g. an email / SMS / push gateway.
+    Anything but a 2xx answer is an error and the alert is retried.
+    """
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, message):
+        request = urllib.request.Request(
+            self.url, data=json.dumps(message).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if not 200 <= response.status < 300:
+                raise RuntimeError(f"webhook answered {response.status}")
+
+
+def create_outbox(app):
+    """Build the outbox selected by the ALERT_OUTBOX config value"""
+    backend = app.config.get("ALERT_OUTBOX", "log")
+    if backend == "log":
+        return LogOutbox()
+    if backend == "memory":
+        return MemoryOutbox()
+    if backend == "webhook":
+        return WebhookOutbox(app.config["ALERT_WEBHOOK_URL"])
+    raise ValueError(f"unknown ALERT_OUTBOX backend: {backend}")
@@ -0,0 +1,125 @@
+# utils/auth.py
+#
+# The one auth layer shared by every blueprint. Tokens are issued and
+# verified with flask_jwt_extended; verified claims and user records are
+# kept in per-app LRU caches so hot authenticated routes skip both the
+# signature check and the users lookup on repeat requests.
+
+import time
+from functools import wraps
+
+import jwt
+from flask import current_app, g, has_app_context, jsonify, request
+from flask_jwt_extended import create_access_token, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from sqlalchemy import event
+
+from models.db import db
+from models.user import User
+from utils.lru_cache import LRUCache
+
+
+class AuthCache:
+    """Verified token claims and user records for one app"""
+
+    def __init__(self, app):
+        self.tokens = LRUCache(app.config.get("AUTH_TOKEN_CACHE_SIZE", 4096))
+        self.users = LRUCache(app.config.get("AUTH_USER_CACHE_SIZE", 1024))
+        # bounds how long another worker's change to a user can go unseen
+        self.user_ttl = app.config.get("AUTH_USER_CACHE_TTL", 60)
+
+
+def init_auth(app):
+    app.extensions["auth"] = AuthCache(app)
+
+
+def _cache():
+    return current_app.extensions["auth"]
+
+
+def issue_token(user):
+    """Access token for `user`, valid for JWT_ACCESS_TOKEN_EXPIRES"""
+    return create_access_token(
+        identity=user.id,
+        additional_claims={"email": user.email},
+    )
+
+
+def verify_token(token):
+    """
+    Decoded claims of a valid token. Claims are cached until the token
+    expires, so a token is only cryptographically verified once.
+    Raises:
+        jwt.ExpiredSignatureError, jwt.InvalidTokenError, JWTExtendedException
+    """
+    cache = _cache().tokens
+    claims = cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        cache.set(token, claims, expires_at=claims.get("exp"))
+    return claims
+
+
+def auth_required(fn):
+    """Reject the request with 401 unless it carries a valid Bearer token"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        header = request.headers.get("Authorization")
+        if not header:
+            return jsonify({"error": "authentication token is required"}), 401
+
+        token = header[7:] if header.startswith("Bearer ") else header
+        try:
+            g.jwt_claims = verify_token(token)
+        except jwt.ExpiredSignatureError:
+            return jsonify({"error": "your session has expired, please login again"}), 401
+        except (jwt.InvalidTokenError, JWTExtendedException):
+            return jsonify({"error": "invalid authentication token"}), 401
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def token_identity():
+    """
+    Identity of the request's bearer token, or None when it has no valid
+    one. For code that runs outside auth_required views.
+    """
+    header = request.headers.get("Authorization")
+    if not header:
+        return None
+    try:
+        claims = verify_token(header[7:] if header.startswith("Bearer ") else header)
+    except (jwt.InvalidTokenError, JWTExtendedException):
+        return None
+    return claims.get("sub")
+
+
+def current_user_id():
+    """Identity of the authenticated caller (inside an auth_required view)"""
+    return g.jwt_claims["sub"]
+
+
+def current_user():
+    """
+    The authenticated caller as a dict (User.to_dict()), or None if the
+    account no longer exists. Cached for at most AUTH_USER_CACHE_TTL seconds
+    and never past the token's expiry.
+    """
+    user_id = current_user_id()
+    cache = _cache()
+    user = cache.users.get(user_id)
+    if user is None:
+        record = db.session.get(User, user_id)
+        if record is None:
+            return None
+        user = record.to_dict()
+        expires_at = min(g.jwt_claims.get("exp", float("inf")), time.time() + cache.user_ttl)
+        cache.users.set(user_id, user, expires_at=expires_at)
+    return user
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _forget_user(mapper, connection, target):
+    if has_app_context() and "auth" in current_app.extensions:
+        _cache().users.pop(target.id)
@@ -0,0 +1,156 @@
+import re
+from collections import defaultdict
+from datetime import datetime
+
+from utils.name_matching import name_similarity, name_tokens, phonetic_key
+
+# Reports further apart than this can not describe the same disappearance
+AGE_TOLERANCE = 5  # years
+DATE_WINDOW_DAYS = 30
+
+# Pairs scoring at least this are reported as possible duplicates
+DUPLICATE_THRESHOLD = 0.7
+
+# Batch scan: each report is compared with at most this many neighbours
+# (by last seen date) inside a block, which keeps huge blocks linear
+MAX_NEIGHBOURS = 50
+
+# How much each attribute contributes to the score, sums to 1
+WEIGHTS = {
+    "name": 0.55,
+    "age": 0.15,
+    "location": 0.15,
+    "date": 0.10,
+    "gender": 0.05,
+}
+
+# Unknown values neither count for nor against a match
+NEUTRAL = 0.5
+
+_LOCATION_STOPWORDS = frozenset({"kenya", "county", "near", "town", "the", "of"})
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def location_tokens(location):
+    return {w for w in _WORD_RE.findall((location or "").lower()) if w not in _LOCATION_STOPWORDS}
+
+
+def _days_apart(a, b):
+    return abs((a - b).total_seconds()) / 86400
+
+
+def match_score(a, b):
+    """
+    Likelihood (0..1) that two reports describe the same person. Reports
+    whose gender differs, or whose age or last seen date are too far apart,
+    score 0.
+    Args:
+        a, b: objects with full_name, age, gender, last_seen_location and
+            last_seen_date attributes (models or result rows)
+    """
+    if a.gender and b.gender and a.gender.lower() != b.gender.lower():
+        return 0.0
+    if a.age is not None and b.age is not None and abs(a.age - b.age) > AGE_TOLERANCE:
+        return 0.0
+    if a.last_seen_date and b.last_seen_date and _days_apart(a.last_seen_date, b.last_seen_date) > DATE_WINDOW_DAYS:
+        return 0.0
+
+    tokens_a, tokens_b = name_tokens(a.full_name), name_tokens(b.full_name)
+    name = (name_similarity(tokens_a, tokens_b) + name_similarity(tokens_b, tokens_a)) / 2
+
+    age = NEUTRAL
+    if a.age is not None and b.age is not None:
+        age = 1 - abs(a.age - b.age) / AGE_TOLERANCE
+
+    location = NEUTRAL
+    places_a, places_b = location_tokens(a.last_seen_location), location_tokens(b.last_seen_location)
+    if places_a and places_b:
+        location = len(places_a & places_b) / len(places_a | places_b)
+
+    date = NEUTRAL
+    if a.last_seen_date and b.last_seen_date:
+        date = 1 - _days_apart(a.last_seen_date, b.last_seen_date) / DATE_WINDOW_DAYS
+
+    gender = 1.0 if a.gender and b.gender else NEUTRAL
+
+    return (
+        WEIGHTS["name"] * name
+        + WEIGHTS["age"] * age
+        + WEIGHTS["location"] * location
+        + WEIGHTS["date"] * date
+        + WEIGHTS["gender"] * gender
+    )
+
+
+def blocking_keys(record):
+    """
+    Keys a report is filed under for the batch scan: the phonetic key of each
+    word of the name. Only reports sharing a key are ever compared.
+    """
+    return {phonetic_key(token) for token in name_tokens(record.full_name)}
+
+
+def find_clusters(records, threshold=DUPLICATE_THRESHOLD):
+    """
+    Group reports that look like duplicates of each other.
+
+    Reports are blocked by name key, sorted by last seen date inside each
+    block and only compared with their nearest MAX_NEIGHBOURS, so the cost
+    grows with the table size rather than its square.
+    Args:
+        records: iterable of objects with an id and the match_score attributes
+        threshold (float): minimum score for two reports to be linked
+    Returns:
+        list: clusters as {"report_ids": [...], "pairs": [{"a", "b", "score"}]},
+            largest first
+    """
+    blocks = defaultdict(list)
+    for record in records:
+        for key in blocking_keys(record):
+            blocks[key].append(record)
+
+    far_future = datetime.max
+    seen = set()
+    pairs = []
+    for block in blocks.values():
+        block.sort(key=lambda r: (r.last_seen_date or far_future, r.id))
+        for i, a in enumerate(block):
+            for b in block[i + 1:i + 1 + MAX_NEIGHBOURS]:
+                if (
+                    a.last_seen_date and b.last_seen_date
+                    and _days_apart(a.last_seen_date, b.last_seen_date) > DATE_WINDOW_DAYS
+                ):
+                    break  # sorted by date, everything further on is too late
+                pair = (a.id, b.id) if a.id < b.id else (b.id, a.id)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                score = match_score(a, b)
+                if score >= threshold:
+                    pairs.append((pair, score))
+
+    # union-find over the linked pairs
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for (x, y), _ in pairs:
+        parent[find(x)] = find(y)
+
+    clusters = defaultdict(lambda: {"report_ids": set(), "pairs": []})
+    for (x, y), score in pairs:
+        cluster = clusters[find(x)]
+        cluster["report_ids"].update((x, y))
+        cluster["pairs"].append({"a": x, "b": y, "score": round(score, 3)})
+
+    result = [
+        {"report_ids": sorted(c["report_ids"]), "pairs": sorted(c["pairs"], key=lambda p: -p["score"])}
+        for c in clusters.values()
+    ]
+    result.sort(key=lambda c: (-len(c["report_ids"]), c["report_ids"][0]))
+    return result
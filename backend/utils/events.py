@@ -0,0 +1,267 @@
+# utils/events.py
+#
+# Push notifications for report changes. Every committed create, update or
+# delete of a MissingPerson becomes an event (published from the session
+# hooks below, after the commit, so listeners never see a rolled back
+# write) and is handed to the app's broker, which fans it out to the
+# open /api/missing-persons/stream connections whose filters match.
+#
+# EVENT_BROKER = 'memory' delivers within this process only. With several
+# worker processes use 'redis' (or any client with the same publish /
+# pubsub interface): every worker publishes to one channel and relays what
+# it hears to its own subscribers.
+
+import logging
+import queue
+import threading
+
+import orjson
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from models.missing_person import MissingPerson
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+
+class EventFilter:
+    """What one subscriber wants to hear about; empty fields match everything"""
+
+    def __init__(self, location=None, status=None, min_age=None, max_age=None):
+        self.location = location.strip().lower() if location else None
+        self.status = status or None
+        self.min_age = min_age
+        self.max_age = max_age
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        Build a filter from request args (location, status, min_age, max_age).
+        Raises:
+            ValueError: if an age bound is not a number
+        """
+        try:
+            min_age = int(args["min_age"]) if args.get("min_age") else None
+            max_age = int(args["max_age"]) if args.get("max_age") else None
+        except ValueError:
+            raise ValueError("min_age and max_age must be whole numbers")
+        return cls(args.get("location"), args.get("status"), min_age, max_age)
+
+    def matches(self, event):
+        data = event["data"]
+        if self.status and self.status not in (data.get("status"), event.get("previous_status")):
+            # a report leaving the status you watch is news too
+            return False
+        if self.location:
+            place = (data.get("last_seen_location") or "").lower()
+            county = (data.get("county") or "").lower()
+            if self.location not in place and self.location != county:
+                return False
+        age = data.get("age")
+        if self.min_age is not None and (age is None or age < self.min_age):
+            return False
+        if self.max_age is not None and (age is None or age > self.max_age):
+            return False
+        return True
+
+
+class Subscription:
+    """Bounded queue of events for one stream"""
+
+    def __init__(self, event_filter, maxsize):
+        self.filter = event_filter
+        self.queue = queue.Queue(maxsize)
+        # set when the client fell too far behind and events were dropped
+        self.overflowed = False
+
+    def get(self, timeout):
+        """Next event, or None if none arrived within `timeout` seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """In-process fan-out to the subscribers of this worker"""
+
+    def __init__(self, queue_size=100, max_subscribers=1000):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def wants_events(self):
+        """False when publishing would reach nobody (skips building events)"""
+        return bool(self._subscribers)
+
+    def subscribe(self, event_filter):
+        """
+        Register a subscriber. Returns its Subscription.
+        Raises:
+            RuntimeError: when max_subscribers streams are already open
+        """
+        subscription = Subscription(event_filter, self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise RuntimeError("too many open event streams")
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        self.deliver(event)
+
+    def deliver(self, event):
+        """Hand `event` to every local subscriber whose filter matches"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.overflowed or not subscription.filter.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # never block the writer on a slow reader; it resyncs instead
+                subscription.overflowed = True
+
+
+class PubSubBroker(EventBroker):
+    """
+    Broker shared by every worker through a pub/sub channel. `client` needs
+    publish(channel, message) and pubsub() returning an object with
+    subscribe(channel) and listen(), as redis-py provides.
+    """
+
+    def __init__(self, client, channel="findme:events", **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.channel = channel
+        self._listener = None
+
+    @property
+    def wants_events(self):
+        # subscribers may be connected to other workers
+        return True
+
+    def subscribe(self, event_filter):
+        self._start_listener()
+        return super().subscribe(event_filter)
+
+    def publish(self, event):
+        self.client.publish(self.channel, orjson.dumps(event))
+
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is not None:
+                return
+            pubsub = self.client.pubsub()
+            pubsub.subscribe(self.channel)
+            self._listener = threading.Thread(
+                target=self._listen, args=(pubsub,), name="event-listener", daemon=True
+            )
+        self._listener.start()
+
+    def _listen(self, pubsub):
+        for message in pubsub.listen():
+            if message.get("type") != "message":
+                continue
+            try:
+                self.deliver(orjson.loads(message["data"]))
+            except Exception:
+                logger.exception("bad event on %s", self.channel)
+
+
+def init_events(app):
+    """Create the broker named by EVENT_BROKER ('memory' or 'redis')"""
+    backend = app.config.get("EVENT_BROKER", "memory")
+    options = {
+        "queue_size": app.config.get("EVENT_QUEUE_SIZE", 100),
+        "max_subscribers": app.config.get("EVENT_MAX_SUBSCRIBERS", 1000),
+    }
+    if backend == "memory":
+        broker = EventBroker(**options)
+    elif backend == "redis":
+        # optional dependency, only needed for this backend
+        import redis
+        broker = PubSubBroker(redis.Redis.from_url(app.config["EVENT_BROKER_URL"]), **options)
+    else:
+        raise ValueError(f"unknown EVENT_BROKER backend: {backend}")
+    app.extensions["events"] = broker
+
+
+def get_event_broker(app):
+    return app.extensions["events"]
+
+
+def format_sse(event):
+    """One server-sent event, as written to the stream"""
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+# ---- session hooks: collect during flushes, publish after the commit
+
+def _broker():
+    if not has_app_context():
+        return None
+    broker = current_app.extensions.get("events")
+    return broker if broker is not None and broker.wants_events else None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deleted(session, flush_context, instances):
+    # deleted rows must be read while they still exist
+    if _broker() is None:
+        return
+    pending = session.info.setdefault("pending_events", [])
+    for obj in session.deleted:
+        if isinstance(obj, MissingPerson):
+            pending.append({"type": DELETED, "id": obj.id, "data": obj.to_dict()})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written(session, flush_context):
+    if _broker() is None:
+        return
+    pending = session.info.setdefault("pending_events", [])
+    for obj in session.new:
+        if isinstance(obj, MissingPerson):
+            pending.append({"type": CREATED, "id": obj.id, "data": obj.to_dict()})
+    for obj in session.dirty:
+        if not isinstance(obj, MissingPerson) or obj in session.deleted:
+            continue
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        item = {"type": UPDATED, "id": obj.id, "data": obj.to_dict()}
+        status = inspect(obj).attrs.status.history
+        if status.deleted and status.deleted[0] != obj.status:
+            item["previous_status"] = status.deleted[0]
+        pending.append(item)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session):
+    events = session.info.pop("pending_events", None)
+    broker = _broker()
+    if not events or broker is None:
+        return
+    for item in events:
+        try:
+            broker.publish(item)
+        except Exception:
+            # the write is committed; a lost notification must not fail it
+            logger.exception("could not publish %s event for report %s", item["type"], item["id"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    session.info.pop("pending_events", None)
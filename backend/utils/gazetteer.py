@@ -0,0 +1,196 @@
+# utils/gazetteer.py
+#
+# Offline gazetteer of Kenyan counties and towns, used to geocode the
+# free-text last_seen_location of reports without calling an external
+# service. Coordinates are the town centre (the county headquarters for
+# counties), which is as precise as "last seen in Thika" gets anyway.
+
+import re
+import unicodedata
+from collections import namedtuple
+
+Place = namedtuple("Place", "name county latitude longitude")
+
+# name, latitude, longitude (county headquarters)
+COUNTIES = (
+    ("Mombasa", -4.0435, 39.6682),
+    ("Kwale", -4.1737, 39.4521),
+    ("Kilifi", -3.6305, 39.8499),
+    ("Tana River", -1.4990, 40.0300),
+    ("Lamu", -2.2717, 40.9020),
+    ("Taita-Taveta", -3.5047, 38.3778),
+    ("Garissa", -0.4536, 39.6401),
+    ("Wajir", 1.7471, 40.0573),
+    ("Mandera", 3.9366, 41.8670),
+    ("Marsabit", 2.3284, 37.9899),
+    ("Isiolo", 0.3546, 37.5822),
+    ("Meru", 0.0470, 37.6498),
+    ("Tharaka-Nithi", -0.3333, 37.6500),
+    ("Embu", -0.5311, 37.4506),
+    ("Kitui", -1.3667, 38.0106),
+    ("Machakos", -1.5177, 37.2634),
+    ("Makueni", -1.7833, 37.6333),
+    ("Nyandarua", -0.2667, 36.3833),
+    ("Nyeri", -0.4201, 36.9476),
+    ("Kirinyaga", -0.4989, 37.2803),
+    ("Murang'a", -0.7210, 37.1526),
+    ("Kiambu", -1.1714, 36.8356),
+    ("Turkana", 3.1191, 35.5973),
+    ("West Pokot", 1.2389, 35.1119),
+    ("Samburu", 1.0968, 36.6980),
+    ("Trans Nzoia", 1.0157, 35.0062),
+    ("Uasin Gishu", 0.5143, 35.2698),
+    ("Elgeyo-Marakwet", 0.6703, 35.5081),
+    ("Nandi", 0.2039, 35.1050),
+    ("Baringo", 0.4919, 35.7430),
+    ("Laikipia", 0.2725, 36.5381),
+    ("Nakuru", -0.3031, 36.0800),
+    ("Narok", -1.0783, 35.8601),
+    ("Kajiado", -1.8524, 36.7768),
+    ("Kericho", -0.3677, 35.2831),
+    ("Bomet", -0.7813, 35.3416),
+    ("Kakamega", 0.2827, 34.7519),
+    ("Vihiga", 0.0833, 34.7167),
+    ("Bungoma", 0.5635, 34.5606),
+    ("Busia", 0.4608, 34.1115),
+    ("Siaya", 0.0612, 34.2881),
+    ("Kisumu", -0.0917, 34.7680),
+    ("Homa Bay", -0.5273, 34.4571),
+    ("Migori", -1.0634, 34.4731),
+    ("Kisii", -0.6817, 34.7667),
+    ("Nyamira", -0.5633, 34.9358),
+    ("Nairobi", -1.2864, 36.8172),
+)
+
+# name, county, latitude, longitude, other spellings
+TOWNS = (
+    # Nairobi
+    ("Nairobi CBD", "Nairobi", -1.2841, 36.8233, ("cbd",)),
+    ("Westlands", "Nairobi", -1.2676, 36.8108, ()),
+    ("Kibera", "Nairobi", -1.3133, 36.7876, ("kibra",)),
+    ("Eastleigh", "Nairobi", -1.2741, 36.8515, ()),
+    ("Karen", "Nairobi", -1.3197, 36.7073, ()),
+    ("Kasarani", "Nairobi", -1.2210, 36.8980, ()),
+    ("Embakasi", "Nairobi", -1.3231, 36.8942, ()),
+    ("Kilimani", "Nairobi", -1.2906, 36.7854, ()),
+    ("Langata", "Nairobi", -1.3620, 36.7440, ("lang'ata",)),
+    ("Kayole", "Nairobi", -1.2764, 36.9130, ()),
+    ("Dagoretti", "Nairobi", -1.2995, 36.7420, ()),
+    ("Mathare", "Nairobi", -1.2598, 36.8580, ()),
+    ("Githurai", "Nairobi", -1.2000, 36.9167, ()),
+    # around Nairobi
+    ("Thika", "Kiambu", -1.0388, 37.0834, ()),
+    ("Ruiru", "Kiambu", -1.1460, 36.9609, ()),
+    ("Juja", "Kiambu", -1.1021, 37.0144, ()),
+    ("Kikuyu", "Kiambu", -1.2463, 36.6629, ()),
+    ("Limuru", "Kiambu", -1.1136, 36.6422, ()),
+    ("Ruaka", "Kiambu", -1.2050, 36.7860, ()),
+    ("Athi River", "Machakos", -1.4500, 36.9833, ("mavoko",)),
+    ("Kitengela", "Kajiado", -1.4730, 36.9600, ()),
+    ("Ngong", "Kajiado", -1.3527, 36.6699, ()),
+    ("Ongata Rongai", "Kajiado", -1.3960, 36.7440, ("rongai",)),
+    ("Namanga", "Kajiado", -2.5500, 36.7833, ()),
+    # central and rift valley
+    ("Naivasha", "Nakuru", -0.7167, 36.4333, ()),
+    ("Gilgil", "Nakuru", -0.4986, 36.3194, ()),
+    ("Molo", "Nakuru", -0.2489, 35.7322, ()),
+    ("Nyahururu", "Laikipia", 0.0390, 36.3630, ()),
+    ("Nanyuki", "Laikipia", 0.0167, 37.0667, ()),
+    ("Rumuruti", "Laikipia", 0.2725, 36.5381, ()),
+    ("Karatina", "Nyeri", -0.4833, 37.1333, ()),
+    ("Kerugoya", "Kirinyaga", -0.4989, 37.2803, ()),
+    ("Ol Kalou", "Nyandarua", -0.2667, 36.3833, ("olkalou",)),
+    ("Chuka", "Tharaka-Nithi", -0.3333, 37.6500, ()),
+    ("Maua", "Meru", 0.2333, 37.9333, ()),
+    ("Eldoret", "Uasin Gishu", 0.5143, 35.2698, ()),
+    ("Kitale", "Trans Nzoia", 1.0157, 35.0062, ()),
+    ("Iten", "Elgeyo-Marakwet", 0.6703, 35.5081, ()),
+    ("Kapsabet", "Nandi", 0.2039, 35.1050, ()),
+    ("Kabarnet", "Baringo", 0.4919, 35.7430, ()),
+    ("Kapenguria", "West Pokot", 1.2389, 35.1119, ()),
+    ("Maralal", "Samburu", 1.0968, 36.6980, ()),
+    ("Lodwar", "Turkana", 3.1191, 35.5973, ()),
+    ("Kakuma", "Turkana", 3.7167, 34.8667, ()),
+    ("Litein", "Kericho", -0.5833, 35.1833, ()),
+    # eastern and north eastern
+    ("Mwingi", "Kitui", -0.9333, 38.0667, ()),
+    ("Wote", "Makueni", -1.7833, 37.6333, ()),
+    ("Emali", "Makueni", -2.0833, 37.4667, ()),
+    ("Moyale", "Marsabit", 3.5167, 39.0500, ()),
+    ("Dadaab", "Garissa", 0.0531, 40.3086, ()),
+    ("Hola", "Tana River", -1.4990, 40.0300, ()),
+    # coast
+    ("Nyali", "Mombasa", -4.0333, 39.7000, ()),
+    ("Likoni", "Mombasa", -4.0833, 39.6667, ()),
+    ("Malindi", "Kilifi", -3.2192, 40.1169, ()),
+    ("Watamu", "Kilifi", -3.3546, 40.0244, ()),
+    ("Mtwapa", "Kilifi", -3.9500, 39.7500, ()),
+    ("Ukunda", "Kwale", -4.2833, 39.5667, ()),
+    ("Diani", "Kwale", -4.2797, 39.5947, ()),
+    ("Voi", "Taita-Taveta", -3.3961, 38.5561, ()),
+    ("Taveta", "Taita-Taveta", -3.3986, 37.6753, ()),
+    # western and nyanza
+    ("Ahero", "Kisumu", -0.1667, 34.9167, ()),
+    ("Maseno", "Kisumu", 0.0000, 34.6000, ()),
+    ("Bondo", "Siaya", -0.1000, 34.2667, ()),
+    ("Mbita", "Homa Bay", -0.4333, 34.2000, ()),
+    ("Awendo", "Migori", -0.9000, 34.5333, ()),
+    ("Rongo", "Migori", -0.7667, 34.6000, ()),
+    ("Malaba", "Busia", 0.6333, 34.2833, ()),
+    ("Webuye", "Bungoma", 0.6167, 34.7667, ()),
+    ("Mumias", "Kakamega", 0.3333, 34.4833, ()),
+    ("Mbale", "Vihiga", 0.0833, 34.7167, ()),
+)
+
+# Longest place name in words; longer phrases are never looked up
+MAX_NAME_WORDS = 3
+
+# Words that never help to find a place
+_NOISE = frozenset({"kenya", "county", "town", "city", "centre", "center", "area", "estate"})
+
+_SEPARATORS_RE = re.compile(r"[,;/()|]")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase ASCII words ("Murang'a" -> "muranga", "Taita-Taveta" -> "taita taveta")"""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    text = text.replace("'", "").replace("’", "")
+    return " ".join(_WORD_RE.findall(text))
+
+
+def _build_lookup():
+    lookup = {}
+    for name, latitude, longitude in COUNTIES:
+        lookup[normalize(name)] = Place(name, name, latitude, longitude)
+    for name, county, latitude, longitude, aliases in TOWNS:
+        place = Place(name, county, latitude, longitude)
+        for alias in (name,) + aliases:
+            lookup[normalize(alias)] = place
+    return lookup
+
+
+PLACES = _build_lookup()
+
+
+def find_place(name):
+    """The Place called exactly `name` (any known spelling), or None"""
+    return PLACES.get(normalize(name))
+
+
+def geocode(location):
+    """
+    Best Place for a free-text location such as "Westlands, Nairobi" or
+    "Nairobi CBD, Kenya". Comma separated parts are tried in order, most
+    specific first, and within a part the longest known name wins.
+    Returns:
+        Place or None if nothing in the text is a known place
+    """
+    for part in _SEPARATORS_RE.split(location or ""):
+        words = [w for w in normalize(part).split() if w not in _NOISE]
+        for length in range(min(MAX_NAME_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - length + 1):
+                place = PLACES.get(" ".join(words[start:start + length]))
+                if place is not None:
+                    return place
+    return None
@@ -0,0 +1,85 @@
+import math
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precision stored on reports: cells of about 1.2 x 0.6 km
+PRECISION = 6
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Most cells a query may expand to before a coarser precision is used
+MAX_COVER_CELLS = 16
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Geohash of a point; nearby points share a prefix"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """(height, width) of a cell in degrees"""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def cover(min_lat, min_lon, max_lat, max_lon, max_cells=MAX_COVER_CELLS, max_precision=PRECISION):
+    """
+    Geohash prefixes whose cells together cover a bounding box, at the
+    finest precision (up to `max_precision`) needing no more than `max_cells`
+    of them.
+    """
+    for precision in range(max_precision, 0, -1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        cols = math.floor(max_lon / width) - math.floor(min_lon / width) + 1
+        if rows * cols <= max_cells or precision == 1:
+            break
+
+    cells = set()
+    lat = math.floor(min_lat / height) * height
+    while lat <= max_lat:
+        lon = math.floor(min_lon / width) * width
+        while lon <= max_lon:
+            # sample the middle of the cell to avoid edge rounding
+            cells.add(encode(
+                min(max(lat + height / 2, -90.0), 90.0),
+                min(max(lon + width / 2, -180.0), 180.0),
+                precision,
+            ))
+            lon += width
+        lat += height
+    return sorted(cells)
+
+
+def bbox_around(latitude, longitude, radius_km):
+    """(min_lat, min_lon, max_lat, max_lon) of a box enclosing a circle"""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return latitude - dlat, longitude - dlon, latitude + dlat, longitude + dlon
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance between two points"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,170 @@
+# utils/http_cache.py
+#
+# Conditional GETs and a server-side response cache for the read endpoints.
+#
+# Every cacheable response is keyed on the endpoint, its normalized query
+# arguments and the version of the data behind it: the latest updated_at
+# of the reports plus their count (read from the statistics counters, so
+# deletes change it too). A write changes the version, which makes both
+# the ETag and the cache key change, so stale entries are never served and
+# simply age out. Clients polling with If-None-Match get a bodyless 304 for
+# the price of the version lookup; other requests for a version already
+# rendered are answered from the cache without running the view.
+#
+# Off (views run as if undecorated) unless HTTP_CACHE_ENABLED.
+# Writes that bypass the ORM (bulk SQL) must run `flask stats reconcile`
+# as usual, or cached lists may be served until RESPONSE_CACHE_TTL expires.
+
+import hashlib
+import time
+from functools import wraps
+
+from flask import Response, current_app, make_response, request
+from sqlalchemy import func
+
+from models.db import db
+from models.case_statistic import CaseStatistic
+from models.missing_person import MissingPerson
+from utils.lru_cache import LRUCache
+
+
+class MemoryResponseCache:
+    """Per-process LRU of rendered responses"""
+
+    def __init__(self, maxsize, ttl):
+        self.entries = LRUCache(maxsize)
+        self.ttl = ttl
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, value):
+        self.entries.set(key, value, expires_at=time.time() + self.ttl)
+
+
+class RedisResponseCache:
+    """
+    Responses shared by every worker in Redis (or anything with the same
+    get / set(ex=) interface).
+    """
+
+    def __init__(self, client, ttl, prefix="findme:response:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        mimetype, _, body = raw.partition(b"\n")
+        return mimetype.decode(), body
+
+    def set(self, key, value):
+        mimetype, body = value
+        self.client.set(self.prefix + key, mimetype.encode() + b"\n" + body, ex=self.ttl)
+
+
+def init_response_cache(app):
+    """
+    Create the cache named by RESPONSE_CACHE: 'memory', 'redis' (at
+    RESPONSE_CACHE_REDIS_URL) or None to only answer conditional requests.
+    """
+    backend = app.config.get("RESPONSE_CACHE") if app.config.get("HTTP_CACHE_ENABLED") else None
+    ttl = app.config.get("RESPONSE_CACHE_TTL", 300)
+    if backend == "memory":
+        cache = MemoryResponseCache(app.config.get("RESPONSE_CACHE_SIZE", 512), ttl)
+    elif backend == "redis":
+        # optional dependency, only needed for this backend
+        import redis
+        cache = RedisResponseCache(redis.Redis.from_url(app.config["RESPONSE_CACHE_REDIS_URL"]), ttl)
+    elif backend:
+        raise ValueError(f"unknown RESPONSE_CACHE backend: {backend}")
+    else:
+        cache = None
+    app.extensions["response_cache"] = cache
+
+
+def get_response_cache(app):
+    return app.extensions.get("response_cache")
+
+
+def reports_version(person_id=None):
+    """
+    (latest updated_at, number of reports) of every report, or of one.
+    Both come from indexes / counters, never a table scan.
+    """
+    if person_id is not None:
+        return db.session.query(
+            func.max(MissingPerson.updated_at), func.count(MissingPerson.id)
+        ).filter(MissingPerson.id == person_id).one()
+    latest = db.session.query(func.max(MissingPerson.updated_at)).scalar()
+    total = db.session.query(CaseStatistic.count).filter_by(dimension="total", value="all").scalar()
+    return latest, total or 0
+
+
+def _cache_key(view_kwargs, version, time_bucket):
+    parts = [request.endpoint, repr(sorted(view_kwargs.items()))]
+    parts.extend(f"{name}={value}" for name, value in sorted(request.args.items(multi=True)))
+    parts.append(repr(version))
+    if time_bucket:
+        parts.append(str(int(time.time() // time_bucket)))
+    return hashlib.sha1("\x00".join(parts).encode()).hexdigest()
+
+
+def conditional(max_age=0, version=reports_version, time_bucket=None, per_item=False):
+    """
+    Add ETag / Last-Modified / Cache-Control to a read view, answer 304 to
+    matching If-None-Match (and, for single items, If-Modified-Since)
+    requests, and serve repeat requests from the response cache.
+    Args:
+        max_age (int): seconds clients may reuse a response without asking;
+            0 means they must revalidate every time (cheaply, with a 304)
+        version (callable): returns (latest update, row count) of the data
+            behind the view; called with the view's arguments when per_item
+        time_bucket (int): for views whose result also depends on the clock
+            (e.g. "last 7 days"), seconds after which a response is recomputed
+        per_item (bool): the view serves one item, so Last-Modified is exact
+            and If-Modified-Since can be honoured
+    """
+    cache_control = f"public, max-age={max_age}" if max_age else "public, no-cache"
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("HTTP_CACHE_ENABLED"):
+                return view(*args, **kwargs)
+            latest, count = data_version = version(**kwargs) if per_item else version()
+            etag = _cache_key(kwargs, data_version, time_bucket)
+
+            def validators(response):
+                response.set_etag(etag)
+                if latest is not None:
+                    response.last_modified = latest
+                response.headers["Cache-Control"] = cache_control
+                return response
+
+            not_modified = etag in request.if_none_match
+            if (per_item and not request.if_none_match and count and latest is not None
+                    and request.if_modified_since is not None):
+                not_modified = latest.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+            if not_modified:
+                return validators(Response(status=304))
+
+            cache = get_response_cache(current_app)
+            cached = cache.get(etag) if cache is not None else None
+            if cached is not None:
+                mimetype, body = cached
+                response = Response(body, mimetype=mimetype)
+                response.headers["X-Cache"] = "HIT"
+                return validators(response)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            if cache is not None:
+                cache.set(etag, (response.mimetype, response.get_data()))
+                response.headers["X-Cache"] = "MISS"
+            return validators(response)
+        return wrapper
+    return decorator
@@ -0,0 +1,67 @@
+import os
+
+from PIL import Image, ImageOps
+
+# report attribute -> (size, mode). "cover" crops to exactly `size` for the
+# card grids, "contain" only shrinks so the longest edge fits.
+VARIANTS = {
+    "thumbnail_url": ((320, 320), "cover"),
+    "photo_medium_url": ((1024, 1024), "contain"),
+}
+
+# Pillow format name -> file extension
+FORMATS = {"WEBP": ".webp", "JPEG": ".jpg"}
+
+# formats the full-size original is re-encoded in; anything else becomes JPEG
+ORIGINAL_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+ORIGINAL_QUALITY = 95
+
+
+def generate_variants(path, out_dir, image_format="WEBP", quality=80):
+    """
+    Build the resized, web-optimized copies of a report photo, plus a
+    full-size copy of the original ("photo_url").
+
+    The image is rotated according to its EXIF orientation and then saved
+    without any metadata, so camera details and GPS coordinates never reach
+    the public URLs. The original keeps its format when it is JPEG, PNG or
+    WebP and is re-encoded as JPEG otherwise.
+    Args:
+        path (str): original image on disk
+        out_dir (str): directory to write the variants to
+        image_format (str): "WEBP" or "JPEG"
+        quality (int): encoder quality, 1-100
+    Returns:
+        dict: {report attribute: path of the generated file}
+    Raises:
+        PIL.UnidentifiedImageError: if the file is not an image
+    """
+    if image_format not in FORMATS:
+        raise ValueError(f"unsupported image format: {image_format}")
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    outputs = {}
+    with Image.open(path) as original:
+        original_format = original.format if original.format in ORIGINAL_FORMATS else "JPEG"
+        upright = ImageOps.exif_transpose(original)
+    image = upright.convert("RGB")
+
+    out_path = os.path.join(out_dir, f"{stem}_original{ORIGINAL_FORMATS[original_format]}")
+    (image if original_format == "JPEG" else upright).save(
+        out_path, original_format, quality=ORIGINAL_QUALITY
+    )
+    outputs["photo_url"] = out_path
+
+    for field, (size, mode) in VARIANTS.items():
+        if mode == "cover":
+            resized = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail(size, Image.Resampling.LANCZOS)
+
+        suffix = field.replace("_url", "")
+        out_path = os.path.join(out_dir, f"{stem}_{suffix}{FORMATS[image_format]}")
+        # a fresh image carries no exif/icc info unless we pass it explicitly
+        resized.save(out_path, image_format, quality=quality, optimize=True)
+        outputs[field] = out_path
+    return outputs
@@ -0,0 +1,284 @@
+# utils/instrumentation.py
+#
+# Opt-in request instrumentation (INSTRUMENTATION_ENABLED). For every
+# request it records the wall time and the SQL statements issued, answers
+# with a Server-Timing header, flags likely N+1 query patterns, profiles a
+# sample of requests with cProfile (kept on disk when they turn out slow),
+# and exposes the totals in Prometheus text format on /metrics.
+#
+# Metrics live in process memory, so under gunicorn each worker reports its
+# own; scrape every worker or aggregate downstream.
+
+import cProfile
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Request latency histogram buckets, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# SQL statements per request histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+class RequestStats:
+    """SQL issued during one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        # statement text (numbers stripped) -> executions, for N+1 detection
+        self.statements = Counter()
+        self.profiler = None
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label value"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = defaultdict(lambda: [0] * (len(buckets) + 1))
+        self.sums = defaultdict(float)
+
+    def observe(self, label, value):
+        counts = self.counts[label]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-1] += 1
+        self.sums[label] += value
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{str(value).replace(chr(34), chr(39))}"' for name, value in labels.items())
+
+
+class Instrumentation:
+    """
+    Request and SQL instrumentation for one app; a no-op unless
+    INSTRUMENTATION_ENABLED is set.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["instrumentation"] = self
+        self.enabled = bool(app.config.get("INSTRUMENTATION_ENABLED"))
+        if not self.enabled:
+            return
+
+        self.slow_seconds = app.config.get("INSTRUMENTATION_SLOW_REQUEST_MS", 500) / 1000
+        self.profile_rate = app.config.get("INSTRUMENTATION_PROFILE_SAMPLE_RATE", 0.0)
+        self.profile_dir = app.config.get("INSTRUMENTATION_PROFILE_DIR")
+        self.n_plus_one_threshold = app.config.get("INSTRUMENTATION_N_PLUS_ONE_THRESHOLD", 10)
+
+        self._lock = threading.Lock()
+        self.requests = Counter()       # (method, endpoint, status)
+        self.durations = Histogram(DURATION_BUCKETS)
+        self.query_counts = Histogram(QUERY_COUNT_BUCKETS)
+        self.sql_seconds = Counter()    # endpoint
+        self.slow_requests = Counter()  # endpoint
+        self.n_plus_one = Counter()     # endpoint
+        self.profiles = 0
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule("/metrics", "metrics", self._metrics_view)
+        _listen_for_sql()
+
+    # ---- request hooks
+
+    def _before_request(self):
+        stats = g._request_stats = RequestStats()
+        if self.profile_rate and random.random() < self.profile_rate:
+            stats.profiler = cProfile.Profile()
+            stats.profiler.enable()
+
+    def _after_request(self, response):
+        stats = g.get("_request_stats")
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - stats.started
+        response.headers["Server-Timing"] = (
+            f'app;dur={elapsed * 1000:.1f}, '
+            f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.queries} queries"'
+        )
+        self._record(stats, elapsed, response.status_code)
+        return response
+
+    def _teardown_request(self, error=None):
+        # in case after_request never ran (an error in another hook): stop the profiler
+        stats = g.pop("_request_stats", None)
+        if stats is not None and stats.profiler is not None:
+            stats.profiler.disable()
+
+    def _record(self, stats, elapsed, status):
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        if endpoint == "/metrics":
+            return
+
+        repeated = [
+            (statement, count) for statement, count in stats.statements.items()
+            if count >= self.n_plus_one_threshold
+        ]
+        for statement, count in repeated:
+            logger.warning(
+                "possible N+1 on %s %s: statement run %d times: %.200s",
+                request.method, endpoint, count, statement,
+            )
+
+        slow = elapsed >= self.slow_seconds
+        if slow:
+            logger.warning(
+                "slow request %s %s: %.0f ms, %d queries, %.0f ms in SQL",
+                request.method, endpoint, elapsed * 1000, stats.queries, stats.sql_seconds * 1000,
+            )
+
+        if stats.profiler is not None:
+            stats.profiler.disable()
+            if slow and self.profile_dir:
+                self._save_profile(stats.profiler, endpoint)
+            stats.profiler = None
+
+        with self._lock:
+            self.requests[(request.method, endpoint, status)] += 1
+            self.durations.observe(endpoint, elapsed)
+            self.query_counts.observe(endpoint, stats.queries)
+            self.sql_seconds[endpoint] += stats.sql_seconds
+            if slow:
+                self.slow_requests[endpoint] += 1
+            if repeated:
+                self.n_plus_one[endpoint] += 1
+
+    def _save_profile(self, profiler, endpoint):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9]+", "_", endpoint).strip("_") or "root"
+        path = os.path.join(self.profile_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{request.method}-{name}.prof")
+        profiler.dump_stats(path)
+        with self._lock:
+            self.profiles += 1
+        logger.warning("profile of slow request saved to %s", path)
+
+    # ---- /metrics
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}" for labels, value in samples)
+
+        def histogram(name, help_text, hist):
+            samples = []
+            for endpoint in sorted(hist.counts):
+                counts = hist.counts[endpoint]
+                for bound, count in zip(hist.buckets, counts):
+                    samples.append((_labels(endpoint=endpoint, le=bound), count))
+                samples.append((_labels(endpoint=endpoint, le="+Inf"), counts[-1]))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, value in samples:
+                lines.append(f"{name}_bucket{{{labels}}} {value}")
+            for endpoint in sorted(hist.counts):
+                lines.append(f"{name}_sum{{{_labels(endpoint=endpoint)}}} {hist.sums[endpoint]:.6f}")
+                lines.append(f"{name}_count{{{_labels(endpoint=endpoint)}}} {hist.counts[endpoint][-1]}")
+
+        with self._lock:
+            metric("findme_http_requests_total", "counter", "HTTP requests handled.", [
+                (_labels(method=method, endpoint=endpoint, status=status), count)
+                for (method, endpoint, status), count in sorted(self.requests.items())
+            ])
+            histogram("findme_http_request_duration_seconds", "Request wall time.", self.durations)
+            histogram("findme_sql_queries_per_request", "SQL statements issued per request.", self.query_counts)
+            metric("findme_sql_duration_seconds_total", "counter", "Time spent in SQL statements.", [
+                (_labels(endpoint=endpoint), f"{seconds:.6f}") for endpoint, seconds in sorted(self.sql_seconds.items())
+            ])
+            metric("findme_slow_requests_total", "counter", "Requests slower than the slow request threshold.", [
+                (_labels(endpoint=endpoint), count) for endpoint, count in sorted(self.slow_requests.items())
+            ])
+            metric("findme_n_plus_one_requests_total", "counter",
+                   "Requests that ran one statement at least the N+1 threshold times.", [
+                       (_labels(endpoint=endpoint), count) for endpoint, count in sorted(self.n_plus_one.items())
+                   ])
+            metric("findme_profiles_saved_total", "counter", "Profiles of slow requests written to disk.",
+                   [("", self.profiles)])
+
+        hasher = current_app.extensions.get("password_hasher")
+        if hasher is not None and hasher.executor is not None:
+            for key, value in hasher.metrics().items():
+                kind = "counter" if key in ("completed", "rejected") else "gauge"
+                suffix = "_total" if kind == "counter" else ""
+                metric(f"findme_password_hash_{key}{suffix}", kind, f"Password hashing pool: {key}.", [("", value)])
+
+        auth = current_app.extensions.get("auth")
+        if auth is not None:
+            for kind in ("hits", "misses"):
+                metric(f"findme_auth_cache_{kind}_total", "counter", f"Auth cache {kind}.", [
+                    (_labels(cache=name), getattr(getattr(auth, name), kind)) for name in ("tokens", "users")
+                ])
+
+        return "\n".join(lines) + "\n"
+
+    def _metrics_view(self):
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+
+def get_instrumentation(app):
+    return app.extensions["instrumentation"]
+
+
+# ---- SQL hooks, on every engine; only statements run inside an
+# instrumented request are counted
+
+_listening = False
+
+
+def _listen_for_sql():
+    global _listening
+    if _listening:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _listening = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    if not has_request_context():
+        return
+    stats = g.get("_request_stats")
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.sql_seconds += time.perf_counter() - started
+    # literal ids in otherwise identical statements still count as a repeat
+    stats.statements[_NUMBER_RE.sub("?", statement)] += 1
+
+
+def _handle_error(context):
+    # a failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
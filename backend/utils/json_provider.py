@@ -0,0 +1,37 @@
+import decimal
+
+import orjson
+from flask.json.provider import JSONProvider
+
+
+def _default(o):
+    # the types orjson can't encode natively that flask's provider handles
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson, which encodes straight to bytes several
+    times faster than the stdlib encoder. Used by jsonify() and request.get_json().
+    Keys are not sorted; datetimes encode as ISO 8601.
+    """
+
+    mimetype = "application/json"
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.options).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(
+            obj, default=_default, option=self.options | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
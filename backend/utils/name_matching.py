@@ -0,0 +1,156 @@
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Soundex consonant classes
+_SOUNDEX = {}
+for _letters, _code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6")):
+    for _letter in _letters:
+        _SOUNDEX[_letter] = _code
+
+# spelling variants that sound the same, applied before encoding
+_SPELLING = (("ph", "f"), ("ck", "k"), ("y", "i"))
+
+
+def name_tokens(text):
+    """Lowercase ASCII words of a name, accents removed"""
+    ascii_text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode()
+    return _WORD_RE.findall(ascii_text.lower())
+
+
+def trigrams(token):
+    """Trigrams of one word, padded the way pg_trgm pads them"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def phonetic_key(token):
+    """
+    Soundex code of a word after folding common transliteration variants
+    (Otyeno -> Otieno), so names that sound alike share a key.
+    """
+    for old, new in _SPELLING:
+        token = token.replace(old, new)
+    if not token:
+        return ""
+    code = token[0]
+    previous = _SOUNDEX.get(token[0], "")
+    for letter in token[1:]:
+        digit = _SOUNDEX.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if letter not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def token_similarity(query, token):
+    """Similarity of a query word to a name word, 0..1"""
+    if query == token:
+        return 1.0
+    if token.startswith(query):
+        # search-as-you-type: a prefix is a strong match, longer prefixes more so
+        return 0.7 + 0.3 * len(query) / len(token)
+    a, b = trigrams(query), trigrams(token)
+    score = len(a & b) / len(a | b)
+    if len(query) > 2 and phonetic_key(query) == phonetic_key(token):
+        score = max(score, 0.75)
+    return score
+
+
+def name_similarity(query_tokens, name_tokens_):
+    """Average over the query words of their best match among the name words"""
+    if not query_tokens or not name_tokens_:
+        return 0.0
+    return sum(
+        max(token_similarity(q, t) for t in name_tokens_) for q in query_tokens
+    ) / len(query_tokens)
+
+
+class NameIndex:
+    """
+    In-memory trigram and phonetic inverted index over report names.
+
+    Postings map each trigram and each phonetic key to the report ids whose
+    name contains it, so a query only scores the reports sharing enough
+    trigrams (or a sound-alike word) with it instead of every row.
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.trigram_postings = defaultdict(set)
+        self.phonetic_postings = defaultdict(set)
+        self.lock = threading.RLock()
+        # sync bookkeeping, managed by the caller
+        self.synced_until = None
+        self.checked_at = None
+        self.built_at = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, report_id, name):
+        with self.lock:
+            self.remove(report_id)
+            tokens = tuple(name_tokens(name))
+            self.names[report_id] = tokens
+            for token in tokens:
+                for gram in trigrams(token):
+                    self.trigram_postings[gram].add(report_id)
+                self.phonetic_postings[phonetic_key(token)].add(report_id)
+
+    def remove(self, report_id):
+        with self.lock:
+            tokens = self.names.pop(report_id, None)
+            if not tokens:
+                return
+            for token in tokens:
+                for gram in trigrams(token):
+                    postings = self.trigram_postings.get(gram)
+                    if postings is not None:
+                        postings.discard(report_id)
+                        if not postings:
+                            del self.trigram_postings[gram]
+                key = phonetic_key(token)
+                postings = self.phonetic_postings.get(key)
+                if postings is not None:
+                    postings.discard(report_id)
+                    if not postings:
+                        del self.phonetic_postings[key]
+
+    def search(self, text, threshold=0.3, limit=500):
+        """
+        Reports whose name is similar to `text`, best first; at most
+        `limit` of them, or all when it is None.
+        Returns:
+            list: [(report id, similarity)] with similarity >= threshold
+        """
+        query_tokens = name_tokens(text)
+        if not query_tokens:
+            return []
+
+        with self.lock:
+            candidates = set()
+            for token in query_tokens:
+                grams = trigrams(token)
+                # a candidate must share a fair part of the word's trigrams
+                needed = max(1, min(len(grams) - 1, int(len(grams) * 0.3)))
+                shared = Counter()
+                for gram in grams:
+                    shared.update(self.trigram_postings.get(gram, ()))
+                candidates.update(rid for rid, count in shared.items() if count >= needed)
+                candidates.update(self.phonetic_postings.get(phonetic_key(token), ()))
+
+            scored = []
+            for report_id in candidates:
+                score = name_similarity(query_tokens, self.names.get(report_id, ()))
+                if score >= threshold:
+                    scored.append((report_id, score))
+
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored if limit is None else scored[:limit]
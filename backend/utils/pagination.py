@@ -0,0 +1,104 @@
+import base64
+import json
+import re
+from datetime import datetime
+
+from sqlalchemy import DateTime, func, select, text, tuple_
+
+# upper bound for a single page so one request can't pull the whole table
+MAX_PAGE_SIZE = 100
+
+_PLAN_ROWS_RE = re.compile(r"rows=(\d+)")
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def encode_cursor(values):
+    """
+    Turn the sort key of the last row on a page into an opaque cursor string.
+    Datetimes are stored as ISO strings and restored by decode_cursor.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    """
+    Decode a cursor produced by encode_cursor back into typed key values.
+    Args:
+        cursor (str): opaque cursor from a previous response
+        columns (list): the key columns, used to restore datetimes
+    Returns:
+        list: one value per key column
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for value, column in zip(values, columns)
+        ]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("invalid cursor") from e
+
+
+def keyset_paginate(query, columns, cursor=None, limit=20):
+    """
+    Fetch one page of `query` ordered by `columns` descending, starting
+    strictly after the row encoded in `cursor`.
+
+    Unlike OFFSET pagination the database seeks straight to the cursor
+    position through the index on `columns`, so every page costs the same
+    no matter how deep the client scrolls. The last column must be unique
+    (normally the primary key) so the order is total.
+    Returns:
+        tuple: (list of rows, cursor for the next page or None)
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(tuple_(*columns) < tuple_(*values))
+
+    # fetch one extra row to learn whether another page exists
+    rows = query.order_by(*[c.desc() for c in columns]).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
+
+
+def count_rows(query, mode="exact"):
+    """
+    Count the rows a query would return.
+    Args:
+        mode (str): 'exact' runs COUNT(*); 'estimate' reads the planner's row
+            estimate on PostgreSQL (falls back to exact elsewhere); 'none'
+            skips counting altogether.
+    Returns:
+        int or None
+    """
+    if mode == "none":
+        return None
+
+    session = query.session
+    if mode == "estimate" and session.get_bind().dialect.name == "postgresql":
+        statement = query.statement.compile(
+            dialect=session.get_bind().dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        plan = session.execute(text(f"EXPLAIN {statement}")).scalars().first()
+        match = _PLAN_ROWS_RE.search(plan or "")
+        if match:
+            return int(match.group(1))
+
+    subquery = query.order_by(None).statement.subquery()
+    return session.execute(select(func.count()).select_from(subquery)).scalar()
@@ -0,0 +1,144 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flask import current_app, has_app_context
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool is saturated; callers should answer 503"""
+
+
+class HashPool:
+    """
+    One app's bounded thread pool for bcrypt.
+
+    bcrypt releases the GIL while hashing, so the pool gives real parallelism
+    while capping how many cores a login storm can take. At most
+    `workers + max_queue` hashes are admitted at once; anything beyond that
+    is rejected immediately with HasherBusy instead of queueing behind the
+    storm and tying up a request worker, and so is a hash that is not done
+    within `timeout` seconds.
+
+    `log_rounds` is the bcrypt work factor for new hashes of this app; None
+    uses the Bcrypt extension's default.
+    """
+
+    def __init__(self, workers, max_queue, timeout, log_rounds=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.log_rounds = log_rounds
+        # threads start on first use and exit once the pool is garbage collected
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def metrics(self):
+        """Snapshot of pool usage, for monitoring"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HasherBusy("password hashing is saturated, try again shortly")
+
+        with self._lock:
+            self._admitted += 1
+        try:
+            future = self.executor.submit(self._call, fn, *args)
+        except Exception:
+            self._release()
+            raise
+        # the slot is freed when the hash finishes, even if the caller timed out
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HasherBusy("password hashing timed out, try again shortly") from None
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._admitted -= 1
+            self._completed += 1
+        self._slots.release()
+
+    def _call(self, fn, *args):
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords on the HashPool of the current app.
+
+    Each app gets its own pool (in app.extensions["password_hasher"]) sized
+    from its own config and carrying its own BCRYPT_LOG_ROUNDS, so creating
+    several apps in one process (tests, CLI, benchmarks) neither leaks pools
+    nor lets the last app's settings apply to the others. Outside an app
+    context hashing runs inline with the Bcrypt extension's defaults.
+    """
+
+    def __init__(self, bcrypt, app=None):
+        self.bcrypt = bcrypt
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        previous = app.extensions.get("password_hasher")
+        if previous is not None:
+            previous.shutdown()
+        app.extensions["password_hasher"] = HashPool(
+            workers=app.config.get("PASSWORD_HASH_WORKERS") or os.cpu_count() or 1,
+            max_queue=app.config.get("PASSWORD_HASH_MAX_QUEUE", 32),
+            timeout=app.config.get("PASSWORD_HASH_TIMEOUT", 10),
+            log_rounds=app.config.get("BCRYPT_LOG_ROUNDS"),
+        )
+
+    def hash(self, password):
+        """bcrypt hash of `password` as a str"""
+        pool = self.pool()
+        rounds = pool.log_rounds if pool is not None else None
+        return self._run(self.bcrypt.generate_password_hash, password, rounds).decode("utf-8")
+
+    def check(self, password_hash, password):
+        """True if `password` matches `password_hash`"""
+        return self._run(self.bcrypt.check_password_hash, password_hash, password)
+
+    def pool(self):
+        """The current app's HashPool, or None outside an app"""
+        if not has_app_context():
+            return None
+        return current_app.extensions.get("password_hasher")
+
+    def metrics(self):
+        """Snapshot of the current app's pool usage, for monitoring"""
+        return self.pool().metrics()
+
+    def _run(self, fn, *args):
+        pool = self.pool()
+        if pool is None:
+            # not bound to an app (scripts, shell): hash inline
+            return fn(*args)
+        return pool.run(fn, *args)
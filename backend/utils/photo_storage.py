@@ -0,0 +1,40 @@
+import os
+import shutil
+
+
+class CloudinaryStorage:
+    """Stores photos on Cloudinary (production)"""
+
+    def upload(self, path, filename):
+        # imported lazily so the local backend works without cloudinary credentials
+        from utils.cloudinary_helper import upload_photo
+        return upload_photo(path)
+
+
+class LocalStorage:
+    """
+    Stores photos in a directory on disk and serves them under `base_url`.
+    Used in development and tests in place of Cloudinary.
+    """
+
+    def __init__(self, root, base_url="/media/"):
+        self.root = root
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        os.makedirs(root, exist_ok=True)
+
+    def upload(self, path, filename):
+        shutil.copyfile(path, os.path.join(self.root, filename))
+        return self.base_url + filename
+
+
+def create_storage(app):
+    """Build the storage backend selected by the PHOTO_STORAGE config value"""
+    backend = app.config.get("PHOTO_STORAGE", "cloudinary")
+    if backend == "cloudinary":
+        return CloudinaryStorage()
+    if backend == "local":
+        return LocalStorage(
+            app.config["PHOTO_LOCAL_DIR"],
+            app.config.get("PHOTO_LOCAL_BASE_URL", "/media/"),
+        )
+    raise ValueError(f"unknown PHOTO_STORAGE backend: {backend}")
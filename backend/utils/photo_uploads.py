@@ -0,0 +1,181 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from models.db import db
+from models.missing_person import MissingPerson
+from utils.image_variants import generate_variants
+from utils.photo_storage import create_storage
+
+logger = logging.getLogger(__name__)
+
+# spooled files are named "<person id>__<random>.<ext>" once queued
+_QUEUED_RE = re.compile(r"^(\d+)__")
+
+# the client's file name only picks the spool extension, so keep it to images
+PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+
+class PhotoUploadQueue:
+    """
+    Background upload stage for report photos.
+
+    The request handler only writes the image bytes to a local spool
+    directory; a bounded worker pool builds the thumbnail and web-sized
+    variants, pushes everything to the storage backend (with retries) and
+    then fills in the URLs. Report creation therefore never waits on
+    Cloudinary.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        previous = app.extensions.get("photo_uploads")
+        if previous is not None:
+            previous.shutdown()
+        self.app = app
+        self.storage = create_storage(app)
+        self.spool_dir = app.config["PHOTO_SPOOL_DIR"]
+        self.failed_dir = os.path.join(self.spool_dir, "failed")
+        self.variants_dir = os.path.join(self.spool_dir, "variants")
+        self.retries = app.config.get("PHOTO_UPLOAD_RETRIES", 3)
+        self.retry_delay = app.config.get("PHOTO_UPLOAD_RETRY_DELAY", 2)
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config.get("PHOTO_UPLOAD_WORKERS", 4),
+            thread_name_prefix="photo-upload",
+        )
+        self._futures = set()
+        self._lock = threading.Lock()
+        os.makedirs(self.failed_dir, exist_ok=True)
+        os.makedirs(self.variants_dir, exist_ok=True)
+        app.extensions["photo_uploads"] = self
+
+    def spool(self, file_storage):
+        """
+        Save an uploaded file (werkzeug FileStorage) to the spool, return its path.
+        Raises ValueError if the file name does not have an image extension.
+        """
+        _, ext = os.path.splitext(file_storage.filename or "")
+        ext = ext.lower()
+        if ext not in PHOTO_EXTENSIONS:
+            raise ValueError(f"photo must be one of: {', '.join(sorted(PHOTO_EXTENSIONS))}")
+        path = os.path.join(self.spool_dir, f"incoming-{uuid.uuid4().hex}{ext}")
+        file_storage.save(path)
+        return path
+
+    def remove_spooled(self, spool_path):
+        """Delete a spooled file that will not be queued, e.g. its report was not saved"""
+        try:
+            os.remove(spool_path)
+        except FileNotFoundError:
+            pass
+
+    def enqueue(self, person_id, spool_path):
+        """Queue a spooled file for upload as the photo of report `person_id`"""
+        _, ext = os.path.splitext(spool_path)
+        queued_path = os.path.join(self.spool_dir, f"{person_id}__{uuid.uuid4().hex}{ext}")
+        os.replace(spool_path, queued_path)
+        return self._submit(person_id, queued_path)
+
+    def resume(self):
+        """Re-queue files left in the spool by a previous process. Returns the count."""
+        resumed = 0
+        for name in sorted(os.listdir(self.spool_dir)):
+            match = _QUEUED_RE.match(name)
+            if match:
+                self._submit(int(match.group(1)), os.path.join(self.spool_dir, name))
+                resumed += 1
+        return resumed
+
+    def wait(self, timeout=None):
+        """Block until every queued upload has finished"""
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures, timeout=timeout)
+
+    def shutdown(self):
+        """Stop the workers; queued files stay in the spool for `resume`"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, person_id, path):
+        future = self.executor.submit(self._upload, person_id, path)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _make_variants(self, person_id, path):
+        """
+        Metadata-free original, thumbnail and web-sized copies. If the file
+        cannot be read as an image the spooled file is uploaded as it is.
+        """
+        try:
+            return generate_variants(
+                path, self.variants_dir,
+                self.app.config.get("PHOTO_VARIANT_FORMAT", "WEBP"),
+                self.app.config.get("PHOTO_VARIANT_QUALITY", 80),
+            )
+        except Exception:
+            logger.warning("could not resize photo for report %s", person_id, exc_info=True)
+            return {}
+
+    def _upload(self, person_id, path):
+        filename = os.path.basename(path)
+        variants = self._make_variants(person_id, path)
+        files = {"photo_url": path, **variants}
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    urls = {
+                        field: self.storage.upload(file_path, os.path.basename(file_path))
+                        for field, file_path in files.items()
+                    }
+                    break
+                except Exception:
+                    logger.warning(
+                        "photo upload for report %s failed (attempt %s)",
+                        person_id, attempt + 1, exc_info=True,
+                    )
+                    if attempt == self.retries:
+                        # keep the file so it can be inspected or retried by hand
+                        os.replace(path, os.path.join(self.failed_dir, filename))
+                        self._finish(person_id, {}, "failed")
+                        return
+                    time.sleep(self.retry_delay * 2 ** attempt)
+
+            self._finish(person_id, urls, "uploaded")
+            os.remove(path)
+        finally:
+            for variant_path in variants.values():
+                os.remove(variant_path)
+
+    def _finish(self, person_id, urls, status):
+        with self.app.app_context():
+            try:
+                person = db.session.get(MissingPerson, person_id)
+                if person is None:
+                    return  # report deleted while the upload was running
+                for field, url in urls.items():
+                    setattr(person, field, url)
+                person.photo_status = status
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception("could not record photo upload for report %s", person_id)
+            finally:
+                db.session.remove()
+
+
+def get_photo_uploads(app):
+    return app.extensions["photo_uploads"]
@@ -0,0 +1,326 @@
+import re
+import threading
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+from utils.gazetteer import geocode
+from utils.geohash import EARTH_RADIUS_KM
+
+# Hashed bag-of-words sizes for the free-text description and the location
+TEXT_DIM = 256
+LOCATION_DIM = 64
+
+# How much each attribute contributes to a match score, sums to 1
+WEIGHTS = {
+    "age": 0.20,
+    "height": 0.10,
+    "weight": 0.05,
+    "hair": 0.05,
+    "eyes": 0.05,
+    "gender": 0.05,
+    "description": 0.30,
+    "location": 0.20,
+}
+
+# Unknown values on either side neither count for nor against a case
+NEUTRAL = 0.5
+
+# Differences at which an attribute stops contributing anything
+AGE_SPREAD = 10  # years outside the sighted age range
+HEIGHT_SPREAD = 20  # cm
+WEIGHT_SPREAD = 20  # kg
+LOCATION_SPREAD = 100  # km between the sighting and where the case was last seen
+
+# Estimated age of a sighted person is taken as this many years either way
+AGE_TOLERANCE = 3
+
+GENDERS = {"male": 1, "m": 1, "female": 2, "f": 2, "other": 3}
+
+# colour words, with the spellings people use for them
+HAIR_COLOURS = {
+    "black": 1, "brown": 2, "blonde": 3, "blond": 3, "grey": 4, "gray": 4,
+    "white": 5, "red": 6, "ginger": 6, "bald": 7, "shaved": 7,
+}
+EYE_COLOURS = {
+    "brown": 1, "black": 2, "blue": 3, "green": 4, "hazel": 5, "grey": 6, "gray": 6,
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "with", "on", "in", "of", "at", "to", "her", "his",
+    "is", "was", "wearing", "has", "had", "near", "kenya", "county",
+})
+
+_CM_RE = re.compile(r"(\d+(?:\.\d+)?)\s*cm")
+_METRES_RE = re.compile(r"(\d(?:\.\d+)?)\s*m\b")
+_FEET_RE = re.compile(r"(\d)\s*(?:'|ft|feet|foot)\s*(?:(\d{1,2}(?:\.\d+)?)\s*(?:\"|''|in|inch|inches)?)?")
+_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)")
+_POUNDS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:lb|lbs|pound|pounds)\b")
+
+
+def parse_height_cm(text):
+    """
+    Height in cm from free text such as "170cm", "1.7m", "5'7\"" or
+    "5 ft 7 in". Bare numbers are read as cm (or metres when below 3).
+    Returns None when no plausible height is found.
+    """
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        value = float(text)
+    else:
+        text = text.lower()
+        if match := _CM_RE.search(text):
+            value = float(match.group(1))
+        elif match := _FEET_RE.search(text):
+            value = int(match.group(1)) * 30.48 + float(match.group(2) or 0) * 2.54
+        elif match := _METRES_RE.search(text):
+            value = float(match.group(1)) * 100
+        elif match := _NUMBER_RE.search(text):
+            value = float(match.group(1))
+        else:
+            return None
+    if value < 3:
+        value *= 100
+    return value if 40 <= value <= 250 else None
+
+
+def parse_weight_kg(text):
+    """Weight in kg from free text such as "60kg", "60" or "132 lbs", or None"""
+    if text is None:
+        return None
+    if isinstance(text, (int, float)):
+        value = float(text)
+    else:
+        text = text.lower()
+        if match := _POUNDS_RE.search(text):
+            value = float(match.group(1)) * 0.4536
+        elif match := _NUMBER_RE.search(text):
+            value = float(match.group(1))
+        else:
+            return None
+    return value if 2 <= value <= 300 else None
+
+
+def colour_code(text, vocabulary):
+    """Code of the first known colour word in `text` ("dark brown" -> brown), 0 if none"""
+    for word in _WORD_RE.findall((text or "").lower()):
+        if word in vocabulary:
+            return vocabulary[word]
+    return 0
+
+
+def gender_code(text):
+    return GENDERS.get((text or "").strip().lower(), 0)
+
+
+def text_vector(text, dim):
+    """L2-normalised hashed bag of words; all zeros for empty text"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in set(_WORD_RE.findall((text or "").lower())):
+        if len(word) > 1 and word not in _STOPWORDS:
+            vector[zlib.crc32(word.encode()) % dim] = 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _timestamp(value):
+    """Unix time of a datetime, NaN for anything else; naive values are UTC as stored"""
+    if not isinstance(value, datetime):
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class CaseFeatureIndex:
+    """
+    Precomputed feature vectors of open cases, one row per case, held in
+    NumPy arrays. A sighting is scored against every case at once with
+    array arithmetic and a matrix-vector product for the text features.
+    """
+
+    def __init__(self, capacity=1024):
+        self.lock = threading.RLock()
+        self.positions = {}
+        self.size = 0
+        self._allocate(capacity)
+        # sync bookkeeping, managed by the caller
+        self.synced_until = None
+        self.checked_at = None
+        self.built_at = None
+
+    def __len__(self):
+        return int(self.active[:self.size].sum())
+
+    def _allocate(self, capacity):
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.age = np.full(capacity, np.nan, dtype=np.float32)
+        self.height = np.full(capacity, np.nan, dtype=np.float32)
+        self.weight = np.full(capacity, np.nan, dtype=np.float32)
+        self.gender = np.zeros(capacity, dtype=np.int8)
+        self.hair = np.zeros(capacity, dtype=np.int8)
+        self.eyes = np.zeros(capacity, dtype=np.int8)
+        self.last_seen = np.full(capacity, np.nan, dtype=np.float64)
+        self.latitude = np.full(capacity, np.nan, dtype=np.float64)
+        self.longitude = np.full(capacity, np.nan, dtype=np.float64)
+        self.description = np.zeros((capacity, TEXT_DIM), dtype=np.float32)
+        self.location = np.zeros((capacity, LOCATION_DIM), dtype=np.float32)
+
+    def _grow(self):
+        old = {name: getattr(self, name) for name in self._columns()}
+        self._allocate(len(self.ids) * 2)
+        for name, values in old.items():
+            getattr(self, name)[:len(values)] = values
+
+    @staticmethod
+    def _columns():
+        return ("ids", "active", "age", "height", "weight", "gender", "hair",
+                "eyes", "last_seen", "latitude", "longitude", "description", "location")
+
+    def upsert(self, case):
+        """
+        Add or refresh one case. Cases that are no longer missing are
+        deactivated rather than removed, so row positions stay stable.
+        Args:
+            case: object with the MissingPerson attributes used for matching
+        """
+        with self.lock:
+            position = self.positions.get(case.id)
+            if case.status != "missing":
+                if position is not None:
+                    self.active[position] = False
+                return
+            if position is None:
+                if self.size == len(self.ids):
+                    self._grow()
+                position = self.size
+                self.size += 1
+                self.positions[case.id] = position
+
+            self.ids[position] = case.id
+            self.active[position] = True
+            self.age[position] = np.nan if case.age is None else case.age
+            self.height[position] = parse_height_cm(case.height) or np.nan
+            self.weight[position] = parse_weight_kg(case.weight) or np.nan
+            self.gender[position] = gender_code(case.gender)
+            self.hair[position] = colour_code(case.hair_color, HAIR_COLOURS)
+            self.eyes[position] = colour_code(case.eye_color, EYE_COLOURS)
+            self.last_seen[position] = _timestamp(case.last_seen_date)
+            self.latitude[position] = np.nan if case.latitude is None else case.latitude
+            self.longitude[position] = np.nan if case.longitude is None else case.longitude
+            self.description[position] = text_vector(
+                f"{case.distinguishing_features or ''} {case.last_seen_wearing or ''}", TEXT_DIM
+            )
+            self.location[position] = text_vector(case.last_seen_location, LOCATION_DIM)
+
+    def _distances(self, n, latitude, longitude):
+        """Haversine distance in km from a point to every case, nan where unknown"""
+        lat1, lon1 = np.radians(self.latitude[:n]), np.radians(self.longitude[:n])
+        lat2, lon2 = np.radians(latitude), np.radians(longitude)
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def discard(self, case_id):
+        with self.lock:
+            position = self.positions.get(case_id)
+            if position is not None:
+                self.active[position] = False
+
+    def match(self, sighting, limit=20):
+        """
+        Rank open cases against a sighting.
+        Args:
+            sighting (dict): any of age, age_min, age_max, gender, height,
+                weight, hair_color, eye_color, description, wearing,
+                location, seen_date (datetime)
+            limit (int): number of cases to return
+        Returns:
+            list: [(case id, score)] best first
+        """
+        with self.lock:
+            n = self.size
+            active = self.active[:n].copy()
+            score = np.zeros(n, dtype=np.float32)
+
+            # age: inside the sighted range scores 1, fading out over AGE_SPREAD
+            age_min, age_max = sighting.get("age_min"), sighting.get("age_max")
+            if sighting.get("age") is not None:
+                age_min = sighting["age"] - AGE_TOLERANCE
+                age_max = sighting["age"] + AGE_TOLERANCE
+            if age_min is not None or age_max is not None:
+                low = -np.inf if age_min is None else age_min
+                high = np.inf if age_max is None else age_max
+                age = self.age[:n]
+                outside = np.maximum(low - age, 0) + np.maximum(age - high, 0)
+                score += WEIGHTS["age"] * np.where(
+                    np.isnan(age), NEUTRAL, np.clip(1 - outside / AGE_SPREAD, 0, 1)
+                )
+            else:
+                score += WEIGHTS["age"] * NEUTRAL
+
+            for key, values, spread, parse in (
+                ("height", self.height[:n], HEIGHT_SPREAD, parse_height_cm),
+                ("weight", self.weight[:n], WEIGHT_SPREAD, parse_weight_kg),
+            ):
+                wanted = parse(sighting.get(key))
+                if wanted is None:
+                    score += WEIGHTS[key] * NEUTRAL
+                else:
+                    score += WEIGHTS[key] * np.where(
+                        np.isnan(values), NEUTRAL, np.clip(1 - np.abs(values - wanted) / spread, 0, 1)
+                    )
+
+            for key, values, wanted in (
+                ("hair", self.hair[:n], colour_code(sighting.get("hair_color"), HAIR_COLOURS)),
+                ("eyes", self.eyes[:n], colour_code(sighting.get("eye_color"), EYE_COLOURS)),
+                ("gender", self.gender[:n], gender_code(sighting.get("gender"))),
+            ):
+                if not wanted:
+                    score += WEIGHTS[key] * NEUTRAL
+                else:
+                    score += WEIGHTS[key] * np.where(values == 0, NEUTRAL, (values == wanted).astype(np.float32))
+
+            # a sighted man is never a missing woman
+            wanted_gender = gender_code(sighting.get("gender"))
+            if wanted_gender:
+                genders = self.gender[:n]
+                active &= (genders == 0) | (genders == wanted_gender)
+
+            # nobody can be sighted as found before they went missing
+            seen_date = sighting.get("seen_date")
+            if isinstance(seen_date, datetime):
+                last_seen = self.last_seen[:n]
+                active &= np.isnan(last_seen) | (last_seen <= _timestamp(seen_date))
+
+            description = text_vector(
+                f"{sighting.get('description') or ''} {sighting.get('wearing') or ''}", TEXT_DIM
+            )
+            if description.any():
+                score += WEIGHTS["description"] * (self.description[:n] @ description)
+            else:
+                score += WEIGHTS["description"] * NEUTRAL
+
+            # location: distance where both sides are geocoded, shared words otherwise
+            location = np.full(n, NEUTRAL, dtype=np.float32)
+            words = text_vector(sighting.get("location"), LOCATION_DIM)
+            if words.any():
+                location = self.location[:n] @ words
+            place = geocode(sighting.get("location"))
+            if place is not None:
+                distance = self._distances(n, place.latitude, place.longitude)
+                located = ~np.isnan(distance)
+                location[located] = np.clip(1 - distance[located] / LOCATION_SPREAD, 0, 1)
+            score += WEIGHTS["location"] * location
+
+            candidates = np.flatnonzero(active)
+            if not len(candidates):
+                return []
+            if len(candidates) > limit:
+                top = np.argpartition(-score[candidates], limit - 1)[:limit]
+                candidates = candidates[top]
+            order = np.lexsort((self.ids[candidates], -score[candidates]))
+            return [(int(self.ids[i]), float(score[i])) for i in candidates[order]]
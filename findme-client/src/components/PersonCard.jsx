@@ -6,6 +6,8 @@ function PersonCard({ person }) {
   const fullName = person.full_name || "Unknown";
   const status = (person.status || "Missing").toLowerCase();
   const lastSeen = person.last_seen_location || "Unknown";
+  // small server-generated thumbnail for the grid, full photo as fallback
+  const imageUrl = person.thumbnail_url || person.photo_url || person.image_url;
 
   const badgeStyle = {
     padding: "4px 10px",
@@ -43,9 +45,10 @@ function PersonCard({ person }) {
           fontSize: "0.9rem",
         }}
       >
-        {person.image_url ? (
+        {imageUrl ? (
           <img
-            src={person.image_url}
+            src={imageUrl}
+            loading="lazy"
             alt={fullName}
             style={{
               width: "100%",
@@ -1,24 +1,35 @@
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import PersonCard from "../components/PersonCard";
 
+const API_BASE = import.meta.env.VITE_API_BASE || "https://findme-backend-2.onrender.com";
+const PAGE_SIZE = 20;
+
 function Search() {
   const [searchTerm, setSearchTerm] = useState("");
+  const [activeQuery, setActiveQuery] = useState(null);
   const [results, setResults] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
+  const sentinelRef = useRef(null);
 
-  async function fetchResults(query) {
+  // cursor pagination: each page costs the same however far the user scrolls
+  async function fetchPage(query, cursor) {
     try {
       setLoading(true);
       setError("");
-      const response = await fetch(
-        `https://findme-backend-2.onrender.com/missing_persons?name=${query}`
-      );
+      const params = new URLSearchParams({
+        q: query,
+        per_page: PAGE_SIZE,
+        cursor: cursor || "",
+      });
+      const response = await fetch(`${API_BASE}/api/search?${params}`);
       if (!response.ok) {
         throw new Error("Failed to fetch search results");
       }
       const data = await response.json();
-      setResults(data);
+      setResults((prev) => (cursor ? [...prev, ...data.results] : data.results));
+      setNextCursor(data.next_cursor);
     } catch (err) {
       setError(err.message);
     } finally {
@@ -28,9 +39,24 @@ function Search() {
 
   function handleSearch(e) {
     e.preventDefault();
-    fetchResults(searchTerm);
+    setActiveQuery(searchTerm);
+    fetchPage(searchTerm, null);
   }
 
+  // load the next page when the bottom of the list scrolls into view
+  useEffect(() => {
+    const sentinel = sentinelRef.current;
+    if (!sentinel || !nextCursor) return;
+
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting && !loading) {
+        fetchPage(activeQuery, nextCursor);
+      }
+    });
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [nextCursor, loading, activeQuery]);
+
   return (
     <div className="p-6 max-w-5xl mx-auto">
       <h1 className="text-3xl font-bold mb-6">Search Missing Persons</h1>
@@ -51,7 +77,6 @@ function Search() {
         </button>
       </form>
 
-      {loading && <p>Loading...</p>}
       {error && <p className="text-red-500">{error}</p>}
 
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
@@ -59,6 +84,9 @@ function Search() {
           ? results.map((person) => <PersonCard key={person.id} person={person} />)
           : !loading && <p>No results found.</p>}
       </div>
+
+      {loading && <p>Loading...</p>}
+      <div ref={sentinelRef} />
     </div>
   );
 }